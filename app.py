@@ -1,20 +1,27 @@
 import streamlit as st
+import asyncio
 import json
+from concurrent.futures import ThreadPoolExecutor
 import sys
 import os
 
 # Ensure project root is on the path
 sys.path.insert(0, os.path.dirname(__file__))
 
+from config import EMBEDDING_WARMUP
 from database import db
+from embedding_module import embedding_service
+from llm_module import client as llm_client
 from job_module.job_extractor import extract_job_description
-from job_module.job_embedding import generate_job_embedding
+from job_module.job_embedding import generate_job_embedding, generate_job_chunk_embeddings
 from resume_module.resume_parser import extract_text_from_pdf, parse_resume
-from resume_module.resume_embedding import generate_resume_embedding
-from match_engine.scorer import calculate_match_score
-from match_engine.explainable_ai import generate_explanation
+from resume_module.resume_embedding import generate_resume_embedding, generate_resume_chunk_embeddings
+from match_engine.scorer import calculate_match_score, rank_jobs_for_resume, warm_job_features
+from match_engine.skill_synonyms import embed_new_terms
+from match_engine.explainable_ai import stream_explanation
+from match_engine.pipeline import run_post_match_pipeline
 from gap_module.skill_gap import analyze_skill_gap
-from resume_builder.optimizer import optimize_resume
+from resume_builder.optimizer import optimize_resume, parse_optimized_resume, stream_optimize_resume
 from interview_module.question_generator import generate_questions
 from interview_module.voice_engine import speak, listen, is_microphone_available
 from interview_module.answer_evaluator import evaluate_answer
@@ -25,6 +32,27 @@ st.set_page_config(page_title="Job Application Analyzer", page_icon="💼", layo
 # Initialize database
 db.init_db()
 
+# Load the shared embedding model up front so the first analysis isn't slowed down
+if EMBEDDING_WARMUP:
+    with st.spinner("Loading embedding model..."):
+        embedding_service.warm_up()
+
+
+@st.cache_resource
+def _warm_job_features() -> None:
+    """Build the job feature cache once per process so the first job recommendation is not slowed down."""
+    warm_job_features()
+
+
+_warm_job_features()
+
+
+@st.cache_resource
+def _background_executor() -> ThreadPoolExecutor:
+    """Threads for work that continues while the page renders (the post-match pipeline)."""
+    return ThreadPoolExecutor(max_workers=4, thread_name_prefix="post-match")
+
+
 # ───────── Session state defaults ─────────
 _defaults = {
     "job_id": None,
@@ -37,6 +65,7 @@ _defaults = {
     "gap_analysis": None,
     "optimization": None,
     "interview_questions": None,
+    "prefetched_questions": None,
     "interview_idx": 0,
     "interview_answers": [],
     "interview_done": False,
@@ -54,6 +83,7 @@ steps = [
     "4. Skill Gap",
     "5. Resume Optimizer",
     "6. Mock Interview",
+    "7. Job Feed",
 ]
 page = st.sidebar.radio("Go to", steps)
 
@@ -67,6 +97,25 @@ st.sidebar.markdown(f"{'✅' if st.session_state.gap_analysis else '⬜'} Gap an
 st.sidebar.markdown(f"{'✅' if st.session_state.optimization else '⬜'} Resume optimized")
 st.sidebar.markdown(f"{'✅' if st.session_state.interview_done else '⬜'} Interview done")
 
+_emb_stats = embedding_service.get_stats()
+if _emb_stats["load_seconds"] is not None:
+    st.sidebar.caption(
+        f"Embedding model {_emb_stats['model']} on {_emb_stats['device']}: "
+        f"loaded in {_emb_stats['load_seconds']}s, RSS {_emb_stats['rss_now_mb']} MB"
+    )
+if _emb_stats["cache"] and _emb_stats["cache"]["hit_rate"] is not None:
+    st.sidebar.caption(f"Embedding cache hit rate: {_emb_stats['cache']['hit_rate']:.0%}")
+_llm_stats = llm_client.get_stats()
+if _llm_stats["requests"]:
+    st.sidebar.caption(
+        f"Gemini: {_llm_stats['requests']} requests, {_llm_stats['retries']} retries, "
+        f"{_llm_stats['throttled_seconds']}s throttled"
+    )
+if _llm_stats["mean_ttft_seconds"] is not None:
+    st.sidebar.caption(f"Gemini streaming: {_llm_stats['mean_ttft_seconds']}s mean time to first token")
+if _llm_stats["cache"] and _llm_stats["cache"]["hit_rate"] is not None:
+    st.sidebar.caption(f"Gemini response cache hit rate: {_llm_stats['cache']['hit_rate']:.0%}")
+
 
 # ═══════════════════════════════════════════
 # PAGE 1 — Job Description
@@ -83,11 +132,18 @@ if page == steps[0]:
     if submitted and job_text.strip():
         with st.spinner("Extracting job details with Gemini..."):
             try:
-                job_data_obj = extract_job_description(job_text)
-                job_dict = job_data_obj.model_dump()
+                existing = db.find_job_by_content(job_text, columns=("structured_data",))
+                if existing is not None:
+                    job_id = existing["id"]
+                    job_dict = existing["structured_data"]
+                else:
+                    job_data_obj = extract_job_description(job_text)
+                    job_dict = job_data_obj.model_dump()
 
-                embedding = generate_job_embedding(job_dict, job_text)
-                job_id = db.save_job(job_text, job_dict, embedding)
+                    embedding = generate_job_embedding(job_dict, job_text)
+                    chunk_embeddings = generate_job_chunk_embeddings(job_text)
+                    job_id = db.save_job(job_text, job_dict, embedding, chunk_embeddings)
+                    embed_new_terms()
 
                 st.session_state.job_id = job_id
                 st.session_state.job_data = job_dict
@@ -97,7 +153,10 @@ if page == steps[0]:
                 st.session_state.explanation = None
                 st.session_state.gap_analysis = None
                 st.session_state.optimization = None
-                st.success("Job description extracted successfully!")
+                if existing is not None:
+                    st.success("This job description was already analyzed — loaded the saved results.")
+                else:
+                    st.success("Job description extracted successfully!")
             except Exception as e:
                 st.error(f"Extraction failed: {e}")
     elif submitted:
@@ -149,11 +208,19 @@ elif page == steps[1]:
             with st.spinner("Extracting and parsing resume..."):
                 try:
                     raw_text = extract_text_from_pdf(file_bytes)
-                    resume_data_obj = parse_resume(raw_text)
-                    resume_dict = resume_data_obj.model_dump()
-
-                    embedding = generate_resume_embedding(resume_dict, raw_text)
-                    resume_id = db.save_resume(uploaded_file.name, raw_text, resume_dict, embedding)
+                    existing = db.find_resume_by_content(raw_text, columns=("structured_data",))
+                    if existing is not None:
+                        resume_id = existing["id"]
+                        resume_dict = existing["structured_data"]
+                    else:
+                        resume_data_obj = parse_resume(raw_text)
+                        resume_dict = resume_data_obj.model_dump()
+
+                        embedding = generate_resume_embedding(resume_dict, raw_text)
+                        chunk_embeddings = generate_resume_chunk_embeddings(raw_text)
+                        resume_id = db.save_resume(uploaded_file.name, raw_text, resume_dict, embedding,
+                                                   chunk_embeddings)
+                        embed_new_terms()
 
                     st.session_state.resume_id = resume_id
                     st.session_state.resume_data = resume_dict
@@ -163,7 +230,10 @@ elif page == steps[1]:
                     st.session_state.explanation = None
                     st.session_state.gap_analysis = None
                     st.session_state.optimization = None
-                    st.success("Resume parsed successfully!")
+                    if existing is not None:
+                        st.success("This resume was already parsed — loaded the saved results.")
+                    else:
+                        st.success("Resume parsed successfully!")
                 except Exception as e:
                     st.error(f"Resume parsing failed: {e}")
 
@@ -211,33 +281,36 @@ elif page == steps[2]:
     if not st.session_state.job_data or not st.session_state.resume_data:
         st.warning("Please complete Step 1 (Job Description) and Step 2 (Upload Resume) first.")
     else:
+        post_match = None
         if st.button("Calculate Match Score"):
             with st.spinner("Computing match score..."):
                 try:
                     result = calculate_match_score(st.session_state.job_id, st.session_state.resume_id)
+                    # A result served from the cache is already stored.
+                    match_id = result.get("match_id") or db.save_match_result(
+                        st.session_state.job_id,
+                        st.session_state.resume_id,
+                        result["match_score"],
+                        result["semantic_similarity"],
+                        result["result_data"],
+                        None,
+                        weights_version=result["weights_version"],
+                        scorer_settings=result["scorer_settings"],
+                    )
                     st.session_state.match_result = result
+                    st.session_state.match_id = match_id
                 except Exception as e:
                     st.error(f"Matching failed: {e}")
-
-            if st.session_state.match_result:
-                with st.spinner("Generating explanation..."):
-                    try:
-                        explanation = generate_explanation(st.session_state.match_result)
-                        st.session_state.explanation = explanation
-
-                        # Save to database
-                        rd = st.session_state.match_result["result_data"]
-                        match_id = db.save_match_result(
-                            st.session_state.job_id,
-                            st.session_state.resume_id,
-                            st.session_state.match_result["match_score"],
-                            st.session_state.match_result["semantic_similarity"],
-                            rd,
-                            explanation,
-                        )
-                        st.session_state.match_id = match_id
-                    except Exception as e:
-                        st.error(f"Explanation generation failed: {e}")
+                else:
+                    # Gap analysis, optimization and interview questions are
+                    # generated in the background while the explanation streams in.
+                    post_match = _background_executor().submit(asyncio.run, run_post_match_pipeline(
+                        result,
+                        st.session_state.job_id,
+                        st.session_state.resume_id,
+                        match_id=match_id,
+                        explanation=False,
+                    ))
 
         if st.session_state.match_result:
             mr = st.session_state.match_result
@@ -301,7 +374,31 @@ elif page == steps[2]:
                     st.write("None")
 
             # Explanation
-            if st.session_state.explanation:
+            if post_match is not None:
+                st.markdown("---")
+                st.subheader("AI Explanation")
+                try:
+                    explanation = st.write_stream(stream_explanation(mr))
+                except Exception as e:
+                    # Shown, but not saved: a failure message is not an explanation.
+                    st.error(str(e))
+                else:
+                    st.session_state.explanation = explanation
+                    db.update_match_explanation(st.session_state.match_id, explanation)
+
+                with st.spinner("Finishing gap analysis, resume optimization and interview questions..."):
+                    try:
+                        pipeline_result = post_match.result()
+                        st.session_state.gap_analysis = pipeline_result["gap_analysis"]
+                        st.session_state.optimization = pipeline_result["optimization"]
+                        st.session_state.prefetched_questions = pipeline_result["questions"]
+                        for name, error in pipeline_result["errors"].items():
+                            st.error(f"{name.replace('_', ' ').capitalize()} failed: {error}")
+                        for name, reason in pipeline_result["skipped"].items():
+                            st.info(f"{name.replace('_', ' ').capitalize()} skipped: {reason}")
+                    except Exception as e:
+                        st.error(f"Post-match analysis failed: {e}")
+            elif st.session_state.explanation:
                 st.markdown("---")
                 st.subheader("AI Explanation")
                 st.write(st.session_state.explanation)
@@ -381,18 +478,34 @@ elif page == steps[4]:
         st.warning("Please complete Step 3 (Match Analysis) first.")
     else:
         if st.button("Generate Optimization Suggestions"):
-            with st.spinner("Optimizing resume with Gemini..."):
+            try:
+                gap_data = st.session_state.gap_analysis or {}
+                # Show the reply as Gemini writes it, then the formatted result.
+                draft = st.empty()
+                text = ""
+                for chunk in stream_optimize_resume(
+                    st.session_state.job_data,
+                    st.session_state.resume_data,
+                    gap_data,
+                ):
+                    text += chunk
+                    draft.code(text, language="json")
+                draft.empty()
                 try:
-                    gap_data = st.session_state.gap_analysis or {}
-                    opt = optimize_resume(
-                        st.session_state.job_data,
-                        st.session_state.resume_data,
-                        gap_data,
-                    )
-                    st.session_state.optimization = opt.model_dump()
-                    st.success("Optimization suggestions ready!")
-                except Exception as e:
-                    st.error(f"Optimization failed: {e}")
+                    opt = parse_optimized_resume(text)
+                except (ValueError, TypeError):
+                    with st.spinner("Reply was malformed, retrying..."):
+                        opt = optimize_resume(
+                            st.session_state.job_data,
+                            st.session_state.resume_data,
+                            gap_data,
+                        )
+                st.session_state.optimization = opt.model_dump()
+                if st.session_state.match_id:
+                    db.save_resume_optimization(st.session_state.match_id, st.session_state.optimization)
+                st.success("Optimization suggestions ready!")
+            except Exception as e:
+                st.error(f"Optimization failed: {e}")
 
         if st.session_state.optimization:
             opt = st.session_state.optimization
@@ -437,13 +550,17 @@ elif page == steps[5]:
                 with st.spinner("Generating interview questions..."):
                     try:
                         mr = st.session_state.match_result
-                        questions = generate_questions(
-                            st.session_state.job_data,
-                            st.session_state.resume_data,
-                            mr["match_score"],
-                            mr["result_data"].get("missing_skills", []),
-                            num_q,
-                        )
+                        # Reuse the questions generated after matching if the count fits.
+                        questions = st.session_state.prefetched_questions
+                        if not questions or len(questions) != num_q:
+                            questions = generate_questions(
+                                st.session_state.job_data,
+                                st.session_state.resume_data,
+                                mr["match_score"],
+                                mr["result_data"].get("missing_skills", []),
+                                num_q,
+                            )
+                        st.session_state.prefetched_questions = None
                         st.session_state.interview_questions = questions
                         st.session_state.interview_idx = 0
                         st.session_state.interview_answers = []
@@ -557,3 +674,47 @@ elif page == steps[5]:
                 st.session_state.interview_answers = []
                 st.session_state.interview_done = False
                 st.rerun()
+
+
+# ═══════════════════════════════════════════
+# PAGE 7 — Job Feed
+# ═══════════════════════════════════════════
+elif page == steps[6]:
+    st.header("Step 7: Job Feed")
+
+    if not st.session_state.resume_data:
+        st.warning("Please complete Step 2 (Upload Resume) first.")
+    else:
+        num_jobs = st.slider("Number of jobs", min_value=5, max_value=50, value=10)
+        try:
+            feed = rank_jobs_for_resume(st.session_state.resume_id, num_jobs)
+        except Exception as e:
+            st.error(f"Ranking failed: {e}")
+            feed = []
+
+        if not feed:
+            st.info("No stored job descriptions yet. Analyze some in Step 1 first.")
+        for rank, (job_id, result) in enumerate(feed, 1):
+            jd = result["job_data"]
+            rd = result["result_data"]
+            title = jd.get("job_title") or f"Job #{job_id}"
+            with st.expander(f"{rank}. {title} — {result['match_score']}/100", expanded=rank <= 3):
+                c1, c2, c3, c4 = st.columns(4)
+                c1.metric("Semantic Similarity", f"{result['semantic_similarity']:.2%}")
+                c2.metric("Skill Match", f"{rd['skill_match_pct']}%")
+                c3.metric("Experience", f"{rd['experience_score']}%")
+                c4.metric("Education", f"{rd['education_score']}%")
+                if rd["matched_skills"]:
+                    st.markdown(f"**Matched Skills:** {', '.join(rd['matched_skills'])}")
+                if rd["missing_skills"]:
+                    st.markdown(f"**Missing Skills:** {', '.join(rd['missing_skills'])}")
+                if st.button("Analyze this job", key=f"feed_job_{job_id}"):
+                    st.session_state.job_id = job_id
+                    st.session_state.job_data = jd
+                    # Reset downstream
+                    st.session_state.match_id = None
+                    st.session_state.match_result = None
+                    st.session_state.explanation = None
+                    st.session_state.gap_analysis = None
+                    st.session_state.optimization = None
+                    st.success("Job selected. Open Step 3 to run the full match analysis.")
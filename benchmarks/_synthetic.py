@@ -0,0 +1,80 @@
+"""Synthetic jobs and resumes shared by the scoring benchmarks.
+
+Every bench draws from the same distribution:
+- Embeddings sit around a few cluster centers at a random strength, so
+  similarities within a cluster spread from about 0 to about 0.9.
+- Skills and tools follow a Zipf-like popularity, so jobs and resumes
+  overlap the way real postings do.
+"""
+import numpy as np
+
+SKILLS = ["python", "sql", "docker", "aws", "react", "java"] + [f"skill{i}" for i in range(400)]
+TOOLS = ["git", "jira", "kubernetes"] + [f"tool{i}" for i in range(100)]
+EDUCATION = ["", "High School", "Diploma", "Bachelor's degree", "Master's in CS", "PhD"]
+EXPERIENCE = ["", "1", "2-3", "3-5 years", "4", "5+", "8", "10 years"]
+DIM = 384
+
+
+def _popularity(n: int) -> np.ndarray:
+    weights = 1.0 / np.arange(1, n + 1)
+    return weights / weights.sum()
+
+
+_SKILL_P = _popularity(len(SKILLS))
+_TOOL_P = _popularity(len(TOOLS))
+
+
+def centers(n: int, rng: np.random.Generator) -> np.ndarray:
+    """``n`` random cluster centers."""
+    return rng.standard_normal((n, DIM))
+
+
+def _near(center: np.ndarray, rng: np.random.Generator) -> np.ndarray:
+    return (rng.uniform(0.0, 3.0) * center + rng.standard_normal(DIM)).astype(np.float32)
+
+
+def _vectors(centers: np.ndarray, rng: np.random.Generator, chunks: bool):
+    """A summary embedding and, with ``chunks``, 2-8 chunk embeddings around one cluster center."""
+    center = centers[rng.integers(len(centers))]
+    chunk_matrix = np.stack([_near(center, rng) for _ in range(rng.integers(2, 9))]) if chunks else None
+    return _near(center, rng), chunk_matrix
+
+
+def _terms(pool: list[str], p: np.ndarray, low: int, high: int, rng: np.random.Generator) -> list[str]:
+    return sorted(rng.choice(pool, rng.integers(low, high), replace=False, p=p).tolist())
+
+
+def jobs(start: int, n: int, centers: np.ndarray, rng: np.random.Generator, chunks: bool = False):
+    """save_jobs_bulk tuples for jobs ``start`` to ``start + n``."""
+    for i in range(start, start + n):
+        embedding, chunk_matrix = _vectors(centers, rng, chunks)
+        yield (
+            f"synthetic posting {i}",
+            {
+                "job_title": f"Role {i}",
+                "skills_required": _terms(SKILLS, _SKILL_P, 3, 15, rng),
+                "tools_required": _terms(TOOLS, _TOOL_P, 0, 6, rng),
+                "experience_required": str(rng.choice(EXPERIENCE)),
+                "education_required": str(rng.choice(EDUCATION)),
+            },
+            embedding,
+            chunk_matrix,
+        )
+
+
+def resumes(start: int, n: int, centers: np.ndarray, rng: np.random.Generator, chunks: bool = False):
+    """save_resumes_bulk tuples for resumes ``start`` to ``start + n`` (distinct texts for distinct indices)."""
+    for i in range(start, start + n):
+        embedding, chunk_matrix = _vectors(centers, rng, chunks)
+        yield (
+            f"resume_{i}.pdf",
+            f"synthetic resume {i}",
+            {
+                "skills": _terms(SKILLS, _SKILL_P, 3, 25, rng),
+                "tools": _terms(TOOLS, _TOOL_P, 0, 8, rng),
+                "experience_years": str(rng.choice(EXPERIENCE)),
+                "education": str(rng.choice(EDUCATION)),
+            },
+            embedding,
+            chunk_matrix,
+        )
@@ -0,0 +1,72 @@
+"""Resume retrieval: IVF index vs exact brute-force cosine search.
+
+Fills a throwaway embedding store with clustered synthetic vectors (real
+resume embeddings are far from uniform), trains the index, then reports
+recall@K against brute force and per-query latency for several nprobe values.
+
+Usage: python benchmarks/bench_ann.py [--n 100000] [--queries 200] [--k 50] [--dtype float32]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database.ann_index import IVFIndex
+from database.embedding_store import EmbeddingStore
+from database.quantization import cosine_scores
+
+
+def _clustered(n: int, dim: int, rng: np.random.Generator) -> np.ndarray:
+    centers = rng.standard_normal((max(n // 200, 8), dim)).astype(np.float32)
+    rows = centers[rng.integers(0, len(centers), n)] + 1.5 * rng.standard_normal((n, dim)).astype(np.float32)
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--n", type=int, default=100000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=50)
+    parser.add_argument("--nprobe", type=int, nargs="+", default=[4, 8, 12, 24, 48])
+    parser.add_argument("--dtype", default="float32")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    corpus = _clustered(args.n, args.dim, rng)
+    queries = corpus[rng.choice(args.n, args.queries, replace=False)]
+    queries = queries + 0.5 * rng.standard_normal(queries.shape).astype(np.float32)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        base = os.path.join(tmp, "resumes_embeddings")
+        store = EmbeddingStore(base, dtype=args.dtype)
+        store.append(np.arange(1, args.n + 1), corpus)
+
+        start = time.perf_counter()
+        index = IVFIndex(store, base, min_train_size=1, retrain_growth=4)
+        index.sync()
+        print(f"{args.n:,} x {args.dim} {args.dtype}: trained {len(index.centroids)} lists "
+              f"in {time.perf_counter() - start:.1f}s")
+
+        matrix, ids = store.matrix(), store.ids()
+        start = time.perf_counter()
+        exact = [set(ids[np.argsort(-cosine_scores(q, matrix))[:args.k]].tolist()) for q in queries]
+        brute_ms = (time.perf_counter() - start) / args.queries * 1000
+
+        print(f"{'method':<14}{'recall@' + str(args.k):>12}{'ms/query':>12}")
+        print(f"{'brute force':<14}{1.0:>12.3f}{brute_ms:>12.2f}")
+        for nprobe in args.nprobe:
+            start = time.perf_counter()
+            found = [index.search(q, args.k, nprobe)[0] for q in queries]
+            ms = (time.perf_counter() - start) / args.queries * 1000
+            recall = np.mean([len(exact[i] & set(f.tolist())) / args.k for i, f in enumerate(found)])
+            print(f"{'nprobe=' + str(nprobe):<14}{recall:>12.3f}{ms:>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""Cross-product scoring: every job x every resume into match_results.
+
+Builds a throwaway database of synthetic jobs and resumes (see _synthetic)
+and times one uninterrupted run. It then clears the results, cancels a
+second run as its first tile lands (while most tiles are not yet
+submitted) and resumes it. It checks that the resume scored exactly the
+missing pairs, that every pair was stored once, and that a sample matches
+calculate_match_scores exactly (the semantic similarity to its last digit).
+
+Usage: python benchmarks/bench_cross_scoring.py [--jobs 200] [--resumes 20000] [--workers 4] [--min-score 60]
+       [--job-tile 16] [--resume-tile 2000]
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import db
+from match_engine import cross_scoring, scorer
+
+import _synthetic
+
+
+def _stored_rows() -> int:
+    with db.connection() as conn:
+        return conn.execute("SELECT COUNT(*) FROM match_results").fetchone()[0]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--jobs", type=int, default=200)
+    parser.add_argument("--resumes", type=int, default=20000)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--min-score", type=float, default=None)
+    parser.add_argument("--job-tile", type=int, default=16)
+    parser.add_argument("--resume-tile", type=int, default=2000)
+    parser.add_argument("--check", type=int, default=5, help="jobs to verify against calculate_match_scores")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    centers = _synthetic.centers(16, rng)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db.close_pool()
+        db.DB_PATH = os.path.join(tmp, "jobs.db")
+        db.init_db()
+        job_ids = db.save_jobs_bulk(_synthetic.jobs(0, args.jobs, centers, rng))
+        resume_ids = db.save_resumes_bulk(_synthetic.resumes(0, args.resumes, centers, rng))
+        pairs = args.jobs * args.resumes
+        print(f"{args.jobs:,} jobs x {args.resumes:,} resumes = {pairs:,} pairs, {args.workers} workers")
+
+        tiles = {"min_score": args.min_score, "workers": args.workers,
+                 "job_tile": args.job_tile, "resume_tile": args.resume_tile}
+
+        start = time.perf_counter()
+        run_id = cross_scoring.score_all_pairs(**tiles)
+        elapsed = time.perf_counter() - start
+        run = db.get_scoring_run(run_id)
+        total_rows = run["rows_written"]
+        print(f"full run: {run['tiles_total']} tiles, {total_rows:,} rows in {elapsed:.1f}s "
+              f"({pairs / elapsed:,.0f} pairs/s)")
+        with db.transaction() as conn:
+            conn.execute("DELETE FROM match_results")
+
+        cancel = threading.Event()
+        run_id = cross_scoring.score_all_pairs(**tiles, progress=lambda *_: cancel.set(), cancel=cancel)
+        run = db.get_scoring_run(run_id)
+        assert run["status"] == "cancelled", "every tile was in flight before the cancel; use smaller tiles"
+        stored_before = _stored_rows()
+        print(f"cancelled after {run['tiles_done']}/{run['tiles_total']} tiles, {stored_before:,} rows stored")
+
+        tiles_before = run["tiles_done"]
+        start = time.perf_counter()
+        cross_scoring.resume_scoring_run(run_id, workers=args.workers)
+        elapsed = time.perf_counter() - start
+        run = db.get_scoring_run(run_id)
+        added = _stored_rows() - stored_before
+        print(f"resumed: {run['tiles_done'] - tiles_before} remaining tiles, {added:,} rows in {elapsed:.1f}s, "
+              f"status {run['status']}")
+        assert added == total_rows - stored_before, f"resume added {added:,} rows, expected {total_rows - stored_before:,}"
+
+        with db.connection() as conn:
+            stored, distinct = conn.execute(
+                "SELECT COUNT(*), COUNT(DISTINCT job_id * 1000000000 + resume_id) FROM match_results",
+            ).fetchone()
+            rows = {
+                (r[0], r[1]): (r[2], r[3], json.loads(r[4])) for r in conn.execute(
+                    "SELECT job_id, resume_id, match_score, semantic_similarity, result_data FROM match_results "
+                    f"WHERE job_id IN ({','.join('?' * args.check)})", job_ids[:args.check],
+                )
+            }
+        print(f"stored {stored:,} rows, {distinct:,} distinct pairs")
+
+        mismatches = missing = 0
+        for job_id in job_ids[:args.check]:
+            for resume_id, result in scorer.calculate_match_scores(job_id, resume_ids).items():
+                if args.min_score is not None and result["match_score"] < args.min_score:
+                    continue
+                got = rows.pop((job_id, resume_id), None)
+                if got is None:
+                    missing += 1
+                # Scores and components must be identical. The semantic similarity comes from one
+                # matrix product per tile rather than the scorer's per-job product, so its float32
+                # sum can round to a neighbouring 4th decimal.
+                elif (got[0], got[2]) != (result["match_score"], result["result_data"]) \
+                        or abs(got[1] - result["semantic_similarity"]) > 1.5e-4:
+                    mismatches += 1
+        print(f"checked {args.check} jobs against calculate_match_scores: "
+              f"{missing} missing, {len(rows)} extra, {mismatches} different")
+        db.close_pool()
+
+
+if __name__ == "__main__":
+    main()
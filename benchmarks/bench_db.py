@@ -0,0 +1,128 @@
+"""Database layer throughput: connect-per-call vs pooled WAL connections,
+and per-row vs bulk ingest.
+
+Bulk ingest is compared with both per-row baselines (the old connect-per-call
+path and pooled save_job) for each chunk size. Each run writes a fresh
+database and the best of ``--repeat`` runs is reported, since disk noise
+between runs is larger than the differences between chunk sizes.
+
+Usage: python benchmarks/bench_db.py [--ops 2000] [--bulk 20000] [--chunk-sizes 250 1000 5000 20000] [--repeat 3]
+"""
+import argparse
+import json
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import db
+
+
+SAMPLE_JOB = {
+    "job_title": "Backend Engineer",
+    "skills_required": ["python", "sql", "docker"],
+    "tools_required": ["git", "aws"],
+    "experience_required": "3-5 years",
+    "education_required": "Bachelor's in Computer Science",
+}
+
+
+def _legacy_connection(path):
+    conn = sqlite3.connect(path)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA foreign_keys = ON")
+    return conn
+
+
+def _legacy_save_job(path, raw_text, structured_data, embedding):
+    conn = _legacy_connection(path)
+    cursor = conn.execute(
+        "INSERT INTO jobs (raw_text, structured_data, embedding) VALUES (?, ?, ?)",
+        (raw_text, json.dumps(structured_data), db.serialize_embedding(embedding)),
+    )
+    conn.commit()
+    job_id = cursor.lastrowid
+    conn.close()
+    return job_id
+
+
+def _legacy_get_job(path, job_id):
+    conn = _legacy_connection(path)
+    row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+    conn.close()
+    d = dict(row)
+    d["structured_data"] = json.loads(d["structured_data"])
+    d["embedding"] = db.deserialize_embedding(d["embedding"])
+    return d
+
+
+def _rate(fn, ops):
+    start = time.perf_counter()
+    for i in range(ops):
+        fn(i)
+    return ops / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--ops", type=int, default=2000)
+    parser.add_argument("--bulk", type=int, default=20000)
+    parser.add_argument("--chunk-sizes", type=int, nargs="+", default=[250, 1000, 5000, 20000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    emb = np.random.default_rng(0).standard_normal(384).astype(np.float32)
+    raw = "Backend engineer role. " * 40
+
+    with tempfile.TemporaryDirectory() as tmp:
+        legacy_path = os.path.join(tmp, "legacy.db")
+        conn = _legacy_connection(legacy_path)
+        db._create_tables(conn)
+        conn.commit()
+        conn.close()
+
+        db.close_pool()
+        db.DB_PATH = os.path.join(tmp, "pooled.db")
+        db.init_db()
+
+        results = {
+            "save_job": (
+                _rate(lambda i: _legacy_save_job(legacy_path, f"{raw} #{i}", SAMPLE_JOB, emb), args.ops),
+                _rate(lambda i: db.save_job(f"{raw} #{i}", SAMPLE_JOB, emb), args.ops),
+            ),
+            "get_job": (
+                _rate(lambda i: _legacy_get_job(legacy_path, i % args.ops + 1), args.ops),
+                _rate(lambda i: db.get_job(i % args.ops + 1)["structured_data"], args.ops),
+            ),
+        }
+
+        bulk = {chunk_size: 0.0 for chunk_size in args.chunk_sizes}
+        for run in range(args.repeat):
+            for chunk_size in bulk:
+                db.close_pool()
+                db.DB_PATH = os.path.join(tmp, f"bulk_{chunk_size}_{run}.db")
+                db.init_db()
+                feed = ((f"{raw} bulk #{i}", SAMPLE_JOB, emb) for i in range(args.bulk))
+                start = time.perf_counter()
+                db.save_jobs_bulk(feed, chunk_size=chunk_size)
+                bulk[chunk_size] = max(bulk[chunk_size], args.bulk / (time.perf_counter() - start))
+        db.close_pool()
+
+    print(f"{'operation':<16}{'before ops/s':>16}{'after ops/s':>16}{'speedup':>10}")
+    for name, (before, after) in results.items():
+        print(f"{name:<16}{before:>16,.0f}{after:>16,.0f}{after / before:>9.1f}x")
+
+    legacy, pooled = results["save_job"]
+    print(f"\nsave_jobs_bulk, {args.bulk:,} jobs, best of {args.repeat} (default chunk {db.DB_BULK_CHUNK_SIZE:,})")
+    print(f"{'chunk size':<16}{'rows/s':>16}{'vs connect':>12}{'vs pooled':>12}")
+    for chunk_size, rate in bulk.items():
+        print(f"{chunk_size:<16,}{rate:>16,.0f}{rate / legacy:>11.1f}x{rate / pooled:>11.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""Job-description ingest throughput: one JD per request vs batched extraction.
+
+Runs process_job per JD and ingest_job_descriptions over the same synthetic
+feed, each into a throwaway database, against a stand-in model (no API key
+or network needed) that answers after a fixed latency plus a per-JD cost and
+corrupts a fraction of batched entries to exercise the per-item retry.
+Reports requests, wall time, and the time a feed would take under a
+requests-per-minute quota, and checks both paths stored the same data.
+
+The measured runs lift the RPM limit so they show latency; the projection
+shows the quota, which is what bounds a large feed.
+
+Usage: python benchmarks/bench_job_extraction.py [--jds 200] [--latency 0.3] [--per-item 0.01] [--bad-rate 0.05] [--feed 20000] [--rpm 10]
+"""
+import os
+
+os.environ.setdefault("LLM_CACHE_ENABLED", "0")
+os.environ["GEMINI_RPM"] = "100000"
+
+import argparse
+import json
+import random
+import re
+import sys
+import tempfile
+import time
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import db
+from job_module import job_extractor
+from llm_module import client
+
+SKILLS = ["python", "sql", "docker", "aws", "react", "java", "go", "spark", "airflow", "kafka"]
+TOOLS = ["git", "jira", "kubernetes", "terraform", "tableau"]
+_JD = re.compile(r"Job Description (\d+):\n(.*?)(?=\n\nJob Description \d+:\n|\Z)", re.DOTALL)
+
+
+def _synthetic_jds(n: int, rng: random.Random) -> list[str]:
+    return [
+        f"Role {i} at Company {i % 97}\n"
+        f"Location: City {i % 13}\n"
+        f"Skills: {', '.join(rng.sample(SKILLS, rng.randint(2, 6)))}\n"
+        f"Tools: {', '.join(rng.sample(TOOLS, rng.randint(0, 3)))}\n"
+        f"Experience: {rng.randint(0, 8)}+ years\n"
+        + "We are looking for a motivated engineer to join our team. " * rng.randint(10, 60)
+        for i in range(n)
+    ]
+
+
+def _extract(jd: str) -> dict:
+    lines = jd.split("\n")
+    field = lambda name: next((l.split(": ", 1)[1] for l in lines if l.startswith(name + ":")), "")
+    split = lambda value: [s for s in value.split(", ") if s]
+    return {
+        "job_title": lines[0].split(" at ")[0],
+        "company_name": lines[0].split(" at ")[1],
+        "location": field("Location"),
+        "experience_required": field("Experience"),
+        "skills_required": split(field("Skills")),
+        "tools_required": split(field("Tools")),
+    }
+
+
+class _FakeExtractor:
+    """Answers extraction prompts after ``latency`` + ``per_item`` seconds per JD in the reply."""
+
+    def __init__(self, latency: float, per_item: float, bad_rate: float, rng: random.Random):
+        self.latency = latency
+        self.per_item = per_item
+        self.bad_rate = bad_rate
+        self.rng = rng
+
+    def generate_content(self, prompt, generation_config=None, request_options=None):
+        batch = _JD.findall(prompt)
+        if batch:
+            reply = []
+            for index, jd in batch:
+                item = {"index": int(index), **_extract(jd)}
+                if self.rng.random() < self.bad_rate:
+                    item["skills_required"] = 5  # fails JobData validation
+                reply.append(item)
+        else:
+            reply = _extract(prompt.split("Job Description:\n", 1)[1].strip())
+        time.sleep(self.latency + self.per_item * max(1, len(batch)))
+        return SimpleNamespace(text=json.dumps(reply), usage_metadata=None)
+
+
+def _stored(ids: list[int]) -> list[dict]:
+    return [row["structured_data"] for row in db.get_jobs(ids, columns=("structured_data",))]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--jds", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.3, help="seconds per request")
+    parser.add_argument("--per-item", type=float, default=0.01, help="extra seconds per JD in a reply")
+    parser.add_argument("--bad-rate", type=float, default=0.05, help="fraction of batched entries corrupted")
+    parser.add_argument("--feed", type=int, default=20000, help="feed size for the quota projection")
+    parser.add_argument("--rpm", type=int, default=10, help="requests per minute for the projection")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    jds = _synthetic_jds(args.jds, rng)
+    client._model = _FakeExtractor(args.latency, args.per_item, args.bad_rate, rng)
+
+    stored = {}
+    print(f"{args.jds} JDs, {args.latency}s + {args.per_item}s/JD per request, "
+          f"{args.bad_rate:.0%} of batched entries invalid")
+    print(f"{'path':<10}{'requests':>10}{'s':>8}{'JDs/s':>8}{'failed':>8}"
+          f"{f'{args.feed:,} JDs at {args.rpm} RPM':>26}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for path in ("single", "batched"):
+            db.close_pool()
+            db.DB_PATH = os.path.join(tmp, f"{path}.db")
+            db.init_db()
+            requests = client.get_stats()["requests"]
+            errors = {}
+            start = time.perf_counter()
+            if path == "single":
+                ids = [job_extractor.process_job(jd)[0] for jd in jds]
+            else:
+                ids = job_extractor.ingest_job_descriptions(jds, embed=False, errors=errors)
+            elapsed = time.perf_counter() - start
+            requests = client.get_stats()["requests"] - requests
+            stored[path] = _stored([i for i in ids if i is not None])
+            projected_h = args.feed / args.jds * requests / args.rpm / 60
+            print(f"{path:<10}{requests:>10}{elapsed:>8.1f}{args.jds / elapsed:>8.1f}{len(errors):>8}"
+                  f"{projected_h:>24.1f} h")
+        db.close_pool()
+    print(f"same structured data: {'yes' if stored['single'] == stored['batched'] else 'NO'}")
+
+
+if __name__ == "__main__":
+    main()
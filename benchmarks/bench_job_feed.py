@@ -0,0 +1,88 @@
+"""Job feed latency: rank_jobs_for_resume vs scoring every stored job.
+
+Builds a throwaway database of synthetic postings (see _synthetic),
+checks the feed's top-k against an exhaustive ranking, then times both.
+
+Usage: python benchmarks/bench_job_feed.py [--jobs 100000] [--k 20] [--resumes 20]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import db
+from match_engine import scorer
+
+import _synthetic
+
+
+def _exhaustive(resume_id: int, job_ids, k: int):
+    resume = db.get_resume(resume_id)
+    scored = []
+    for row in db.get_jobs(job_ids, ("structured_data", "embedding")):
+        job, res = row["structured_data"], resume["structured_data"]
+        sem = float(np.clip(scorer.compute_semantic_scores(resume["embedding"], row["embedding"][None])[0], 0, 1))
+        final = scorer._weighted_score(
+            sem,
+            scorer.compute_skill_match(job["skills_required"], res["skills"])["match_percentage"],
+            scorer.compute_experience_match(job["experience_required"], res["experience_years"]),
+            scorer.compute_education_match(job["education_required"], res["education"]),
+            scorer.compute_tools_match(job["tools_required"], res["tools"])["match_percentage"],
+        )
+        scored.append((-round(min(final, 100.0), 1), row["id"]))
+    return [job_id for _, job_id in sorted(scored)[:k]]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--jobs", type=int, default=100000)
+    parser.add_argument("--k", type=int, default=20)
+    parser.add_argument("--resumes", type=int, default=20)
+    parser.add_argument("--check", type=int, default=3, help="resumes to verify against an exhaustive scan")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    centers = _synthetic.centers(max(args.jobs // 200, 8), rng)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db.close_pool()
+        db.DB_PATH = os.path.join(tmp, "jobs.db")
+        db.init_db()
+        start = time.perf_counter()
+        job_ids = db.save_jobs_bulk(_synthetic.jobs(0, args.jobs, centers, rng))
+        print(f"inserted {args.jobs:,} jobs in {time.perf_counter() - start:.1f}s")
+
+        resume_ids = [db.save_resume(*item) for item in _synthetic.resumes(0, args.resumes, centers, rng)]
+
+        start = time.perf_counter()
+        scorer.warm_job_features()
+        print(f"cold start (opens the job store, builds the feature cache; app.py does this at startup): "
+              f"{(time.perf_counter() - start) * 1000:,.0f} ms")
+        start = time.perf_counter()
+        scorer.rank_jobs_for_resume(resume_ids[0], args.k)
+        print(f"first call after warm-up: {(time.perf_counter() - start) * 1000:,.0f} ms")
+        timings = []
+        for resume_id in resume_ids:
+            start = time.perf_counter()
+            scorer.rank_jobs_for_resume(resume_id, args.k)
+            timings.append((time.perf_counter() - start) * 1000)
+        print(f"rank_jobs_for_resume k={args.k}: median {np.median(timings):.1f} ms, "
+              f"max {max(timings):.1f} ms over {len(timings)} resumes")
+
+        for resume_id in resume_ids[:args.check]:
+            start = time.perf_counter()
+            expected = _exhaustive(resume_id, job_ids, args.k)
+            elapsed = time.perf_counter() - start
+            got = [job_id for job_id, _ in scorer.rank_jobs_for_resume(resume_id, args.k)]
+            print(f"resume {resume_id}: exhaustive scan {elapsed * 1000:,.0f} ms, "
+                  f"top-{args.k} {'identical' if got == expected else 'DIFFERENT'}")
+        db.close_pool()
+
+
+if __name__ == "__main__":
+    main()
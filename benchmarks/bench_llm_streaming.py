@@ -0,0 +1,80 @@
+"""Time to first token: generate vs generate_stream.
+
+Runs both through llm_module.client against a stand-in model that produces
+its reply in chunks at a fixed rate (no API key or network needed), and
+reports time to first token and total time for each. With the blocking call
+nothing can be shown until the whole reply is in; streamed, the first chunk
+arrives after the model's first-chunk latency.
+
+Usage: python benchmarks/bench_llm_streaming.py [--chunks 40] [--first-delay 0.4] [--chunk-delay 0.05] [--runs 3]
+"""
+import argparse
+import os
+import sys
+import time
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from llm_module import client
+
+
+class _ChunkedModel:
+    """Answers after ``first_delay`` seconds, then one chunk every ``chunk_delay`` seconds."""
+
+    def __init__(self, chunks: int, first_delay: float, chunk_delay: float):
+        self.chunks = chunks
+        self.first_delay = first_delay
+        self.chunk_delay = chunk_delay
+
+    def _stream(self):
+        time.sleep(self.first_delay)
+        for i in range(self.chunks):
+            if i:
+                time.sleep(self.chunk_delay)
+            yield SimpleNamespace(text=f"word{i} ")
+
+    def generate_content(self, prompt, generation_config=None, stream=False, request_options=None):
+        if stream:
+            return self._stream()
+        return SimpleNamespace(text="".join(chunk.text for chunk in self._stream()), usage_metadata=None)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--chunks", type=int, default=40)
+    parser.add_argument("--first-delay", type=float, default=0.4)
+    parser.add_argument("--chunk-delay", type=float, default=0.05)
+    parser.add_argument("--runs", type=int, default=3, help="runs per mode (keep 2 x runs within GEMINI_RPM)")
+    args = parser.parse_args()
+
+    client._model = _ChunkedModel(args.chunks, args.first_delay, args.chunk_delay)
+    prompt = "Explain the match."
+
+    print(f"{'mode':<10}{'ttft s':>10}{'total s':>10}")
+    for mode in ("blocking", "streaming"):
+        ttft = total = 0.0
+        for _ in range(args.runs):
+            start = time.perf_counter()
+            if mode == "blocking":
+                text = client.generate(prompt, cache=False)
+                first = time.perf_counter()
+            else:
+                first = None
+                parts = []
+                for chunk in client.generate_stream(prompt, cache=False):
+                    first = first or time.perf_counter()
+                    parts.append(chunk)
+                text = "".join(parts)
+            end = time.perf_counter()
+            assert text.count("word") == args.chunks
+            ttft += first - start
+            total += end - start
+        print(f"{mode:<10}{ttft / args.runs:>10.3f}{total / args.runs:>10.3f}")
+
+    print(f"client stats: {client.get_stats()['streams']} streams, "
+          f"mean time to first token {client.get_stats()['mean_ttft_seconds']}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""Per-pair calculate_match_score vs batch calculate_match_scores.
+
+Builds a throwaway database of one synthetic job and synthetic resumes
+(see _synthetic), with few embedding clusters so scores spread across the
+range. Checks that both paths agree on a sample, then times them at each
+corpus size. The per-pair rate
+is measured on a sample and extrapolated. Finally the threshold and top-k
+modes are timed on the largest corpus, with the fraction of pairs they
+pruned, and checked against filtering the full batch result.
+
+Usage: python benchmarks/bench_scorer.py [--sizes 1000 10000 100000] [--chunks] [--clusters 4] [--min-score 60] [--top-k 10]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import db
+from match_engine import scorer
+
+import _synthetic
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--sample", type=int, default=300)
+    parser.add_argument("--chunks", action="store_true", help="also store chunk embeddings")
+    parser.add_argument("--clusters", type=int, default=4, help="embedding clusters; 1 in this many resumes is near the job")
+    parser.add_argument("--min-score", type=float, default=60.0)
+    parser.add_argument("--top-k", type=int, default=10)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    with tempfile.TemporaryDirectory() as tmp:
+        db.close_pool()
+        db.DB_PATH = os.path.join(tmp, "bench.db")
+        db.init_db()
+        centers = _synthetic.centers(args.clusters, rng)
+        job_id = db.save_job(*next(_synthetic.jobs(0, 1, centers, rng, args.chunks)))
+
+        resume_ids = []
+        print(f"{'resumes':>9}{'per-pair s':>13}{'batch s':>10}{'speedup':>10}{'mismatches':>12}")
+        for size in sorted(args.sizes):
+            resume_ids += db.save_resumes_bulk(
+                _synthetic.resumes(len(resume_ids), size - len(resume_ids), centers, rng, args.chunks),
+            )
+
+            sample = resume_ids[:args.sample]
+            start = time.perf_counter()
+            pairwise = {rid: scorer.calculate_match_score(job_id, rid) for rid in sample}
+            per_pair = (time.perf_counter() - start) / len(sample) * len(resume_ids)
+
+            start = time.perf_counter()
+            batch = scorer.calculate_match_scores(job_id, resume_ids)
+            batch_s = time.perf_counter() - start
+
+            mismatches = sum(
+                batch[rid]["match_score"] != r["match_score"] or batch[rid]["result_data"] != r["result_data"]
+                or abs(batch[rid]["semantic_similarity"] - r["semantic_similarity"]) > 1e-4
+                for rid, r in pairwise.items()
+            )
+            print(f"{size:>9}{per_pair:>13.2f}{batch_s:>10.2f}{per_pair / batch_s:>9.1f}x{mismatches:>12}")
+        assert len(set(resume_ids)) == len(resume_ids) == len(batch), "resumes were merged on save"
+
+        ranked = sorted(batch.items(), key=lambda item: (-item[1]["match_score"], item[0]))
+        modes = {
+            f"min_score={args.min_score:g}": (
+                {"min_score": args.min_score},
+                [rid for rid, r in ranked if r["match_score"] >= args.min_score],
+            ),
+            f"top_k={args.top_k}": ({"top_k": args.top_k}, [rid for rid, _ in ranked[:args.top_k]]),
+        }
+        print(f"{'mode':<16}{'s':>8}{'pruned':>9}{'results':>9}{'same':>6}")
+        for name, (kwargs, expected) in modes.items():
+            stats = {}
+            start = time.perf_counter()
+            pruned = scorer.calculate_match_scores(job_id, resume_ids, stats=stats, **kwargs)
+            elapsed = time.perf_counter() - start
+            same = sorted(pruned) == sorted(expected) and all(pruned[rid] == batch[rid] for rid in pruned)
+            if "top_k" in kwargs:
+                same = same and list(pruned) == expected
+            print(f"{name:<16}{elapsed:>8.2f}{stats['pruned_fraction']:>9.1%}{len(pruned):>9}{'yes' if same else 'NO':>6}")
+        db.close_pool()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""Accuracy of quantized embedding storage against float32.
+
+For each storage mode, ranks a corpus against a set of queries with
+compute_semantic_scores and compares with the float32 ranking from
+compute_semantic_similarity's cosine.
+
+Usage:
+    python benchmarks/quantization_accuracy.py                 # synthetic clustered corpus
+    python benchmarks/quantization_accuracy.py --from-db        # stored resume embeddings
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import db
+from database.quantization import STORAGE_DTYPES, quantize
+from match_engine.scorer import compute_semantic_scores
+
+
+def _synthetic_corpus(n: int, dim: int, rng: np.random.Generator) -> np.ndarray:
+    # Clustered like real resume embeddings: similar roles sit close together.
+    centers = rng.standard_normal((max(n // 200, 8), dim))
+    labels = rng.integers(0, len(centers), n)
+    corpus = centers[labels] + 0.6 * rng.standard_normal((n, dim))
+    return corpus.astype(np.float32)
+
+
+def _ranks(scores: np.ndarray) -> np.ndarray:
+    ranks = np.empty(len(scores))
+    ranks[np.argsort(-scores, kind="stable")] = np.arange(len(scores))
+    return ranks
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--from-db", action="store_true")
+    parser.add_argument("--n", type=int, default=20000)
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("--k", type=int, default=10)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    if args.from_db:
+        db.init_db()
+        with db.connection() as conn:
+            blobs = [r[0] for r in conn.execute("SELECT embedding FROM resumes WHERE embedding IS NOT NULL")]
+        if len(blobs) < max(args.k, args.queries):
+            sys.exit("Not enough stored resume embeddings.")
+        corpus = np.stack([db.deserialize_embedding(b) for b in blobs])
+    else:
+        corpus = _synthetic_corpus(args.n, 384, rng)
+    queries = corpus[rng.choice(len(corpus), args.queries, replace=False)] + 0.3 * rng.standard_normal(
+        (args.queries, corpus.shape[1])
+    ).astype(np.float32)
+
+    normed = corpus / np.linalg.norm(corpus, axis=1, keepdims=True)
+    print(f"corpus: {len(corpus)} x {corpus.shape[1]}, queries: {args.queries}, k={args.k}\n")
+    print(f"{'mode':<9}{'blob bytes':>11}{'max |err|':>11}{'mean |err|':>12}{'spearman':>10}"
+          f"{f'recall@{args.k}':>11}{'ms/query':>10}")
+    for mode in STORAGE_DTYPES:
+        codes, _ = quantize(corpus, mode)
+        errs, rhos, recalls, elapsed = [], [], [], 0.0
+        for q in queries:
+            exact = normed @ (q / np.linalg.norm(q))
+            start = time.perf_counter()
+            approx = compute_semantic_scores(q, codes)
+            elapsed += time.perf_counter() - start
+            exact = np.clip(exact, 0.0, 1.0)
+            errs.append(np.abs(approx - exact))
+            rhos.append(np.corrcoef(_ranks(exact), _ranks(approx))[0, 1])
+            top_exact = set(np.argsort(-exact)[:args.k])
+            top_approx = set(np.argsort(-approx)[:args.k])
+            recalls.append(len(top_exact & top_approx) / args.k)
+        bytes_per_vec = len(db.serialize_embedding(corpus[0], mode))
+        errs = np.concatenate(errs)
+        print(f"{mode:<9}{bytes_per_vec:>11}{errs.max():>11.5f}{errs.mean():>12.6f}{np.mean(rhos):>10.5f}"
+              f"{np.mean(recalls):>11.3f}{elapsed / len(queries) * 1000:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
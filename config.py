@@ -6,8 +6,25 @@ load_dotenv()
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY", "")
 GEMINI_MODEL = "gemini-2.5-flash"
 EMBEDDING_MODEL = "all-MiniLM-L6-v2"
+EMBEDDING_DEVICE = os.getenv("EMBEDDING_DEVICE") or None
+EMBEDDING_NUM_THREADS = int(os.getenv("EMBEDDING_NUM_THREADS", "0"))
+EMBEDDING_WARMUP = os.getenv("EMBEDDING_WARMUP", "1") == "1"
+EMBEDDING_BATCH_SIZE = 32
+# "float32", "float16" or "int8" (per-vector scaled); see benchmarks/quantization_accuracy.py
+EMBEDDING_STORAGE_DTYPE = os.getenv("EMBEDDING_STORAGE_DTYPE", "float32")
+EMBEDDING_SORT_WINDOW = 8
+EMBEDDING_CACHE_ENABLED = os.getenv("EMBEDDING_CACHE_ENABLED", "1") == "1"
+EMBEDDING_CACHE_PATH = os.path.join(os.path.dirname(__file__), "database", "embedding_cache.db")
+EMBEDDING_CACHE_SIZE = 10000
+CHUNK_MAX_COUNT = 8
 
 DB_PATH = os.path.join(os.path.dirname(__file__), "database", "jobs.db")
+DB_POOL_SIZE = 8
+DB_POOL_TIMEOUT = 30
+DB_STATEMENT_CACHE = 256
+DB_CACHE_SIZE_KB = 65536
+DB_MMAP_SIZE = 256 * 1024 * 1024
+DB_BULK_CHUNK_SIZE = 1000
 
 SCORING_WEIGHTS = {
     "semantic": 0.40,
@@ -17,6 +34,44 @@ SCORING_WEIGHTS = {
     "tools": 0.05,
 }
 
+# "chunked" scores mean-of-max similarity over section chunks when both sides have them;
+# "single" always uses the one summary embedding per document.
+SEMANTIC_SIMILARITY_MODE = "chunked"
+SCORER_BLOCK_SIZE = 5000
+# Skills/tools whose name embeddings are at least this similar count as the same term
+# ("postgres" / "postgresql"). Alias pairs are stored at the threshold in force when a
+# term is first embedded, so lowering it later needs skill_synonyms.rebuild_aliases().
+SKILL_SYNONYMS_ENABLED = os.getenv("SKILL_SYNONYMS_ENABLED", "1") == "1"
+SKILL_SYNONYM_THRESHOLD = float(os.getenv("SKILL_SYNONYM_THRESHOLD", "0.80"))
+# Seconds a process trusts its cached alias table before checking for changes made elsewhere.
+SKILL_ALIASES_CHECK_SECONDS = 5
+# Resume retrieval: brute force below ANN_MIN_TRAIN_SIZE stored resumes, IVF index above.
+ANN_MIN_TRAIN_SIZE = 2000
+ANN_RETRAIN_GROWTH = 4
+ANN_NPROBE = 12
+ANN_SHORTLIST_SIZE = 200
+# Cross-product scoring (match_engine.cross_scoring): worker processes, and the
+# jobs x resumes each of them scores per task.
+CROSS_SCORING_WORKERS = max(1, (os.cpu_count() or 2) - 1)
+CROSS_SCORING_JOB_TILE = 32
+CROSS_SCORING_RESUME_TILE = 50000
+
 MAX_RETRIES = 3
+# Backoff before retry n is RETRY_DELAY * 2**n seconds (capped, with jitter), or
+# the server's retry-after when it sends one.
 RETRY_DELAY = 2
+RETRY_MAX_DELAY = 30
+# Process-wide Gemini quota shared by every LLM call (see llm_module.client).
+GEMINI_RPM = int(os.getenv("GEMINI_RPM", "10"))
+GEMINI_TPM = int(os.getenv("GEMINI_TPM", "250000"))
+GEMINI_REQUEST_TIMEOUT = 120
+# Gemini replies cached by (model, prompt, generation config); see llm_module.response_cache.
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "1") == "1"
+LLM_CACHE_PATH = os.path.join(os.path.dirname(__file__), "database", "llm_cache.db")
+LLM_CACHE_TTL_SECONDS = 7 * 24 * 3600
+LLM_CACHE_MAX_ENTRIES = 5000
+# Batched job-description extraction (job_module.job_extractor): JD text per
+# request, in estimated tokens, and JDs per request.
+JOB_EXTRACTION_BATCH_TOKENS = 16000
+JOB_EXTRACTION_BATCH_SIZE = 20
 DEFAULT_NUM_QUESTIONS = 5
@@ -0,0 +1,170 @@
+import os
+import threading
+
+import numpy as np
+
+from database.embedding_store import EmbeddingStore
+from database.quantization import cosine_scores
+
+
+_ASSIGN_DTYPE = np.dtype("<i4")
+_CHUNK_ROWS = 16384
+_TRAIN_SAMPLE = 50000
+_KMEANS_ITERS = 12
+
+
+def _unit(matrix: np.ndarray) -> np.ndarray:
+    matrix = np.asarray(matrix, dtype=np.float32)
+    norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+    return matrix / np.where(norms > 0, norms, 1.0)
+
+
+def _nearest(rows: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+    out = np.empty(len(rows), dtype=_ASSIGN_DTYPE)
+    for start in range(0, len(rows), _CHUNK_ROWS):
+        chunk = _unit(rows[start:start + _CHUNK_ROWS])
+        out[start:start + len(chunk)] = np.argmax(chunk @ centroids.T, axis=1)
+    return out
+
+
+def _spherical_kmeans(rows: np.ndarray, k: int, rng: np.random.Generator) -> np.ndarray:
+    x = _unit(rows)
+    centroids = x[rng.choice(len(x), k, replace=False)]
+    for _ in range(_KMEANS_ITERS):
+        assign = _nearest(x, centroids)
+        sums = np.zeros_like(centroids)
+        for start in range(0, len(x), _CHUNK_ROWS):
+            part = assign[start:start + _CHUNK_ROWS]
+            onehot = np.zeros((len(part), k), dtype=np.float32)
+            onehot[np.arange(len(part)), part] = 1.0
+            sums += onehot.T @ x[start:start + _CHUNK_ROWS]
+        counts = np.bincount(assign, minlength=k)
+        empty = counts == 0
+        if empty.any():
+            sums[empty] = x[rng.choice(len(x), int(empty.sum()), replace=False)]
+        centroids = _unit(sums)
+    return centroids
+
+
+class IVFIndex:
+    """Inverted-file approximate nearest-neighbour index over an EmbeddingStore.
+
+    Rows are clustered with spherical k-means into ~sqrt(N) lists; a query
+    scores the centroids, scans only the ``nprobe`` closest lists and ranks
+    those candidates exactly. Centroids are saved to ``<base>.ivf.npz``
+    together with the store size they were trained on, and each store row's list number is appended to ``<base>.ivf.assign`` in
+    store order, so a sync assigns just the rows appended since the last one
+    and a crash only leaves a short tail to reassign on the next sync.
+
+    Below ``min_train_size`` rows the index is untrained and searches are
+    exact brute force. It retrains when the store has grown by
+    ``retrain_growth`` times since the last training. Every search syncs
+    first, and a training that falls due there runs in a background thread.
+    """
+
+    def __init__(self, store: EmbeddingStore, base_path: str, min_train_size: int, retrain_growth: float):
+        self.store = store
+        self.centroids_path = base_path + ".ivf.npz"
+        self.assign_path = base_path + ".ivf.assign"
+        self.min_train_size = min_train_size
+        self.retrain_growth = retrain_growth
+        self._lock = threading.Lock()
+        self.centroids = None
+        self._assign = np.empty(0, dtype=_ASSIGN_DTYPE)
+        self._lists = None
+        self._training = None
+        if os.path.exists(self.centroids_path):
+            with np.load(self.centroids_path) as saved:
+                self.centroids = saved["centroids"]
+                self._trained_size = int(saved["trained_size"])
+            if os.path.exists(self.assign_path):
+                assign = np.fromfile(self.assign_path, dtype=_ASSIGN_DTYPE)
+                self._assign = assign[:len(self.store)]
+        self.sync(wait=False)
+
+    @property
+    def trained(self) -> bool:
+        return self.centroids is not None
+
+    def sync(self, wait: bool = True) -> None:
+        """Assign rows appended to the store since the last sync, retraining when due.
+
+        Training reads the whole store, so it runs in a background thread;
+        until it finishes, searches use the current lists and scan the rows
+        outside them exactly. ``wait`` blocks until any training is done and
+        its tail is assigned (for maintenance scripts and benchmarks).
+        """
+        with self._lock:
+            training = self._training
+            if training is None:
+                matrix = self.store.matrix()
+                count = len(matrix)
+                due = self.min_train_size if self.centroids is None else self._trained_size * self.retrain_growth
+                if count >= due:
+                    training = self._training = threading.Thread(target=self._train, daemon=True)
+                    training.start()
+                elif self.centroids is not None and count > len(self._assign):
+                    new = _nearest(matrix[len(self._assign):count], self.centroids)
+                    with open(self.assign_path, "ab") as f:
+                        f.truncate(len(self._assign) * _ASSIGN_DTYPE.itemsize)
+                        f.write(new.tobytes())
+                    self._assign = np.concatenate([self._assign, new])
+                    self._lists = None
+        if wait and training is not None:
+            training.join()
+            self.sync()
+
+    def _train(self) -> None:
+        try:
+            matrix = self.store.matrix()
+            count = len(matrix)
+            rng = np.random.default_rng(count)
+            sample = matrix[np.sort(rng.choice(count, min(count, _TRAIN_SAMPLE), replace=False))]
+            n_lists = int(np.clip(np.sqrt(count), 8, 4096))
+            centroids = _spherical_kmeans(sample, n_lists, rng)
+            assign = _nearest(matrix, centroids)
+
+            # Write both files beside their targets and swap them in, so a crash keeps the old index.
+            saves = ((self.centroids_path, lambda f: np.savez(f, centroids=centroids, trained_size=count)),
+                     (self.assign_path, lambda f: f.write(assign.tobytes())))
+            for path, save in saves:
+                with open(path + ".tmp", "wb") as f:
+                    save(f)
+            with self._lock:
+                for path, _ in saves:
+                    os.replace(path + ".tmp", path)
+                self.centroids = centroids
+                self._assign = assign
+                self._trained_size = count
+                self._lists = None
+        finally:
+            with self._lock:
+                self._training = None
+
+    def _inverted_lists(self) -> tuple[np.ndarray, np.ndarray]:
+        if self._lists is None:
+            order = np.argsort(self._assign, kind="stable")
+            bounds = np.concatenate([[0], np.cumsum(np.bincount(self._assign, minlength=len(self.centroids)))])
+            self._lists = (order, bounds)
+        return self._lists
+
+    def search(self, query: np.ndarray, k: int, nprobe: int) -> tuple[np.ndarray, np.ndarray]:
+        """Return ``(row_ids, cosine_scores)`` of the (approximate) top ``k`` rows, best first."""
+        self.sync(wait=False)
+        with self._lock:
+            matrix = self.store.matrix()
+            ids = self.store.ids()
+            if self.centroids is None:
+                candidates = np.arange(len(matrix))
+            else:
+                order, bounds = self._inverted_lists()
+                probe = np.argsort(-(self.centroids @ _unit(query)))[:nprobe]
+                candidates = np.concatenate([order[bounds[c]:bounds[c + 1]] for c in probe])
+                # Rows appended since the last sync are not in any list yet; scan them directly.
+                candidates = np.concatenate([candidates, np.arange(len(self._assign), len(matrix))])
+        if not len(candidates):
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+        candidates.sort()
+        scores = cosine_scores(query, matrix[candidates])
+        top = np.argsort(-scores, kind="stable")[:k]
+        return ids[candidates[top]], scores[top]
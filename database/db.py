@@ -1,19 +1,177 @@
 import sqlite3
 import json
+import hashlib
+import struct
+import unicodedata
+import queue
+import threading
+from contextlib import contextmanager
+from collections.abc import Mapping
+from itertools import islice
+from typing import Iterable, Sequence
+import os
 import numpy as np
 from datetime import datetime
-from config import DB_PATH
+from database.embedding_store import EmbeddingStore
+from database.ann_index import IVFIndex
+from database.quantization import quantize, dequantize
+from database.normalize import parse_experience_range, education_level
+from config import (
+    DB_PATH, DB_POOL_SIZE, DB_POOL_TIMEOUT, DB_STATEMENT_CACHE, DB_CACHE_SIZE_KB, DB_MMAP_SIZE,
+    DB_BULK_CHUNK_SIZE, EMBEDDING_STORAGE_DTYPE, ANN_MIN_TRAIN_SIZE, ANN_RETRAIN_GROWTH, ANN_NPROBE,
+)
 
 
-def _get_connection():
-    conn = sqlite3.connect(DB_PATH)
-    conn.row_factory = sqlite3.Row
-    conn.execute("PRAGMA foreign_keys = ON")
-    return conn
+_PRAGMAS = (
+    "PRAGMA journal_mode = WAL",
+    "PRAGMA synchronous = NORMAL",
+    "PRAGMA foreign_keys = ON",
+    "PRAGMA temp_store = MEMORY",
+    f"PRAGMA cache_size = -{DB_CACHE_SIZE_KB}",
+    f"PRAGMA mmap_size = {DB_MMAP_SIZE}",
+)
+
+
+class ConnectionPool:
+    """Thread-safe pool of long-lived SQLite connections.
+
+    Connections are opened lazily up to ``size`` and handed out LIFO so hot
+    connections keep their page cache and prepared-statement cache warm.
+    They run in autocommit mode; writes go through ``transaction()``.
+    """
+
+    def __init__(self, path: str, size: int = DB_POOL_SIZE, timeout: float = DB_POOL_TIMEOUT):
+        self.path = path
+        self.size = size
+        self.timeout = timeout
+        self._idle = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self._all = []
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(
+            self.path,
+            timeout=self.timeout,
+            isolation_level=None,
+            check_same_thread=False,
+            cached_statements=DB_STATEMENT_CACHE,
+        )
+        conn.row_factory = sqlite3.Row
+        for pragma in _PRAGMAS:
+            conn.execute(pragma)
+        return conn
+
+    def acquire(self) -> sqlite3.Connection:
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            if len(self._all) < self.size:
+                conn = self._connect()
+                self._all.append(conn)
+                return conn
+        try:
+            return self._idle.get(timeout=self.timeout)
+        except queue.Empty:
+            raise RuntimeError(f"Timed out waiting for a database connection after {self.timeout}s")
+
+    def release(self, conn: sqlite3.Connection) -> None:
+        if conn.in_transaction:
+            conn.rollback()
+        self._idle.put(conn)
+
+    def close(self) -> None:
+        with self._lock:
+            for conn in self._all:
+                conn.close()
+            self._all.clear()
+            self._idle = queue.LifoQueue()
+
+
+_pool = None
+_pool_lock = threading.Lock()
+_local = threading.local()
+
+
+def _get_pool() -> ConnectionPool:
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ConnectionPool(DB_PATH)
+    return _pool
+
+
+def close_pool() -> None:
+    """Close every pooled connection. The pool is recreated on next use."""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.close()
+            _pool = None
+
+
+@contextmanager
+def connection():
+    """Borrow a pooled connection for the current thread.
+
+    Nested calls on the same thread reuse the connection that is already
+    checked out, so helpers can be composed inside a ``transaction()``.
+    """
+    conn = getattr(_local, "conn", None)
+    if conn is not None:
+        yield conn
+        return
+    pool = _get_pool()
+    conn = pool.acquire()
+    _local.conn = conn
+    try:
+        yield conn
+    finally:
+        _local.conn = None
+        pool.release(conn)
+
+
+@contextmanager
+def transaction():
+    """Run a block of statements atomically.
+
+    Takes the write lock up front (``BEGIN IMMEDIATE``) so concurrent writers
+    queue on the busy timeout instead of failing on lock upgrade. Commits on
+    success and rolls back on error; nested use joins the outer transaction.
+    """
+    with connection() as conn:
+        if conn.in_transaction:
+            yield conn
+            return
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            # Vocabulary ids interned in this transaction are about to vanish.
+            _forget_vocab()
+            conn.rollback()
+            raise
+        conn.commit()
+
+
+_initialized_paths = set()
+_init_lock = threading.Lock()
 
 
 def init_db():
-    conn = _get_connection()
+    """Bring the schema up to date. Runs the migrations once per process per DB path."""
+    if DB_PATH in _initialized_paths:
+        return
+    with _init_lock:
+        if DB_PATH in _initialized_paths:
+            return
+        _migrate()
+        _initialized_paths.add(DB_PATH)
+
+
+def _create_tables(conn: sqlite3.Connection) -> None:
     cursor = conn.cursor()
 
     cursor.execute("""
@@ -73,179 +231,1102 @@ def init_db():
         )
     """)
 
-    conn.commit()
-    conn.close()
+
+# --------------- Schema migrations ---------------
+# Each entry upgrades the schema by one version and is applied in its own
+# transaction. Steps are SQL strings or callables taking the connection.
+# Never edit a released migration; append a new one.
+
+MIGRATIONS = [
+    (1, [_create_tables]),
+    (2, [
+        "CREATE INDEX IF NOT EXISTS idx_match_results_job_resume ON match_results (job_id, resume_id)",
+        "CREATE INDEX IF NOT EXISTS idx_match_results_resume ON match_results (resume_id)",
+        "CREATE INDEX IF NOT EXISTS idx_gap_analyses_match ON gap_analyses (match_id, id)",
+        "CREATE INDEX IF NOT EXISTS idx_interview_sessions_match ON interview_sessions (match_id, id)",
+    ]),
+    (3, [
+        "ALTER TABLE jobs ADD COLUMN content_hash TEXT",
+        "ALTER TABLE resumes ADD COLUMN content_hash TEXT",
+        lambda conn: _backfill_content_hashes(conn, "jobs"),
+        lambda conn: _backfill_content_hashes(conn, "resumes"),
+        "CREATE UNIQUE INDEX IF NOT EXISTS idx_jobs_content_hash ON jobs (content_hash)",
+        "CREATE UNIQUE INDEX IF NOT EXISTS idx_resumes_content_hash ON resumes (content_hash)",
+    ]),
+    (4, [
+        "ALTER TABLE jobs ADD COLUMN chunk_embeddings BLOB",
+        "ALTER TABLE resumes ADD COLUMN chunk_embeddings BLOB",
+    ]),
+    (5, [
+        """
+        CREATE TABLE IF NOT EXISTS skill_vocab (
+            id INTEGER PRIMARY KEY,
+            name TEXT NOT NULL UNIQUE
+        )
+        """,
+        "ALTER TABLE jobs ADD COLUMN skill_ids BLOB",
+        "ALTER TABLE jobs ADD COLUMN tool_ids BLOB",
+        "ALTER TABLE resumes ADD COLUMN skill_ids BLOB",
+        "ALTER TABLE resumes ADD COLUMN tool_ids BLOB",
+        lambda conn: _backfill_term_ids(conn, "jobs"),
+        lambda conn: _backfill_term_ids(conn, "resumes"),
+    ]),
+    (6, [
+        "ALTER TABLE skill_vocab ADD COLUMN embedding BLOB",
+        """
+        CREATE TABLE IF NOT EXISTS skill_aliases (
+            term_id INTEGER NOT NULL,
+            alias_id INTEGER NOT NULL,
+            similarity REAL NOT NULL,
+            PRIMARY KEY (term_id, alias_id)
+        ) WITHOUT ROWID
+        """,
+    ]),
+    (7, [
+        "ALTER TABLE match_results ADD COLUMN skill_score REAL",
+        "ALTER TABLE match_results ADD COLUMN experience_score REAL",
+        "ALTER TABLE match_results ADD COLUMN education_score REAL",
+        "ALTER TABLE match_results ADD COLUMN tools_score REAL",
+        "ALTER TABLE match_results ADD COLUMN weights_version TEXT",
+        lambda conn: _backfill_match_components(conn),
+    ]),
+    (8, [
+        "ALTER TABLE jobs ADD COLUMN experience_years_min REAL",
+        "ALTER TABLE jobs ADD COLUMN experience_years_max REAL",
+        "ALTER TABLE jobs ADD COLUMN education_level INTEGER",
+        "ALTER TABLE resumes ADD COLUMN experience_years_min REAL",
+        "ALTER TABLE resumes ADD COLUMN experience_years_max REAL",
+        "ALTER TABLE resumes ADD COLUMN education_level INTEGER",
+        lambda conn: _backfill_profiles(conn, "jobs"),
+        lambda conn: _backfill_profiles(conn, "resumes"),
+        "CREATE INDEX IF NOT EXISTS idx_resumes_education_experience "
+        "ON resumes (education_level, experience_years_min)",
+    ]),
+    (9, [
+        """
+        CREATE TABLE IF NOT EXISTS scoring_runs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            params TEXT NOT NULL,
+            status TEXT NOT NULL DEFAULT 'running',
+            tiles_total INTEGER NOT NULL,
+            tiles_done INTEGER NOT NULL DEFAULT 0,
+            rows_written INTEGER NOT NULL DEFAULT 0,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS scoring_run_tiles (
+            run_id INTEGER NOT NULL REFERENCES scoring_runs (id),
+            tile INTEGER NOT NULL,
+            rows_written INTEGER NOT NULL,
+            PRIMARY KEY (run_id, tile)
+        ) WITHOUT ROWID
+        """,
+    ]),
+    (10, [
+        """
+        CREATE TABLE IF NOT EXISTS resume_optimizations (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            match_id INTEGER NOT NULL,
+            optimization_data TEXT NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (match_id) REFERENCES match_results(id)
+        )
+        """,
+        "CREATE INDEX IF NOT EXISTS idx_resume_optimizations_match ON resume_optimizations (match_id, id)",
+    ]),
+    # Rows stored before this keep a NULL scorer_settings and are never re-weighted.
+    (11, [
+        "ALTER TABLE match_results ADD COLUMN scorer_settings TEXT",
+    ]),
+    (12, [
+        """
+        CREATE TABLE IF NOT EXISTS skill_alias_version (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            version INTEGER NOT NULL
+        )
+        """,
+        "INSERT OR IGNORE INTO skill_alias_version (id, version) VALUES (1, 0)",
+    ]),
+]
+
+
+def get_schema_version() -> int:
+    with connection() as conn:
+        return _schema_version(conn)
+
+
+def _schema_version(conn: sqlite3.Connection) -> int:
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS schema_version (
+            version INTEGER PRIMARY KEY,
+            applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    return conn.execute("SELECT COALESCE(MAX(version), 0) FROM schema_version").fetchone()[0]
+
+
+def _backfill_content_hashes(conn: sqlite3.Connection, table: str) -> None:
+    # Older duplicates keep a NULL hash so the unique index can still be built.
+    seen = set()
+    updates = []
+    for row_id, raw_text in conn.execute(f"SELECT id, raw_text FROM {table} ORDER BY id"):
+        digest = content_hash(raw_text)
+        if digest not in seen:
+            seen.add(digest)
+            updates.append((digest, row_id))
+    conn.executemany(f"UPDATE {table} SET content_hash = ? WHERE id = ?", updates)
+
+
+def _backfill_term_ids(conn: sqlite3.Connection, table: str) -> None:
+    rows = conn.execute(f"SELECT id, structured_data FROM {table}").fetchall()
+    blobs = _term_id_blobs(conn, table, [json.loads(r[1]) for r in rows])
+    conn.executemany(
+        f"UPDATE {table} SET skill_ids = ?, tool_ids = ? WHERE id = ?",
+        [(skill_blob, tool_blob, r[0]) for r, (skill_blob, tool_blob) in zip(rows, blobs)],
+    )
+
+
+def _backfill_match_components(conn: sqlite3.Connection) -> None:
+    # Rows from before this migration keep a NULL weights_version: the weights that produced them are unknown.
+    rows = conn.execute("SELECT id, result_data FROM match_results").fetchall()
+    conn.executemany(
+        "UPDATE match_results SET skill_score = ?, experience_score = ?, education_score = ?, tools_score = ? "
+        "WHERE id = ?",
+        [(*_match_components(json.loads(r[1])), r[0]) for r in rows],
+    )
+
+
+def _backfill_profiles(conn: sqlite3.Connection, table: str, only_missing: bool = False) -> int:
+    where = " WHERE education_level IS NULL" if only_missing else ""
+    rows = conn.execute(f"SELECT id, structured_data FROM {table}{where}").fetchall()
+    profiles = _profile_values(table, [json.loads(r[1]) for r in rows])
+    conn.executemany(
+        f"UPDATE {table} SET experience_years_min = ?, experience_years_max = ?, education_level = ? WHERE id = ?",
+        [(*profile, r[0]) for r, profile in zip(rows, profiles)],
+    )
+    return len(rows)
+
+
+def _migrate() -> None:
+    for version, steps in MIGRATIONS:
+        with transaction() as conn:
+            # Re-read inside the write lock so concurrent processes apply each step once.
+            if _schema_version(conn) >= version:
+                continue
+            for step in steps:
+                if callable(step):
+                    step(conn)
+                else:
+                    conn.execute(step)
+            conn.execute("INSERT INTO schema_version (version) VALUES (?)", (version,))
+    _table_columns.clear()
+
+
+# --------------- Content hashing ---------------
+
+def content_hash(text: str) -> str:
+    """SHA-256 of ``text`` after Unicode, case and whitespace normalization.
+
+    Two submissions that differ only in formatting (re-pasted JD, re-exported
+    PDF) hash the same, which is what deduplication wants.
+    """
+    normalized = " ".join(unicodedata.normalize("NFKC", text).casefold().split())
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+
+def _find_by_hash(table: str, digest: str, columns: Sequence[str] | None) -> "LazyRow | None":
+    with connection() as conn:
+        row = conn.execute(
+            f"SELECT {_select_list(table, columns)} FROM {table} WHERE content_hash = ?", (digest,),
+        ).fetchone()
+    return LazyRow(row) if row is not None else None
+
+
+def _insert_deduplicated(conn: sqlite3.Connection, table: str, sql: str, rows: list,
+                         hashes: list) -> list[int]:
+    """Insert the rows whose hash is new and return an id for every input row.
+
+    Rows matching an existing hash, or an earlier row of the same chunk,
+    resolve to that row's id instead of being inserted.
+    """
+    placeholders = ",".join("?" * len(hashes))
+    known = dict(conn.execute(
+        f"SELECT content_hash, id FROM {table} WHERE content_hash IN ({placeholders})", hashes,
+    ).fetchall())
+    fresh_rows, fresh_hashes = [], []
+    for row, digest in zip(rows, hashes):
+        if digest not in known:
+            known[digest] = None
+            fresh_rows.append(row)
+            fresh_hashes.append(digest)
+    if fresh_rows:
+        known.update(zip(fresh_hashes, _insert_many(conn, sql, fresh_rows)))
+    return [known[digest] for digest in hashes]
+
+
+# --------------- Experience and education ---------------
+# Parsed once at ingest into experience_years_min/max (max is NULL for "5+",
+# both NULL when unparseable) and education_level (see EDUCATION_LEVELS), so
+# scoring and filters work on numbers instead of re-reading free text.
+
+# structured_data keys holding (experience, education) for each table
+_PROFILE_FIELDS = {"jobs": ("experience_required", "education_required"), "resumes": ("experience_years", "education")}
+
+
+def _profile_values(table: str, structured: list[dict]) -> list[tuple]:
+    """``(experience_years_min, experience_years_max, education_level)`` for each structured_data dict."""
+    exp_field, edu_field = _PROFILE_FIELDS[table]
+    return [
+        (*parse_experience_range(data.get(exp_field, "")), education_level(data.get(edu_field, "")))
+        for data in structured
+    ]
+
+
+def backfill_profiles(only_missing: bool = False) -> dict[str, int]:
+    """Re-derive the experience/education columns from structured_data. Returns rows updated per table.
+
+    Migration 8 runs this once. Run it again after changing the parsing rules
+    in database/normalize.py, or with ``only_missing`` to fill rows written
+    by an older version of the app.
+    """
+    init_db()
+    updated = {}
+    for table in ("jobs", "resumes"):
+        with transaction() as conn:
+            updated[table] = _backfill_profiles(conn, table, only_missing)
+    return updated
+
+
+def filter_resume_ids(min_education_level: int = 0, min_years: float = 0.0,
+                      resume_ids: Iterable[int] | None = None) -> list[int]:
+    """Ids of resumes at or above an education level and years of experience, in id order.
+
+    Years are compared the way the scorer reads them (range midpoint, or the
+    lower bound of "5+"); resumes without a parseable figure count as 0.
+    Resumes whose education level was never parsed (NULL until
+    backfill_profiles runs) count as level -1, so only a negative
+    ``min_education_level`` keeps them.
+    Pass ``resume_ids`` to filter an existing candidate list instead of the table.
+    """
+    # The plain comparison keeps the (education_level, ...) index usable.
+    level = "education_level" if min_education_level >= 0 else "COALESCE(education_level, -1)"
+    sql = (
+        f"SELECT id FROM resumes WHERE {level} >= ? "
+        "AND COALESCE((experience_years_min + COALESCE(experience_years_max, experience_years_min)) / 2, 0) >= ?"
+    )
+    with connection() as conn:
+        if resume_ids is None:
+            return [r[0] for r in conn.execute(sql + " ORDER BY id", (min_education_level, min_years))]
+        ids = []
+        for chunk in _chunks(resume_ids, DB_BULK_CHUNK_SIZE):
+            placeholders = ",".join("?" * len(chunk))
+            ids.extend(r[0] for r in conn.execute(
+                f"{sql} AND id IN ({placeholders}) ORDER BY id", (min_education_level, min_years, *chunk),
+            ))
+        return sorted(ids)
+
+
+# --------------- Skill vocabulary ---------------
+# Skill and tool names are interned into one ``skill_vocab`` table at ingest.
+# Jobs and resumes store their skills and tools as sorted little-endian int32
+# id arrays, so matching is set arithmetic on integers; names are only looked
+# up again for display. Ids are cached per database in both directions.
+# Terms are embedded once and near-synonym pairs kept in ``skill_aliases``
+# (see match_engine/skill_synonyms.py).
+
+_TERM_ID_DTYPE = np.dtype("<i4")
+# structured_data keys holding (skills, tools) for each table
+_TERM_FIELDS = {"jobs": ("skills_required", "tools_required"), "resumes": ("skills", "tools")}
+_vocab_ids = {}
+_vocab_names = {}
+
+
+def normalize_term(term: str) -> str:
+    """Canonical spelling of a skill or tool name."""
+    return term.lower().strip()
+
+
+def _forget_vocab() -> None:
+    _vocab_ids.pop(DB_PATH, None)
+    _vocab_names.pop(DB_PATH, None)
+
+
+def _load_term_ids(conn: sqlite3.Connection, names: list[str], cache: dict) -> None:
+    for chunk in _chunks(names, DB_BULK_CHUNK_SIZE):
+        placeholders = ",".join("?" * len(chunk))
+        for term_id, name in conn.execute(f"SELECT id, name FROM skill_vocab WHERE name IN ({placeholders})", chunk):
+            cache[name] = term_id
+
+
+def _intern_terms(conn: sqlite3.Connection, names: Iterable[str]) -> dict[str, int]:
+    """Return the name -> id cache after adding any of ``names`` not yet in ``skill_vocab``."""
+    cache = _vocab_ids.setdefault(DB_PATH, {})
+    missing = list({n for n in names if n not in cache})
+    if missing:
+        conn.executemany("INSERT OR IGNORE INTO skill_vocab (name) VALUES (?)", [(n,) for n in missing])
+        _load_term_ids(conn, missing, cache)
+    return cache
+
+
+def _term_id_blobs(conn: sqlite3.Connection, table: str, structured: list[dict]) -> list[tuple[bytes, bytes]]:
+    """``(skill_ids, tool_ids)`` blobs for each structured_data dict of ``table``, interning new names."""
+    fields = _TERM_FIELDS[table]
+    normalized = [[{normalize_term(t) for t in data.get(field, [])} for field in fields] for data in structured]
+    cache = _intern_terms(conn, (n for row in normalized for names in row for n in names))
+    return [
+        tuple(np.array(sorted(cache[n] for n in names), dtype=_TERM_ID_DTYPE).tobytes() for names in row)
+        for row in normalized
+    ]
+
+
+def deserialize_term_ids(blob: bytes) -> np.ndarray:
+    """Sorted int32 term ids from a ``skill_ids`` / ``tool_ids`` blob."""
+    return np.frombuffer(blob, dtype=_TERM_ID_DTYPE)
+
+
+def get_term_ids(names: Iterable[str]) -> np.ndarray:
+    """Sorted ids of the interned terms among ``names``; unknown names are left out."""
+    cache = _vocab_ids.setdefault(DB_PATH, {})
+    normalized = {normalize_term(n) for n in names}
+    missing = [n for n in normalized if n not in cache]
+    if missing:
+        with connection() as conn:
+            _load_term_ids(conn, missing, cache)
+    return np.array(sorted(cache[n] for n in normalized if n in cache), dtype=_TERM_ID_DTYPE)
+
+
+def get_term_names(term_ids: Iterable[int]) -> list[str]:
+    """Names for ``term_ids``, in the same order."""
+    term_ids = [int(i) for i in term_ids]
+    cache = _vocab_names.setdefault(DB_PATH, {})
+    missing = list({i for i in term_ids if i not in cache})
+    if missing:
+        with connection() as conn:
+            for chunk in _chunks(missing, DB_BULK_CHUNK_SIZE):
+                placeholders = ",".join("?" * len(chunk))
+                for term_id, name in conn.execute(
+                    f"SELECT id, name FROM skill_vocab WHERE id IN ({placeholders})", chunk,
+                ):
+                    cache[term_id] = name
+    return [cache[i] for i in term_ids]
+
+
+def get_alias_version() -> int:
+    """Counter bumped by every save_term_embeddings, so alias caches can tell they are stale."""
+    with connection() as conn:
+        return conn.execute("SELECT version FROM skill_alias_version").fetchone()[0]
+
+
+def get_unembedded_terms() -> list[tuple[int, str]]:
+    """``(id, name)`` of every term whose embedding has not been computed yet."""
+    with connection() as conn:
+        return [tuple(r) for r in conn.execute("SELECT id, name FROM skill_vocab WHERE embedding IS NULL ORDER BY id")]
+
+
+def get_term_embeddings() -> tuple[np.ndarray, np.ndarray]:
+    """``(ids, float32 matrix)`` of every term that has an embedding."""
+    with connection() as conn:
+        rows = conn.execute("SELECT id, embedding FROM skill_vocab WHERE embedding IS NOT NULL ORDER BY id").fetchall()
+    if not rows:
+        return np.empty(0, dtype=np.int64), np.empty((0, 0), dtype=np.float32)
+    return np.array([r[0] for r in rows], dtype=np.int64), np.stack([deserialize_embedding(r[1]) for r in rows])
+
+
+def save_term_embeddings(term_ids: Sequence[int], embeddings: Sequence[np.ndarray],
+                         aliases: Iterable[tuple[int, int, float]]) -> None:
+    """Store term embeddings together with the alias pairs resolved for those terms.
+
+    Both are written in one transaction, so a term that has an embedding
+    always has its aliases, and the alias version is bumped with them. Each
+    ``(term_id, alias_id, similarity)`` pair is stored in both directions.
+    """
+    with transaction() as conn:
+        conn.executemany(
+            "UPDATE skill_vocab SET embedding = ? WHERE id = ?",
+            [(serialize_embedding(e, dtype="float32"), int(i)) for i, e in zip(term_ids, embeddings)],
+        )
+        conn.executemany(
+            "INSERT OR REPLACE INTO skill_aliases (term_id, alias_id, similarity) VALUES (?, ?, ?)",
+            [pair for a, b, sim in aliases for pair in ((int(a), int(b), float(sim)), (int(b), int(a), float(sim)))],
+        )
+        conn.execute("UPDATE skill_alias_version SET version = version + 1")
+
+
+def get_skill_aliases(min_similarity: float) -> list[tuple[int, int]]:
+    """Every ``(term_id, alias_id)`` pair at or above ``min_similarity``."""
+    with connection() as conn:
+        return [tuple(r) for r in conn.execute(
+            "SELECT term_id, alias_id FROM skill_aliases WHERE similarity >= ?", (min_similarity,),
+        )]
 
 
 # --------------- Embedding helpers ---------------
 
-def serialize_embedding(embedding: np.ndarray) -> bytes:
-    return embedding.astype(np.float32).tobytes()
+# Quantized blobs carry a 4-byte tag; untagged blobs are plain float32 vectors,
+# so rows written before quantization existed keep decoding unchanged.
+_FLOAT16_TAG = b"EF16"
+_INT8_TAG = b"EQ8\0"
+
+
+def serialize_embedding(embedding: np.ndarray, dtype: str = EMBEDDING_STORAGE_DTYPE) -> bytes:
+    codes, scale = quantize(embedding, dtype)
+    if dtype == "float16":
+        return _FLOAT16_TAG + codes.tobytes()
+    if dtype == "int8":
+        return _INT8_TAG + np.float32(scale).tobytes() + codes.tobytes()
+    return codes.tobytes()
+
+
+def load_embedding_codes(blob: bytes) -> tuple[np.ndarray, np.ndarray | None]:
+    """Decode a blob to its stored ``(codes, scale)`` without dequantizing."""
+    tag = blob[:4]
+    if tag == _FLOAT16_TAG:
+        return np.frombuffer(blob, dtype=np.float16, offset=4), None
+    if tag == _INT8_TAG:
+        return np.frombuffer(blob, dtype=np.int8, offset=8), np.frombuffer(blob, dtype=np.float32, count=1, offset=4)[0]
+    return np.frombuffer(blob, dtype=np.float32), None
 
 
 def deserialize_embedding(blob: bytes) -> np.ndarray:
-    return np.frombuffer(blob, dtype=np.float32)
+    codes, scale = load_embedding_codes(blob)
+    if codes.dtype == np.float32:
+        return codes
+    return dequantize(codes, scale)
+
+
+_CHUNKS_HEADER = struct.Struct("<4sHH")  # tag, chunk count, dim
+_CHUNKS_TAG = b"EC16"
+
+
+def serialize_chunk_embeddings(chunks: np.ndarray) -> bytes:
+    """Pack a ``(k, dim)`` chunk-embedding matrix as float16 behind a small header."""
+    chunks = np.atleast_2d(np.asarray(chunks, dtype=np.float32))
+    return _CHUNKS_HEADER.pack(_CHUNKS_TAG, *chunks.shape) + chunks.astype(np.float16).tobytes()
+
+
+def deserialize_chunk_embeddings(blob: bytes) -> np.ndarray:
+    _, count, dim = _CHUNKS_HEADER.unpack_from(blob)
+    codes = np.frombuffer(blob, dtype=np.float16, offset=_CHUNKS_HEADER.size, count=count * dim)
+    return codes.astype(np.float32).reshape(count, dim)
+
+
+def _serialize_embeddings(embeddings: list, dtype: str = EMBEDDING_STORAGE_DTYPE) -> list:
+    """Serialize a chunk of embeddings with a single conversion pass."""
+    present = [i for i, e in enumerate(embeddings) if e is not None]
+    blobs = [None] * len(embeddings)
+    if present:
+        codes, scales = quantize(np.asarray([embeddings[i] for i in present], dtype=np.float32), dtype)
+        for n, (i, row) in enumerate(zip(present, codes)):
+            if dtype == "float16":
+                blobs[i] = _FLOAT16_TAG + row.tobytes()
+            elif dtype == "int8":
+                blobs[i] = _INT8_TAG + scales[n].tobytes() + row.tobytes()
+            else:
+                blobs[i] = row.tobytes()
+    return blobs
+
+
+# --------------- Embedding matrix stores ---------------
+# Jobs and resumes keep a memory-mapped copy of their embeddings next to the
+# database so the whole corpus can be scored as one matrix. SQLite stays the
+# source of truth: rows missing from a store are backfilled when it is opened.
+
+_stores = {}
+_stores_lock = threading.Lock()
+_ann_indexes = {}
+
+
+def get_embedding_store(table: str) -> EmbeddingStore:
+    """Return the embedding store for ``"jobs"`` or ``"resumes"``, synced with the table."""
+    if table not in ("jobs", "resumes"):
+        raise ValueError(f"No embedding store for table {table!r}")
+    key = (DB_PATH, table)
+    store = _stores.get(key)
+    if store is not None:
+        return store
+    with _stores_lock:
+        store = _stores.get(key)
+        if store is None:
+            init_db()
+            store = EmbeddingStore(
+                os.path.join(os.path.dirname(DB_PATH), f"{table}_embeddings"), dtype=EMBEDDING_STORAGE_DTYPE,
+            )
+            _backfill_store(store, table)
+            _stores[key] = store
+    return store
+
+
+def get_embedding_matrix(table: str) -> tuple[np.ndarray, np.ndarray]:
+    """Return ``(ids, matrix)`` for every stored embedding of ``table`` without copying."""
+    store = get_embedding_store(table)
+    matrix = store.matrix()
+    return store.ids()[:len(matrix)], matrix
+
+
+def get_resume_index() -> IVFIndex:
+    """Return the IVF index over the resume embedding store (it syncs with the store on each search)."""
+    store = get_embedding_store("resumes")
+    index = _ann_indexes.get(DB_PATH)
+    if index is None:
+        with _stores_lock:
+            index = _ann_indexes.get(DB_PATH)
+            if index is None:
+                index = IVFIndex(
+                    store, os.path.join(os.path.dirname(DB_PATH), "resumes_embeddings"),
+                    min_train_size=ANN_MIN_TRAIN_SIZE, retrain_growth=ANN_RETRAIN_GROWTH,
+                )
+                _ann_indexes[DB_PATH] = index
+    return index
+
+
+def search_resumes(query_embedding: np.ndarray, k: int, nprobe: int = ANN_NPROBE) -> list[tuple[int, float]]:
+    """Approximate top-``k`` resumes by cosine similarity to ``query_embedding``, best first."""
+    ids, scores = get_resume_index().search(np.asarray(query_embedding, dtype=np.float32), k, nprobe)
+    return [(int(i), float(s)) for i, s in zip(ids, scores)]
+
+
+def _backfill_store(store: EmbeddingStore, table: str) -> None:
+    with connection() as conn:
+        db_ids = [r[0] for r in conn.execute(f"SELECT id FROM {table} WHERE embedding IS NOT NULL")]
+        missing = [i for i in db_ids if i not in store]
+        for chunk in _chunks(missing, DB_BULK_CHUNK_SIZE):
+            placeholders = ",".join("?" * len(chunk))
+            rows = conn.execute(
+                f"SELECT id, embedding FROM {table} WHERE id IN ({placeholders}) ORDER BY id", chunk,
+            ).fetchall()
+            store.append([r[0] for r in rows], [deserialize_embedding(r[1]) for r in rows])
+
+
+def _store_embeddings(table: str, row_ids: list, embeddings: list) -> None:
+    store = get_embedding_store(table)
+    pairs = [(i, e) for i, e in zip(row_ids, embeddings) if e is not None]
+    if pairs:
+        store.append([i for i, _ in pairs], [e for _, e in pairs])
+
+
+# --------------- Bulk helpers ---------------
+
+def _chunks(items: Iterable, size: int):
+    it = iter(items)
+    while True:
+        chunk = list(islice(it, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _optional_chunks_blob(item: tuple, index: int) -> bytes | None:
+    chunks = item[index] if len(item) > index else None
+    return serialize_chunk_embeddings(chunks) if chunks is not None else None
+
+
+def _placeholders(columns: str) -> str:
+    return ",".join("?" * len(columns.split(",")))
+
+
+def _insert_many(conn: sqlite3.Connection, sql: str, rows: list) -> list[int]:
+    """executemany() a chunk and return the ids it was assigned.
+
+    The caller holds the write lock for the whole chunk, so AUTOINCREMENT
+    hands out a contiguous id range ending at last_insert_rowid().
+    """
+    conn.executemany(sql, rows)
+    last_id = conn.execute("SELECT last_insert_rowid()").fetchone()[0]
+    return list(range(last_id - len(rows) + 1, last_id + 1))
 
 
 # --------------- Jobs ---------------
 
-def save_job(raw_text: str, structured_data: dict, embedding: np.ndarray = None) -> int:
-    conn = _get_connection()
+_JOB_COLUMNS = (
+    "raw_text, structured_data, embedding, chunk_embeddings, content_hash, skill_ids, tool_ids, "
+    "experience_years_min, experience_years_max, education_level"
+)
+
+
+def save_job(raw_text: str, structured_data: dict, embedding: np.ndarray = None,
+             chunk_embeddings: np.ndarray = None) -> int:
+    """Store a job and return its id. Re-saving identical content returns the existing id."""
     emb_blob = serialize_embedding(embedding) if embedding is not None else None
-    cursor = conn.execute(
-        "INSERT INTO jobs (raw_text, structured_data, embedding) VALUES (?, ?, ?)",
-        (raw_text, json.dumps(structured_data), emb_blob),
-    )
-    conn.commit()
-    job_id = cursor.lastrowid
-    conn.close()
+    chunks_blob = serialize_chunk_embeddings(chunk_embeddings) if chunk_embeddings is not None else None
+    digest = content_hash(raw_text)
+    with transaction() as conn:
+        skill_blob, tool_blob = _term_id_blobs(conn, "jobs", [structured_data])[0]
+        try:
+            cursor = conn.execute(
+                f"INSERT INTO jobs ({_JOB_COLUMNS}) VALUES ({_placeholders(_JOB_COLUMNS)})",
+                (raw_text, json.dumps(structured_data), emb_blob, chunks_blob, digest, skill_blob, tool_blob,
+                 *_profile_values("jobs", [structured_data])[0]),
+            )
+        except sqlite3.IntegrityError:
+            return conn.execute("SELECT id FROM jobs WHERE content_hash = ?", (digest,)).fetchone()[0]
+        job_id = cursor.lastrowid
+    _store_embeddings("jobs", [job_id], [embedding])
     return job_id
 
 
-def get_job(job_id: int) -> dict | None:
-    conn = _get_connection()
-    row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
-    conn.close()
+def save_jobs_bulk(jobs: Iterable, chunk_size: int = DB_BULK_CHUNK_SIZE) -> list[int]:
+    """Insert many jobs, one transaction per chunk.
+
+    ``jobs`` yields ``(raw_text, structured_data, embedding)`` tuples, optionally
+    followed by a chunk-embedding matrix, and may be a generator. Returns the assigned ids in input order; duplicate content
+    resolves to the id of the row already stored.
+    """
+    ids = []
+    for chunk in _chunks(jobs, chunk_size):
+        blobs = _serialize_embeddings([item[2] for item in chunk])
+        hashes = [content_hash(item[0]) for item in chunk]
+        with transaction() as conn:
+            term_blobs = _term_id_blobs(conn, "jobs", [item[1] for item in chunk])
+            rows = [
+                (item[0], json.dumps(item[1]), blob, _optional_chunks_blob(item, 3), digest, *terms, *profile)
+                for item, blob, digest, terms, profile in zip(
+                    chunk, blobs, hashes, term_blobs, _profile_values("jobs", [item[1] for item in chunk]),
+                )
+            ]
+            chunk_ids = _insert_deduplicated(
+                conn, "jobs", f"INSERT INTO jobs ({_JOB_COLUMNS}) VALUES ({_placeholders(_JOB_COLUMNS)})",
+                rows, hashes,
+            )
+        _store_embeddings("jobs", chunk_ids, [item[2] for item in chunk])
+        ids.extend(chunk_ids)
+    return ids
+
+
+def get_job(job_id: int, columns: Sequence[str] | None = None) -> "LazyRow | None":
+    with connection() as conn:
+        row = conn.execute(f"SELECT {_select_list('jobs', columns)} FROM jobs WHERE id = ?", (job_id,)).fetchone()
     if row is None:
         return None
-    return _row_to_dict(row)
+    return LazyRow(row)
+
+
+def get_jobs(ids: Iterable[int], columns: Sequence[str] | None = None) -> list["LazyRow"]:
+    """Fetch many jobs in id order, only reading the requested columns."""
+    return _get_many("jobs", ids, columns)
+
+
+def iter_jobs_after(last_id: int, columns: Sequence[str] | None = None,
+                    chunk_size: int = DB_BULK_CHUNK_SIZE):
+    """Yield every job with an id above ``last_id`` in id order, ``chunk_size`` rows per query."""
+    return _iter_after("jobs", last_id, columns, chunk_size)
 
 
-def get_latest_job() -> dict | None:
-    conn = _get_connection()
-    row = conn.execute("SELECT * FROM jobs ORDER BY id DESC LIMIT 1").fetchone()
-    conn.close()
+def find_job_by_content(raw_text: str, columns: Sequence[str] | None = None) -> "LazyRow | None":
+    """Return the stored job whose normalized text matches ``raw_text``, if any."""
+    return _find_by_hash("jobs", content_hash(raw_text), columns)
+
+
+def get_latest_job(columns: Sequence[str] | None = None) -> "LazyRow | None":
+    with connection() as conn:
+        row = conn.execute(f"SELECT {_select_list('jobs', columns)} FROM jobs ORDER BY id DESC LIMIT 1").fetchone()
     if row is None:
         return None
-    return _row_to_dict(row)
+    return LazyRow(row)
 
 
 # --------------- Resumes ---------------
 
-def save_resume(filename: str, raw_text: str, structured_data: dict, embedding: np.ndarray = None) -> int:
-    conn = _get_connection()
+_RESUME_COLUMNS = (
+    "filename, raw_text, structured_data, embedding, chunk_embeddings, content_hash, skill_ids, tool_ids, "
+    "experience_years_min, experience_years_max, education_level"
+)
+
+
+def save_resume(filename: str, raw_text: str, structured_data: dict, embedding: np.ndarray = None,
+                chunk_embeddings: np.ndarray = None) -> int:
+    """Store a resume and return its id. Re-saving identical text returns the existing id."""
     emb_blob = serialize_embedding(embedding) if embedding is not None else None
-    cursor = conn.execute(
-        "INSERT INTO resumes (filename, raw_text, structured_data, embedding) VALUES (?, ?, ?, ?)",
-        (filename, raw_text, json.dumps(structured_data), emb_blob),
-    )
-    conn.commit()
-    resume_id = cursor.lastrowid
-    conn.close()
+    chunks_blob = serialize_chunk_embeddings(chunk_embeddings) if chunk_embeddings is not None else None
+    digest = content_hash(raw_text)
+    with transaction() as conn:
+        skill_blob, tool_blob = _term_id_blobs(conn, "resumes", [structured_data])[0]
+        try:
+            cursor = conn.execute(
+                f"INSERT INTO resumes ({_RESUME_COLUMNS}) VALUES ({_placeholders(_RESUME_COLUMNS)})",
+                (filename, raw_text, json.dumps(structured_data), emb_blob, chunks_blob, digest,
+                 skill_blob, tool_blob, *_profile_values("resumes", [structured_data])[0]),
+            )
+        except sqlite3.IntegrityError:
+            return conn.execute("SELECT id FROM resumes WHERE content_hash = ?", (digest,)).fetchone()[0]
+        resume_id = cursor.lastrowid
+    _store_embeddings("resumes", [resume_id], [embedding])
     return resume_id
 
 
-def get_resume(resume_id: int) -> dict | None:
-    conn = _get_connection()
-    row = conn.execute("SELECT * FROM resumes WHERE id = ?", (resume_id,)).fetchone()
-    conn.close()
+def save_resumes_bulk(resumes: Iterable, chunk_size: int = DB_BULK_CHUNK_SIZE) -> list[int]:
+    """Insert many resumes, one transaction per chunk.
+
+    ``resumes`` yields ``(filename, raw_text, structured_data, embedding)``
+    tuples, optionally followed by a chunk-embedding matrix, and may be a
+    generator. Returns the assigned ids in input order;
+    duplicate content resolves to the id of the row already stored.
+    """
+    ids = []
+    for chunk in _chunks(resumes, chunk_size):
+        blobs = _serialize_embeddings([item[3] for item in chunk])
+        hashes = [content_hash(item[1]) for item in chunk]
+        with transaction() as conn:
+            term_blobs = _term_id_blobs(conn, "resumes", [item[2] for item in chunk])
+            rows = [
+                (item[0], item[1], json.dumps(item[2]), blob, _optional_chunks_blob(item, 4), digest, *terms, *profile)
+                for item, blob, digest, terms, profile in zip(
+                    chunk, blobs, hashes, term_blobs, _profile_values("resumes", [item[2] for item in chunk]),
+                )
+            ]
+            chunk_ids = _insert_deduplicated(
+                conn, "resumes", f"INSERT INTO resumes ({_RESUME_COLUMNS}) VALUES ({_placeholders(_RESUME_COLUMNS)})",
+                rows, hashes,
+            )
+        _store_embeddings("resumes", chunk_ids, [item[3] for item in chunk])
+        ids.extend(chunk_ids)
+    return ids
+
+
+def get_resume(resume_id: int, columns: Sequence[str] | None = None) -> "LazyRow | None":
+    with connection() as conn:
+        row = conn.execute(f"SELECT {_select_list('resumes', columns)} FROM resumes WHERE id = ?", (resume_id,)).fetchone()
     if row is None:
         return None
-    return _row_to_dict(row)
+    return LazyRow(row)
+
+
+def get_resumes(ids: Iterable[int], columns: Sequence[str] | None = None) -> list["LazyRow"]:
+    """Fetch many resumes in id order, only reading the requested columns."""
+    return _get_many("resumes", ids, columns)
+
+
+def iter_resumes_after(last_id: int, columns: Sequence[str] | None = None,
+                       chunk_size: int = DB_BULK_CHUNK_SIZE):
+    """Yield every resume with an id above ``last_id`` in id order, ``chunk_size`` rows per query."""
+    return _iter_after("resumes", last_id, columns, chunk_size)
+
+
+def find_resume_by_content(raw_text: str, columns: Sequence[str] | None = None) -> "LazyRow | None":
+    """Return the stored resume whose normalized text matches ``raw_text``, if any."""
+    return _find_by_hash("resumes", content_hash(raw_text), columns)
 
 
-def get_latest_resume() -> dict | None:
-    conn = _get_connection()
-    row = conn.execute("SELECT * FROM resumes ORDER BY id DESC LIMIT 1").fetchone()
-    conn.close()
+def get_latest_resume(columns: Sequence[str] | None = None) -> "LazyRow | None":
+    with connection() as conn:
+        row = conn.execute(f"SELECT {_select_list('resumes', columns)} FROM resumes ORDER BY id DESC LIMIT 1").fetchone()
     if row is None:
         return None
-    return _row_to_dict(row)
+    return LazyRow(row)
 
 
 # --------------- Match Results ---------------
+# Each component score (0-100; semantic_similarity is 0-1) is also kept as a
+# column, so a change of weights is one UPDATE instead of a re-match.
+# ``weights_version`` identifies the weights and scorer that produced
+# match_score; see match_engine.scorer.weights_version. ``scorer_settings``
+# identifies only the scorer settings behind the component columns (see
+# match_engine.scorer.scorer_settings), so a rescore re-weights just the rows
+# whose components the current scorer would reproduce. Neither is indexed
+# (idx_match_results_job_resume serves the cache lookup), so a rescore
+# rewrites no index entries.
 
-def save_match_result(job_id: int, resume_id: int, match_score: float,
-                      semantic_similarity: float, result_data: dict, explanation: str) -> int:
-    conn = _get_connection()
-    cursor = conn.execute(
-        "INSERT INTO match_results (job_id, resume_id, match_score, semantic_similarity, result_data, explanation) "
-        "VALUES (?, ?, ?, ?, ?, ?)",
-        (job_id, resume_id, match_score, semantic_similarity, json.dumps(result_data), explanation),
+_INSERT_MATCH_SQL = (
+    "INSERT INTO match_results (job_id, resume_id, match_score, semantic_similarity, result_data, explanation, "
+    "skill_score, experience_score, education_score, tools_score, weights_version, scorer_settings) "
+    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"
+)
+
+
+def _match_components(result_data: dict) -> tuple:
+    """``(skill, experience, education, tools)`` scores from a result_data dict."""
+    return (
+        result_data.get("skill_match_pct"), result_data.get("experience_score"),
+        result_data.get("education_score"), result_data.get("tools_match_pct"),
     )
-    conn.commit()
-    match_id = cursor.lastrowid
-    conn.close()
-    return match_id
 
 
-def get_match_result(match_id: int) -> dict | None:
-    conn = _get_connection()
-    row = conn.execute("SELECT * FROM match_results WHERE id = ?", (match_id,)).fetchone()
-    conn.close()
+def save_match_result(job_id: int, resume_id: int, match_score: float,
+                      semantic_similarity: float, result_data: dict, explanation: str,
+                      weights_version: str | None = None, scorer_settings: str | None = None) -> int:
+    with transaction() as conn:
+        cursor = conn.execute(
+            _INSERT_MATCH_SQL,
+            (job_id, resume_id, match_score, semantic_similarity, json.dumps(result_data), explanation,
+             *_match_components(result_data), weights_version, scorer_settings),
+        )
+        return cursor.lastrowid
+
+
+def save_match_results_bulk(results: Iterable, chunk_size: int = DB_BULK_CHUNK_SIZE) -> list[int]:
+    """Insert many match results, one transaction per chunk.
+
+    ``results`` yields ``(job_id, resume_id, match_score, semantic_similarity,
+    result_data, explanation)`` tuples, optionally followed by a weights
+    version and scorer settings. Returns the assigned ids in input order.
+    """
+    ids = []
+    for chunk in _chunks(results, chunk_size):
+        rows = [
+            (*item[:4], json.dumps(item[4]), item[5], *_match_components(item[4]),
+             item[6] if len(item) > 6 else None, item[7] if len(item) > 7 else None)
+            for item in chunk
+        ]
+        with transaction() as conn:
+            ids.extend(_insert_many(conn, _INSERT_MATCH_SQL, rows))
+    return ids
+
+
+def find_match_result(job_id: int, resume_id: int, weights_version: str, scorer_settings: str,
+                      columns: Sequence[str] | None = None) -> "LazyRow | None":
+    """Latest stored result for the pair that was scored under ``weights_version`` and ``scorer_settings``."""
+    with connection() as conn:
+        row = conn.execute(
+            f"SELECT {_select_list('match_results', columns)} FROM match_results "
+            "WHERE job_id = ? AND resume_id = ? AND weights_version = ? AND scorer_settings = ? "
+            "ORDER BY id DESC LIMIT 1",
+            (job_id, resume_id, weights_version, scorer_settings),
+        ).fetchone()
+    return LazyRow(row) if row is not None else None
+
+
+def rescore_match_results(weights: dict, weights_version: str, scorer_settings: str) -> int:
+    """Recompute match_score from the component columns of the rows scored under ``scorer_settings``.
+
+    Returns the rows updated. One UPDATE statement: no embeddings, JSON or
+    LLM calls are involved.
+    """
+    with transaction() as conn:
+        cursor = conn.execute(
+            "UPDATE match_results SET weights_version = ?, match_score = MIN(100.0, ROUND("
+            "? * COALESCE(semantic_similarity, 0) * 100 + ? * skill_score + ? * experience_score"
+            " + ? * education_score + ? * tools_score, 1)) "
+            "WHERE skill_score IS NOT NULL AND scorer_settings = ?",
+            (weights_version, weights["semantic"], weights["skill"], weights["experience"],
+             weights["education"], weights["tools"], scorer_settings),
+        )
+        return cursor.rowcount
+
+
+def get_match_result(match_id: int, columns: Sequence[str] | None = None) -> "LazyRow | None":
+    with connection() as conn:
+        row = conn.execute(f"SELECT {_select_list('match_results', columns)} FROM match_results WHERE id = ?", (match_id,)).fetchone()
     if row is None:
         return None
-    return _row_to_dict(row)
+    return LazyRow(row)
+
 
+def update_match_explanation(match_id: int, explanation: str) -> None:
+    with transaction() as conn:
+        conn.execute("UPDATE match_results SET explanation = ? WHERE id = ?", (explanation, match_id))
 
-def get_latest_match() -> dict | None:
-    conn = _get_connection()
-    row = conn.execute("SELECT * FROM match_results ORDER BY id DESC LIMIT 1").fetchone()
-    conn.close()
+
+def get_latest_match() -> "LazyRow | None":
+    with connection() as conn:
+        row = conn.execute("SELECT * FROM match_results ORDER BY id DESC LIMIT 1").fetchone()
     if row is None:
         return None
-    return _row_to_dict(row)
+    return LazyRow(row)
 
 
 # --------------- Gap Analyses ---------------
 
 def save_gap_analysis(match_id: int, gap_data: dict) -> int:
-    conn = _get_connection()
-    cursor = conn.execute(
-        "INSERT INTO gap_analyses (match_id, gap_data) VALUES (?, ?)",
-        (match_id, json.dumps(gap_data)),
-    )
-    conn.commit()
-    gap_id = cursor.lastrowid
-    conn.close()
-    return gap_id
-
-
-def get_gap_analysis(match_id: int) -> dict | None:
-    conn = _get_connection()
-    row = conn.execute(
-        "SELECT * FROM gap_analyses WHERE match_id = ? ORDER BY id DESC LIMIT 1",
-        (match_id,),
-    ).fetchone()
-    conn.close()
+    with transaction() as conn:
+        cursor = conn.execute(
+            "INSERT INTO gap_analyses (match_id, gap_data) VALUES (?, ?)",
+            (match_id, json.dumps(gap_data)),
+        )
+        return cursor.lastrowid
+
+
+def get_gap_analysis(match_id: int) -> "LazyRow | None":
+    with connection() as conn:
+        row = conn.execute(
+            "SELECT * FROM gap_analyses WHERE match_id = ? ORDER BY id DESC LIMIT 1",
+            (match_id,),
+        ).fetchone()
     if row is None:
         return None
-    return _row_to_dict(row)
+    return LazyRow(row)
+
+
+# --------------- Resume Optimizations ---------------
+
+def save_resume_optimization(match_id: int, optimization_data: dict) -> int:
+    with transaction() as conn:
+        cursor = conn.execute(
+            "INSERT INTO resume_optimizations (match_id, optimization_data) VALUES (?, ?)",
+            (match_id, json.dumps(optimization_data)),
+        )
+        return cursor.lastrowid
+
+
+def get_resume_optimization(match_id: int) -> "LazyRow | None":
+    with connection() as conn:
+        row = conn.execute(
+            "SELECT * FROM resume_optimizations WHERE match_id = ? ORDER BY id DESC LIMIT 1",
+            (match_id,),
+        ).fetchone()
+    if row is None:
+        return None
+    return LazyRow(row)
 
 
 # --------------- Interview Sessions ---------------
 
 def save_interview_session(match_id: int, questions_answers: list, overall_score: float) -> int:
-    conn = _get_connection()
-    cursor = conn.execute(
-        "INSERT INTO interview_sessions (match_id, questions_answers, overall_score) VALUES (?, ?, ?)",
-        (match_id, json.dumps(questions_answers), overall_score),
-    )
-    conn.commit()
-    session_id = cursor.lastrowid
-    conn.close()
-    return session_id
-
-
-def get_interview_session(match_id: int) -> dict | None:
-    conn = _get_connection()
-    row = conn.execute(
-        "SELECT * FROM interview_sessions WHERE match_id = ? ORDER BY id DESC LIMIT 1",
-        (match_id,),
-    ).fetchone()
-    conn.close()
+    with transaction() as conn:
+        cursor = conn.execute(
+            "INSERT INTO interview_sessions (match_id, questions_answers, overall_score) VALUES (?, ?, ?)",
+            (match_id, json.dumps(questions_answers), overall_score),
+        )
+        return cursor.lastrowid
+
+
+def get_interview_session(match_id: int) -> "LazyRow | None":
+    with connection() as conn:
+        row = conn.execute(
+            "SELECT * FROM interview_sessions WHERE match_id = ? ORDER BY id DESC LIMIT 1",
+            (match_id,),
+        ).fetchone()
     if row is None:
         return None
-    return _row_to_dict(row)
+    return LazyRow(row)
+
+
+# --------------- Scoring runs ---------------
+# A cross-product scoring run (match_engine.cross_scoring) splits the job x
+# resume space into numbered tiles. Each finished tile is recorded in the same
+# transaction as its match results, so a run interrupted at any point resumes
+# from the tiles still missing without writing any pair twice.
+
+def create_scoring_run(params: dict, tiles_total: int) -> int:
+    with transaction() as conn:
+        cursor = conn.execute(
+            "INSERT INTO scoring_runs (params, tiles_total) VALUES (?, ?)", (json.dumps(params), tiles_total),
+        )
+        return cursor.lastrowid
+
+
+def get_scoring_run(run_id: int, columns: Sequence[str] | None = None) -> "LazyRow | None":
+    with connection() as conn:
+        row = conn.execute(
+            f"SELECT {_select_list('scoring_runs', columns)} FROM scoring_runs WHERE id = ?", (run_id,),
+        ).fetchone()
+    return LazyRow(row) if row is not None else None
+
+
+def get_finished_tiles(run_id: int) -> set[int]:
+    with connection() as conn:
+        return {r[0] for r in conn.execute("SELECT tile FROM scoring_run_tiles WHERE run_id = ?", (run_id,))}
+
+
+def save_scoring_tile(run_id: int, tile: int, results: list) -> None:
+    """Insert a tile's match results (as save_match_results_bulk) and mark the tile finished, atomically."""
+    with transaction() as conn:
+        save_match_results_bulk(results)
+        conn.execute(
+            "INSERT INTO scoring_run_tiles (run_id, tile, rows_written) VALUES (?, ?, ?)",
+            (run_id, tile, len(results)),
+        )
+        conn.execute(
+            "UPDATE scoring_runs SET tiles_done = tiles_done + 1, rows_written = rows_written + ?, "
+            "updated_at = CURRENT_TIMESTAMP WHERE id = ?",
+            (len(results), run_id),
+        )
+
+
+def set_scoring_run_status(run_id: int, status: str) -> None:
+    with transaction() as conn:
+        conn.execute(
+            "UPDATE scoring_runs SET status = ?, updated_at = CURRENT_TIMESTAMP WHERE id = ?", (status, run_id),
+        )
 
 
 # --------------- Helpers ---------------
 
-def _row_to_dict(row: sqlite3.Row) -> dict:
-    d = dict(row)
-    for key in ("structured_data", "result_data", "gap_data", "questions_answers"):
-        if key in d and isinstance(d[key], str):
-            d[key] = json.loads(d[key])
-    if "embedding" in d and d["embedding"] is not None:
-        d["embedding"] = deserialize_embedding(d["embedding"])
-    return d
+_JSON_COLUMNS = ("structured_data", "result_data", "gap_data", "optimization_data", "questions_answers", "params")
+_table_columns = {}
+
+
+class LazyRow(Mapping):
+    """Read-only row that decodes JSON columns and embeddings on first access.
+
+    Behaves like the dicts the get_* functions used to return, but a caller
+    that only reads ``structured_data`` never pays for the embedding (and a
+    projected query never even fetches ``raw_text``).
+    """
+
+    __slots__ = ("_row", "_decoded")
+
+    def __init__(self, row: sqlite3.Row):
+        self._row = row
+        self._decoded = {}
+
+    def __getitem__(self, key: str):
+        if key in self._decoded:
+            return self._decoded[key]
+        try:
+            value = self._row[key]
+        except IndexError:
+            raise KeyError(key) from None
+        if key in _JSON_COLUMNS and isinstance(value, str):
+            value = json.loads(value)
+        elif key == "embedding" and value is not None:
+            value = deserialize_embedding(value)
+        elif key == "chunk_embeddings" and value is not None:
+            value = deserialize_chunk_embeddings(value)
+        elif key in ("skill_ids", "tool_ids") and value is not None:
+            value = deserialize_term_ids(value)
+        self._decoded[key] = value
+        return value
+
+    def __iter__(self):
+        return iter(self._row.keys())
+
+    def __len__(self) -> int:
+        return len(self._row)
+
+    def to_dict(self) -> dict:
+        return {key: self[key] for key in self}
+
+    def __repr__(self) -> str:
+        return f"LazyRow({', '.join(self._row.keys())})"
+
+
+def _select_list(table: str, columns: Sequence[str] | None) -> str:
+    """Validate a column projection and render it for a SELECT. ``id`` is always included."""
+    if columns is None:
+        return "*"
+    known = _table_columns.get((DB_PATH, table))
+    if known is None:
+        with connection() as conn:
+            known = {r["name"] for r in conn.execute(f"PRAGMA table_info({table})")}
+        _table_columns[(DB_PATH, table)] = known
+    unknown = set(columns) - known
+    if unknown:
+        raise ValueError(f"Unknown {table} columns: {', '.join(sorted(unknown))}")
+    return ", ".join(["id"] + [c for c in columns if c != "id"])
+
+
+def _iter_after(table: str, last_id: int, columns: Sequence[str] | None, chunk_size: int):
+    while True:
+        with connection() as conn:
+            rows = conn.execute(
+                f"SELECT {_select_list(table, columns)} FROM {table} WHERE id > ? ORDER BY id LIMIT ?",
+                (last_id, chunk_size),
+            ).fetchall()
+        for row in rows:
+            yield LazyRow(row)
+        if len(rows) < chunk_size:
+            return
+        last_id = rows[-1]["id"]
+
+
+def _get_many(table: str, ids: Iterable[int], columns: Sequence[str] | None) -> list[LazyRow]:
+    select = _select_list(table, columns)
+    rows = []
+    with connection() as conn:
+        for chunk in _chunks(ids, DB_BULK_CHUNK_SIZE):
+            placeholders = ",".join("?" * len(chunk))
+            rows.extend(conn.execute(
+                f"SELECT {select} FROM {table} WHERE id IN ({placeholders}) ORDER BY id", chunk,
+            ))
+    return [LazyRow(row) for row in rows]
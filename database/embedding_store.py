@@ -0,0 +1,221 @@
+import os
+import struct
+import threading
+from contextlib import contextmanager
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+from database.quantization import quantize
+
+
+_MAGIC = b"EMBSTORE"
+_HEADER = struct.Struct("<8sII8s")  # magic, format version, dim, row dtype name
+_HEADER_SIZE = 64
+_FORMAT_VERSION = 1
+_ID_DTYPE = np.dtype("<i8")
+
+
+class EmbeddingStore:
+    """Append-only embedding matrix on disk with a row-id index.
+
+    Rows live in ``<base>.emb`` (fixed header followed by contiguous rows of
+    the store's dtype) and their database ids in ``<base>.ids``. float16 and
+    int8 stores hold quantization codes only: int8 scales cancel out of the
+    cosine, so ranking never needs them.
+
+    Several processes may share a store. Appends hold an exclusive lock on
+    ``<base>.lock`` and re-read the committed row count from disk first, so
+    every process appends after every other. A row counts once its id is
+    written, which happens after its data; rows without an id (a writer that
+    died mid-append) are trimmed under the lock. Nothing is fsynced: SQLite
+    holds the durable copy, and rows lost in a system crash are backfilled
+    from it when the store is opened (see database.db).
+    """
+
+    def __init__(self, base_path: str, dtype: str = "float32"):
+        self.data_path = base_path + ".emb"
+        self.ids_path = base_path + ".ids"
+        self.dim = None
+        # Only used when the store is created; an existing file keeps its own dtype.
+        self.dtype = np.dtype(dtype)
+        self._lock = threading.Lock()
+        self._lock_file = open(base_path + ".lock", "a+b")
+        self._id_buffer = np.empty(0, dtype=_ID_DTYPE)  # grown geometrically; the first _count are ids
+        self._count = 0
+        self._index = {}
+        self._matrix = None
+        self._appenders = None
+        with self._locked():
+            self._trim()
+
+    @contextmanager
+    def _locked(self):
+        """Hold the store against other threads and other processes."""
+        with self._lock:
+            if fcntl is not None:
+                fcntl.flock(self._lock_file, fcntl.LOCK_EX)
+            else:
+                self._lock_file.seek(0)
+                msvcrt.locking(self._lock_file.fileno(), msvcrt.LK_LOCK, 1)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(self._lock_file, fcntl.LOCK_UN)
+                else:
+                    self._lock_file.seek(0)
+                    msvcrt.locking(self._lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+
+    def _read_header(self) -> bool:
+        """Load dim and dtype from the data file. False if it has no complete header yet."""
+        if not os.path.exists(self.data_path) or os.path.getsize(self.data_path) < _HEADER_SIZE:
+            # Never created, or the creator died while writing the header.
+            return False
+        with open(self.data_path, "rb") as f:
+            magic, version, dim, dtype = _HEADER.unpack(f.read(_HEADER.size))
+        if magic != _MAGIC or version != _FORMAT_VERSION:
+            raise ValueError(f"{self.data_path} is not a version {_FORMAT_VERSION} embedding store")
+        self.dim = dim
+        self.dtype = np.dtype(dtype.rstrip(b"\0").decode() or "float32")
+        return True
+
+    def _file_sizes(self) -> tuple[int, int]:
+        data_size = os.path.getsize(self.data_path)
+        ids_size = os.path.getsize(self.ids_path) if os.path.exists(self.ids_path) else 0
+        return data_size, ids_size
+
+    def _refresh(self) -> tuple[int, int] | None:
+        """Pick up rows other processes have committed since we last looked.
+
+        A row is committed once both its data and its id are on disk.
+        Returns the file sizes seen, or None if the store has no header yet.
+        """
+        if self.dim is None and not self._read_header():
+            return None
+        data_size, ids_size = self._file_sizes()
+        count = min((data_size - _HEADER_SIZE) // (self.dim * self.dtype.itemsize), ids_size // _ID_DTYPE.itemsize)
+        known = self._count
+        if count > known:
+            with open(self.ids_path, "rb") as f:
+                f.seek(known * _ID_DTYPE.itemsize)
+                self._extend_ids(np.fromfile(f, dtype=_ID_DTYPE, count=count - known))
+        return data_size, ids_size
+
+    def _extend_ids(self, new: np.ndarray) -> None:
+        start = self._count
+        end = start + len(new)
+        if end > len(self._id_buffer):
+            grown = np.empty(max(end, 2 * len(self._id_buffer), 1024), dtype=_ID_DTYPE)
+            grown[:start] = self._id_buffer[:start]
+            self._id_buffer = grown
+        self._id_buffer[start:end] = new
+        for offset, row_id in enumerate(new.tolist()):
+            self._index[row_id] = start + offset
+        self._count = end
+
+    def _trim(self) -> None:
+        """Catch up with the files and cut off any uncommitted tail. Call with the store locked."""
+        sizes = self._refresh()
+        if sizes is None:
+            return
+        for path, size, committed in (
+            (self.data_path, sizes[0], _HEADER_SIZE + self._count * self.dim * self.dtype.itemsize),
+            (self.ids_path, sizes[1], self._count * _ID_DTYPE.itemsize),
+        ):
+            if size > committed:
+                os.truncate(path, committed)
+
+    def _create(self, dim: int) -> None:
+        """Write the header of a new store. Call with the store locked."""
+        header = _HEADER.pack(_MAGIC, _FORMAT_VERSION, dim, self.dtype.name.encode()).ljust(_HEADER_SIZE, b"\0")
+        try:
+            with open(self.data_path, "xb") as f:
+                f.write(header)
+        except FileExistsError:
+            # Only a creator that died mid-header leaves a file without one.
+            with open(self.data_path, "r+b") as f:
+                f.write(header)
+                f.truncate(_HEADER_SIZE)
+        open(self.ids_path, "ab").close()
+        self.dim = dim
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __contains__(self, row_id: int) -> bool:
+        return row_id in self._index
+
+    def append(self, row_ids, embeddings) -> None:
+        """Append one or more float32 ``(row_id, embedding)`` rows.
+
+        Rows are quantized to the store dtype. Ids already stored are skipped.
+        """
+        ids = np.atleast_1d(np.asarray(row_ids, dtype=_ID_DTYPE))
+        rows = np.ascontiguousarray(np.atleast_2d(np.asarray(embeddings, dtype=np.float32)))
+        if len(ids) != len(rows):
+            raise ValueError("row_ids and embeddings must have the same length")
+        if not len(ids):
+            return
+        with self._locked():
+            self._trim()
+            seen = set()
+            fresh = np.zeros(len(ids), dtype=bool)
+            for pos, row_id in enumerate(ids.tolist()):
+                if row_id not in self._index and row_id not in seen:
+                    seen.add(row_id)
+                    fresh[pos] = True
+            ids, rows = ids[fresh], rows[fresh]
+            if not len(ids):
+                return
+            if self.dim is None:
+                self._create(rows.shape[1])
+            if rows.shape[1] != self.dim:
+                raise ValueError(f"Expected {self.dim}-dim embeddings, got {rows.shape[1]}")
+            codes, _ = quantize(rows, self.dtype.name)
+            if self._appenders is None:
+                # Unbuffered: each write reaches the file before the next starts.
+                self._appenders = (open(self.data_path, "ab", buffering=0), open(self.ids_path, "ab", buffering=0))
+            data_file, ids_file = self._appenders
+            data_file.write(codes.tobytes())
+            # The ids are the commit record, so they go after the data.
+            ids_file.write(ids.tobytes())
+            self._extend_ids(ids)
+
+    def ids(self) -> np.ndarray:
+        """Row ids in storage order (row ``i`` of ``matrix()`` belongs to ``ids()[i]``)."""
+        return self._id_buffer[:self._count]
+
+    def matrix(self) -> np.ndarray:
+        """Zero-copy ``(N, dim)`` read-only view over every stored row.
+
+        Also picks up rows appended by other processes. ``ids()``,
+        ``positions()`` and ``get()`` see the rows as of the last call, so
+        they never point past a matrix obtained after them.
+        """
+        with self._lock:
+            self._refresh()
+            count = self._count
+            if self.dim is None or count == 0:
+                return np.empty((0, self.dim or 0), dtype=self.dtype)
+            if self._matrix is None or len(self._matrix) != count:
+                self._matrix = np.memmap(
+                    self.data_path, dtype=self.dtype, mode="r",
+                    offset=_HEADER_SIZE, shape=(count, self.dim),
+                )
+            return self._matrix
+
+    def positions(self, row_ids) -> np.ndarray:
+        """Matrix row offsets for ``row_ids``; -1 where an id is not stored."""
+        return np.fromiter((self._index.get(int(i), -1) for i in row_ids), dtype=np.int64)
+
+    def get(self, row_id: int) -> np.ndarray | None:
+        pos = self._index.get(row_id)
+        if pos is None:
+            return None
+        return self.matrix()[pos]
@@ -0,0 +1,37 @@
+EDUCATION_LEVELS = {"high school": 1, "diploma": 2, "associate": 2, "bachelor": 3, "master": 4, "phd": 5, "doctorate": 5}
+
+
+def parse_experience_range(text: str) -> tuple[float | None, float | None]:
+    """``(min, max)`` years from free text: "3" -> (3, 3), "3-5 years" -> (3, 5), "5+" -> (5, None).
+
+    Unparseable text gives ``(None, None)``.
+    """
+    text = str(text or "")
+    open_ended = "+" in text
+    text = text.lower().replace("+", "").replace("years", "").replace("year", "").strip()
+    if "-" in text:
+        parts = text.split("-")
+        try:
+            return float(parts[0]), float(parts[1])
+        except ValueError:
+            return None, None
+    try:
+        years = float(text)
+    except ValueError:
+        return None, None
+    return years, None if open_ended else years
+
+
+def experience_years(years_min: float | None, years_max: float | None) -> float:
+    """The single figure the scorer compares: the midpoint of a range, the lower bound if open-ended, else 0."""
+    if years_min is None:
+        return 0.0
+    if years_max is None:
+        return years_min
+    return (years_min + years_max) / 2
+
+
+def education_level(text: str) -> int:
+    """Highest education level mentioned in ``text`` (see EDUCATION_LEVELS), 0 if none."""
+    lower = str(text or "").lower()
+    return max((level for keyword, level in EDUCATION_LEVELS.items() if keyword in lower), default=0)
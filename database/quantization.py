@@ -0,0 +1,60 @@
+import numpy as np
+
+
+STORAGE_DTYPES = ("float32", "float16", "int8")
+
+_INT8_MAX = 127
+_SCORE_CHUNK_ROWS = 16384
+
+
+def quantize(embeddings: np.ndarray, dtype: str) -> tuple[np.ndarray, np.ndarray | None]:
+    """Quantize one vector or a ``(N, dim)`` matrix.
+
+    Returns ``(codes, scales)``. ``int8`` uses one symmetric scale per vector
+    (``max|v| / 127``); the other modes have no scales.
+    """
+    embeddings = np.asarray(embeddings, dtype=np.float32)
+    if dtype == "float32":
+        return embeddings, None
+    if dtype == "float16":
+        return embeddings.astype(np.float16), None
+    if dtype == "int8":
+        peak = np.abs(embeddings).max(axis=-1, keepdims=True)
+        scales = np.where(peak > 0, peak / _INT8_MAX, 1.0).astype(np.float32)
+        codes = np.clip(np.rint(embeddings / scales), -_INT8_MAX, _INT8_MAX).astype(np.int8)
+        return codes, scales.squeeze(-1)
+    raise ValueError(f"Unknown embedding storage dtype {dtype!r}; expected one of {STORAGE_DTYPES}")
+
+
+def dequantize(codes: np.ndarray, scales: np.ndarray | None = None) -> np.ndarray:
+    """Reconstruct float32 vectors from ``quantize`` output."""
+    out = codes.astype(np.float32)
+    if scales is not None:
+        out *= np.asarray(scales, dtype=np.float32)[..., None] if out.ndim > 1 else scales
+    return out
+
+
+def cosine_scores(query: np.ndarray, matrix: np.ndarray) -> np.ndarray:
+    """Cosine similarity of one float32 query against every row of a (possibly quantized) matrix.
+
+    The query is quantized to the matrix dtype and rows are compared code to
+    code, so no scale is ever applied: per-vector int8 scales cancel out of
+    the cosine. int8 codes are widened to float32 a chunk at a time for the
+    BLAS product, which is exact because every partial sum stays below 2**24.
+    """
+    dtype = matrix.dtype.name
+    q, _ = quantize(query, dtype)
+    q = q.astype(np.float32)
+    q_norm = float(np.linalg.norm(q))
+    scores = np.empty(len(matrix), dtype=np.float32)
+    if q_norm == 0:
+        scores.fill(0.0)
+        return scores
+    for start in range(0, len(matrix), _SCORE_CHUNK_ROWS):
+        chunk = np.asarray(matrix[start:start + _SCORE_CHUNK_ROWS], dtype=np.float32)
+        norms = np.sqrt(np.einsum("ij,ij->i", chunk, chunk))
+        dots = chunk @ q
+        scores[start:start + len(chunk)] = np.divide(
+            dots, norms * q_norm, out=np.zeros_like(dots), where=norms > 0,
+        )
+    return scores
@@ -0,0 +1,132 @@
+import re
+
+import numpy as np
+
+from config import CHUNK_MAX_COUNT
+from embedding_module import embedding_service
+
+
+_HEADING = re.compile(
+    r"^(summary|profile|objective|about( me| us| the (role|company|team))?|"
+    r"(work |professional )?experience|employment( history)?|education|"
+    r"(technical |core )?skills|projects|certifications?|achievements|awards|publications|"
+    r"responsibilities|requirements|qualifications|(preferred|minimum|basic) qualifications|"
+    r"what you('ll)? do|who you are|benefits|perks)\s*:?$",
+    re.IGNORECASE,
+)
+
+
+def _is_heading(line: str) -> bool:
+    stripped = line.strip()
+    if not stripped or len(stripped) > 60:
+        return False
+    return bool(_HEADING.match(stripped)) or (stripped.isupper() and len(stripped.split()) <= 5)
+
+
+def split_sections(text: str) -> list[str]:
+    """Split resume / job text into sections at recognised headings."""
+    sections, current = [], []
+    for line in text.splitlines():
+        if _is_heading(line) and current:
+            sections.append("\n".join(current).strip())
+            current = []
+        current.append(line)
+    if current:
+        sections.append("\n".join(current).strip())
+    return [s for s in sections if s]
+
+
+def _split_long(paragraph: str, max_tokens: int, count_tokens) -> list[tuple[str, int]]:
+    # Word pieces never span whitespace, so a paragraph's count is the sum of its words' counts.
+    pieces, words, size = [], [], 0
+    for word in paragraph.split():
+        n = count_tokens(word)
+        if words and size + n > max_tokens:
+            pieces.append((" ".join(words), size))
+            words, size = [], 0
+        words.append(word)
+        size += n
+    if words:
+        pieces.append((" ".join(words), size))
+    return pieces
+
+
+def _pack(paragraphs: list[str], max_tokens: int, count_tokens) -> list[tuple[str, int]]:
+    chunks, current, size = [], "", 0
+    for paragraph in paragraphs:
+        n = count_tokens(paragraph)
+        pieces = [(paragraph, n)] if n <= max_tokens else _split_long(paragraph, max_tokens, count_tokens)
+        for piece, n in pieces:
+            if current and size + n > max_tokens:
+                chunks.append((current, size))
+                current, size = "", 0
+            current = f"{current}\n{piece}" if current else piece
+            size += n
+    if current:
+        chunks.append((current, size))
+    return chunks
+
+
+def _merge_small(chunks: list[tuple[str, int]], max_tokens: int) -> list[tuple[str, int]]:
+    # Headers and one-line sections carry little signal alone; fold them into a neighbour.
+    min_tokens = max_tokens // 4
+    merged = []
+    for chunk, n in chunks:
+        if merged and min(n, merged[-1][1]) < min_tokens and merged[-1][1] + n <= max_tokens:
+            merged[-1] = (f"{merged[-1][0]}\n\n{chunk}", merged[-1][1] + n)
+        else:
+            merged.append((chunk, n))
+    return merged
+
+
+def _merge_adjacent(chunks: list[tuple[str, int]], max_chunks: int, max_tokens: int) -> list[tuple[str, int]]:
+    # Join the smallest neighbouring pair that still fits, across section boundaries, until under the cap.
+    chunks = list(chunks)
+    while len(chunks) > max_chunks:
+        fits = [i for i in range(len(chunks) - 1) if chunks[i][1] + chunks[i + 1][1] <= max_tokens]
+        if not fits:
+            break
+        i = min(fits, key=lambda i: chunks[i][1] + chunks[i + 1][1])
+        chunks[i:i + 2] = [(f"{chunks[i][0]}\n\n{chunks[i + 1][0]}", chunks[i][1] + chunks[i + 1][1])]
+    return chunks
+
+
+def _information(chunk: str) -> int:
+    return len(set(re.findall(r"\w+", chunk.lower())))
+
+
+def chunk_text(text: str, max_tokens: int | None = None, max_chunks: int = CHUNK_MAX_COUNT,
+               count_tokens=None) -> list[str]:
+    """Section-aware chunks of at most ``max_tokens`` word pieces, never more than ``max_chunks``.
+
+    ``max_tokens`` and ``count_tokens`` default to the encoder's own limit and
+    tokenizer, so no chunk is silently truncated by the model. Sections are
+    packed paragraph by paragraph, and only sections too small to stand alone
+    share a chunk with a neighbour. When a document still needs more than
+    ``max_chunks`` chunks, neighbouring chunks that fit together are merged
+    across sections; if that is not enough, the chunks with the fewest
+    distinct words are dropped, so the text of very long documents is only
+    partly embedded.
+    """
+    text = text.strip()
+    if not text:
+        return []
+    if max_tokens is None:
+        max_tokens = embedding_service.max_tokens()
+    if count_tokens is None:
+        count_tokens = embedding_service.count_tokens
+    chunks = []
+    for section in split_sections(text):
+        paragraphs = [p.strip() for p in re.split(r"\n\s*\n", section) if p.strip()]
+        chunks.extend(_pack(paragraphs, max_tokens, count_tokens))
+    chunks = _merge_adjacent(_merge_small(chunks, max_tokens), max_chunks, max_tokens)
+    if len(chunks) > max_chunks:
+        keep = sorted(range(len(chunks)), key=lambda i: -_information(chunks[i][0]))[:max_chunks]
+        chunks = [chunks[i] for i in sorted(keep)]
+    return [chunk for chunk, _ in chunks]
+
+
+def embed_chunks(text: str) -> np.ndarray:
+    """Embed the section chunks of ``text`` as a float32 ``(k, dim)`` matrix, ``k <= CHUNK_MAX_COUNT``."""
+    chunks = chunk_text(text)
+    return embedding_service.encode_batch(chunks)
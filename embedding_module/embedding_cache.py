@@ -0,0 +1,94 @@
+import hashlib
+import sqlite3
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+
+class EmbeddingCache:
+    """Two-tier embedding cache keyed by ``(model name, sha256(text))``.
+
+    Lookups hit an in-process LRU first and fall back to a SQLite table on
+    disk; disk hits are promoted into the LRU. The model name is part of the
+    key, so switching ``EMBEDDING_MODEL`` never returns stale vectors.
+    """
+
+    def __init__(self, path: str, model_name: str, capacity: int):
+        self.model_name = model_name
+        self.capacity = capacity
+        self._lru = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode = WAL")
+        self._conn.execute("PRAGMA synchronous = NORMAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS embeddings (
+                model TEXT NOT NULL,
+                text_hash TEXT NOT NULL,
+                embedding BLOB NOT NULL,
+                PRIMARY KEY (model, text_hash)
+            ) WITHOUT ROWID
+        """)
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(text: str) -> str:
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+    def get_many(self, texts: list[str]) -> list[np.ndarray | None]:
+        """Cached vectors for ``texts``, with ``None`` for every miss."""
+        keys = [self.key(t) for t in texts]
+        found = [None] * len(texts)
+        with self._lock:
+            pending = {}
+            for i, k in enumerate(keys):
+                emb = self._lru.get(k)
+                if emb is not None:
+                    self._lru.move_to_end(k)
+                    self.memory_hits += 1
+                    found[i] = emb
+                else:
+                    pending.setdefault(k, []).append(i)
+            if pending:
+                placeholders = ",".join("?" * len(pending))
+                rows = self._conn.execute(
+                    f"SELECT text_hash, embedding FROM embeddings WHERE model = ? AND text_hash IN ({placeholders})",
+                    [self.model_name, *pending],
+                ).fetchall()
+                for k, blob in rows:
+                    emb = np.frombuffer(blob, dtype=np.float32)
+                    self._remember(k, emb)
+                    for i in pending.pop(k):
+                        found[i] = emb
+                    self.disk_hits += 1
+                self.misses += sum(len(idx) for idx in pending.values())
+        return found
+
+    def put_many(self, texts: list[str], embeddings) -> None:
+        rows = []
+        with self._lock:
+            for text, emb in zip(texts, embeddings):
+                k = self.key(text)
+                emb = np.asarray(emb, dtype=np.float32)
+                self._remember(k, emb)
+                rows.append((self.model_name, k, emb.tobytes()))
+            self._conn.executemany("INSERT OR REPLACE INTO embeddings VALUES (?, ?, ?)", rows)
+
+    def _remember(self, key: str, emb: np.ndarray) -> None:
+        self._lru[key] = emb
+        self._lru.move_to_end(key)
+        while len(self._lru) > self.capacity:
+            self._lru.popitem(last=False)
+
+    def stats(self) -> dict:
+        lookups = self.memory_hits + self.disk_hits + self.misses
+        return {
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": round((self.memory_hits + self.disk_hits) / lookups, 3) if lookups else None,
+            "memory_entries": len(self._lru),
+        }
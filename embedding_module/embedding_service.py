@@ -0,0 +1,151 @@
+import os
+import threading
+import time
+from itertools import islice
+from typing import Iterable, Iterator
+
+import numpy as np
+from sentence_transformers import SentenceTransformer
+
+from config import (
+    EMBEDDING_MODEL, EMBEDDING_DEVICE, EMBEDDING_NUM_THREADS, EMBEDDING_BATCH_SIZE, EMBEDDING_SORT_WINDOW,
+    EMBEDDING_CACHE_ENABLED, EMBEDDING_CACHE_PATH, EMBEDDING_CACHE_SIZE,
+)
+from embedding_module.embedding_cache import EmbeddingCache
+
+_model = None
+_cache = None
+_lock = threading.Lock()
+_warmed_up = False
+_stats = {
+    "model": EMBEDDING_MODEL,
+    "device": None,
+    "load_seconds": None,
+    "rss_before_load_mb": None,
+    "rss_after_load_mb": None,
+}
+
+
+def _rss_mb() -> float | None:
+    """Current resident set size of this process in MB, if the platform exposes it."""
+    try:
+        with open(f"/proc/{os.getpid()}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return round(int(line.split()[1]) / 1024, 1)
+    except OSError:
+        pass
+    try:
+        import resource
+    except ImportError:
+        return None
+    # Peak rather than current RSS, reported in KB on Linux and bytes on macOS.
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024 if peak > 1 << 32 else 1024), 1)
+
+
+def get_model() -> SentenceTransformer:
+    """Return the process-wide SentenceTransformer, loading it on first use."""
+    global _model
+    if _model is None:
+        with _lock:
+            if _model is None:
+                if EMBEDDING_NUM_THREADS > 0:
+                    import torch
+                    torch.set_num_threads(EMBEDDING_NUM_THREADS)
+                _stats["rss_before_load_mb"] = _rss_mb()
+                start = time.perf_counter()
+                model = SentenceTransformer(EMBEDDING_MODEL, device=EMBEDDING_DEVICE)
+                _stats["load_seconds"] = round(time.perf_counter() - start, 2)
+                _stats["rss_after_load_mb"] = _rss_mb()
+                _stats["device"] = str(model.device)
+                _model = model
+    return _model
+
+
+def get_cache() -> EmbeddingCache | None:
+    """Return the process-wide embedding cache, or None when disabled."""
+    global _cache
+    if _cache is None and EMBEDDING_CACHE_ENABLED:
+        with _lock:
+            if _cache is None:
+                _cache = EmbeddingCache(EMBEDDING_CACHE_PATH, EMBEDDING_MODEL, EMBEDDING_CACHE_SIZE)
+    return _cache
+
+
+def max_tokens() -> int:
+    """Word pieces the encoder reads per text: its ``max_seq_length`` less the [CLS] and [SEP] tokens."""
+    return get_model().max_seq_length - 2
+
+
+def count_tokens(text: str) -> int:
+    """Word pieces ``text`` tokenizes to, without special tokens."""
+    return len(get_model().tokenizer.tokenize(text))
+
+
+def encode(text: str) -> np.ndarray:
+    """Embed a single text as a float32 vector."""
+    return encode_batch([text])[0]
+
+
+def encode_batch(texts: list[str], batch_size: int = EMBEDDING_BATCH_SIZE) -> np.ndarray:
+    """Embed several texts in one call. Returns a float32 ``(len(texts), dim)`` matrix.
+
+    Texts seen before (by this or an earlier process) come from the cache;
+    only the misses reach the model.
+    """
+    if not texts:
+        return np.empty((0, get_model().get_sentence_embedding_dimension()), dtype=np.float32)
+    cache = get_cache()
+    if cache is None:
+        return get_model().encode(texts, batch_size=batch_size, convert_to_numpy=True).astype(np.float32)
+
+    found = cache.get_many(texts)
+    missing = [i for i, emb in enumerate(found) if emb is None]
+    if missing:
+        missing_texts = list(dict.fromkeys(texts[i] for i in missing))
+        fresh = get_model().encode(missing_texts, batch_size=batch_size, convert_to_numpy=True).astype(np.float32)
+        cache.put_many(missing_texts, fresh)
+        by_text = dict(zip(missing_texts, fresh))
+        for i in missing:
+            found[i] = by_text[texts[i]]
+    return np.stack(found)
+
+
+def encode_stream(texts: Iterable[str], batch_size: int = EMBEDDING_BATCH_SIZE,
+                  window_batches: int = EMBEDDING_SORT_WINDOW) -> Iterator[np.ndarray]:
+    """Embed an iterable of texts lazily, yielding one float32 vector per text in input order.
+
+    Texts are consumed ``batch_size * window_batches`` at a time and sorted by
+    length inside that window, so each batch pads to a similar length while
+    memory stays bounded by the window rather than the input size.
+    """
+    it = iter(texts)
+    window = batch_size * window_batches
+    while True:
+        chunk = list(islice(it, window))
+        if not chunk:
+            return
+        order = sorted(range(len(chunk)), key=lambda i: len(chunk[i]))
+        out = [None] * len(chunk)
+        for start in range(0, len(order), batch_size):
+            idx = order[start:start + batch_size]
+            embeddings = encode_batch([chunk[i] for i in idx], batch_size=len(idx))
+            for i, emb in zip(idx, embeddings):
+                out[i] = emb
+        yield from out
+
+
+def warm_up() -> None:
+    """Load the model and run one encode so the first real request is not slowed down."""
+    global _warmed_up
+    if _warmed_up:
+        return
+    get_model().encode("warm up", convert_to_numpy=True)
+    _warmed_up = True
+
+
+def get_stats() -> dict:
+    """Model load time, process RSS around the load and cache counters, for diagnostics."""
+    cache = get_cache()
+    return dict(_stats, rss_now_mb=_rss_mb(), cache=cache.stats() if cache is not None else None)
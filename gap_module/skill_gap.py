@@ -1,11 +1,9 @@
 import json
-import time
 from typing import List
 
-import google.generativeai as genai
 from pydantic import BaseModel, Field
 
-from config import GEMINI_API_KEY, GEMINI_MODEL, MAX_RETRIES, RETRY_DELAY
+from llm_module.client import generate
 
 
 class GapAnalysis(BaseModel):
@@ -42,9 +40,6 @@ Provide at least 3 courses and 2 project suggestions. Prioritize skills by relev
 
 def analyze_skill_gap(job_data: dict, resume_data: dict, match_result_data: dict) -> GapAnalysis:
     """Use Gemini to analyze skill gaps and recommend learning resources."""
-    genai.configure(api_key=GEMINI_API_KEY)
-    model = genai.GenerativeModel(GEMINI_MODEL)
-
     prompt = GAP_PROMPT.format(
         missing_skills=", ".join(match_result_data.get("missing_skills", [])) or "None",
         missing_tools=", ".join(match_result_data.get("missing_tools", [])) or "None",
@@ -57,25 +52,5 @@ def analyze_skill_gap(job_data: dict, resume_data: dict, match_result_data: dict
         education=resume_data.get("education", "N/A"),
     )
 
-    for attempt in range(MAX_RETRIES):
-        try:
-            response = model.generate_content(
-                prompt,
-                generation_config=genai.GenerationConfig(
-                    response_mime_type="application/json",
-                ),
-            )
-            data = json.loads(response.text)
-            return GapAnalysis(**data)
-        except Exception as e:
-            err_str = str(e)
-            if "429" in err_str or "ResourceExhausted" in err_str:
-                raise RuntimeError(
-                    "Gemini API quota exceeded. Your free-tier limit has been reached. "
-                    "Please wait for it to reset or enable billing at "
-                    "https://ai.google.dev/gemini-api/docs/rate-limits"
-                )
-            if attempt < MAX_RETRIES - 1:
-                time.sleep(RETRY_DELAY * (attempt + 1))
-            else:
-                raise RuntimeError(f"Failed to analyze skill gap after {MAX_RETRIES} attempts: {e}")
+    return generate(prompt, json_output=True, parse=lambda text: GapAnalysis(**json.loads(text)),
+                    context="Failed to analyze skill gap")
@@ -1,10 +1,7 @@
 import json
-import time
 from typing import List
 
-import google.generativeai as genai
-
-from config import GEMINI_API_KEY, GEMINI_MODEL, MAX_RETRIES, RETRY_DELAY
+from llm_module.client import generate
 
 
 QUESTION_PROMPT = """You are a senior technical interviewer. Generate interview questions
@@ -41,9 +38,6 @@ def generate_questions(job_data: dict, resume_data: dict,
                        match_score: float, missing_skills: list,
                        num_questions: int = 5) -> List[dict]:
     """Generate adaptive interview questions using Gemini."""
-    genai.configure(api_key=GEMINI_API_KEY)
-    model = genai.GenerativeModel(GEMINI_MODEL)
-
     prompt = QUESTION_PROMPT.format(
         job_title=job_data.get("job_title", "N/A"),
         required_skills=", ".join(job_data.get("skills_required", [])),
@@ -56,27 +50,13 @@ def generate_questions(job_data: dict, resume_data: dict,
         num_questions=num_questions,
     )
 
-    for attempt in range(MAX_RETRIES):
-        try:
-            response = model.generate_content(
-                prompt,
-                generation_config=genai.GenerationConfig(
-                    response_mime_type="application/json",
-                ),
-            )
-            questions = json.loads(response.text)
-            if isinstance(questions, list):
-                return questions
-            raise ValueError("Expected a JSON array of questions")
-        except Exception as e:
-            err_str = str(e)
-            if "429" in err_str or "ResourceExhausted" in err_str:
-                raise RuntimeError(
-                    "Gemini API quota exceeded. Your free-tier limit has been reached. "
-                    "Please wait for it to reset or enable billing at "
-                    "https://ai.google.dev/gemini-api/docs/rate-limits"
-                )
-            if attempt < MAX_RETRIES - 1:
-                time.sleep(RETRY_DELAY * (attempt + 1))
-            else:
-                raise RuntimeError(f"Failed to generate questions after {MAX_RETRIES} attempts: {e}")
+    # Not cached: asking again should give a fresh set of questions.
+    return generate(prompt, json_output=True, parse=_parse_questions, cache=False,
+                    context="Failed to generate questions")
+
+
+def _parse_questions(text: str) -> List[dict]:
+    questions = json.loads(text)
+    if isinstance(questions, list):
+        return questions
+    raise ValueError("Expected a JSON array of questions")
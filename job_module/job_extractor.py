@@ -1,12 +1,13 @@
+import itertools
 import json
-import time
-from typing import List, Optional
+from typing import Iterable, Iterator, List, Optional, Sequence
 
-import google.generativeai as genai
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, ValidationError
 
-from config import GEMINI_API_KEY, GEMINI_MODEL, MAX_RETRIES, RETRY_DELAY
+from config import JOB_EXTRACTION_BATCH_TOKENS, JOB_EXTRACTION_BATCH_SIZE
 from database import db
+from llm_module.client import LLMError, LLMQuotaError, estimate_tokens, generate
+from match_engine.skill_synonyms import embed_new_terms
 
 
 class JobData(BaseModel):
@@ -43,39 +44,211 @@ Job Description:
 """
 
 
-def extract_job_description(raw_text: str) -> JobData:
-    genai.configure(api_key=GEMINI_API_KEY)
-    model = genai.GenerativeModel(GEMINI_MODEL)
+BATCH_EXTRACTION_PROMPT = """Extract structured information from each of the {count} job descriptions below.
+Return ONLY a valid JSON array with one object per job description, each with these exact keys:
+- "index": integer (the number after "Job Description" that the object describes)
+- "job_title": string
+- "company_name": string
+- "location": string
+- "experience_required": string (e.g. "3-5 years")
+- "skills_required": list of strings
+- "education_required": string
+- "tools_required": list of strings
+- "soft_skills": list of strings
+- "job_type": string (e.g. "Full-time", "Remote", "Hybrid")
+- "salary": string or null
 
-    prompt = EXTRACTION_PROMPT.format(job_text=raw_text)
+If a field is not found in a job description, use an empty string or empty list as appropriate.
+Normalize all skill and tool names to lowercase. Never mix information between job descriptions.
 
-    for attempt in range(MAX_RETRIES):
-        try:
-            response = model.generate_content(
-                prompt,
-                generation_config=genai.GenerationConfig(
-                    response_mime_type="application/json",
-                ),
-            )
-            data = json.loads(response.text)
-            job_data = JobData(**data)
-            return job_data
-        except Exception as e:
-            err_str = str(e)
-            if "429" in err_str or "ResourceExhausted" in err_str:
-                raise RuntimeError(
-                    "Gemini API quota exceeded. Your free-tier limit has been reached. "
-                    "Please wait for it to reset (usually daily) or enable billing at "
-                    "https://ai.google.dev/gemini-api/docs/rate-limits"
-                )
-            if attempt < MAX_RETRIES - 1:
-                time.sleep(RETRY_DELAY * (attempt + 1))
-            else:
-                raise RuntimeError(f"Failed to extract job description after {MAX_RETRIES} attempts: {e}")
+{job_texts}
+"""
+
+
+def extract_job_description(raw_text: str) -> JobData:
+    prompt = EXTRACTION_PROMPT.format(job_text=raw_text)
+    return generate(prompt, json_output=True, parse=lambda text: JobData(**json.loads(text)),
+                    context="Failed to extract job description")
 
 
 def process_job(raw_text: str, embedding=None) -> tuple[int, JobData]:
-    """Extract job data and store in database. Returns (job_id, JobData)."""
+    """Extract job data and store in database. Returns (job_id, JobData).
+
+    A job description that is already stored is returned without calling Gemini.
+    """
+    existing = db.find_job_by_content(raw_text, columns=("structured_data",))
+    if existing is not None:
+        return existing["id"], JobData(**existing["structured_data"])
     job_data = extract_job_description(raw_text)
     job_id = db.save_job(raw_text, job_data.model_dump(), embedding)
     return job_id, job_data
+
+
+# --------------- Batched extraction ---------------
+# For bulk feeds: several JDs go into one request (up to
+# JOB_EXTRACTION_BATCH_SIZE of them and JOB_EXTRACTION_BATCH_TOKENS of text),
+# and the reply is a JSON array keyed by each JD's index in the request. This
+# cuts the request count, which GEMINI_RPM limits, by the batch size. Entries
+# that are missing or fail validation are extracted again one at a time.
+
+def _pack_batches(texts: Sequence[str], max_tokens: int, max_items: int) -> Iterator[list[int]]:
+    """Group consecutive indices of ``texts`` into batches under the token and size limits."""
+    batch, tokens = [], 0
+    for i, text in enumerate(texts):
+        cost = estimate_tokens(text)
+        if batch and (tokens + cost > max_tokens or len(batch) >= max_items):
+            yield batch
+            batch, tokens = [], 0
+        batch.append(i)
+        tokens += cost
+    if batch:
+        yield batch
+
+
+def _parse_batch(text: str, count: int) -> dict[int, JobData]:
+    """Valid entries of a batched reply by their 0-based index; raises ValueError if it is not a JSON array."""
+    items = json.loads(text)
+    if not isinstance(items, list):
+        raise ValueError("Expected a JSON array of job descriptions")
+    parsed = {}
+    for item in items:
+        if not isinstance(item, dict):
+            continue
+        fields = dict(item)
+        index = fields.pop("index", None)
+        if not isinstance(index, int) or not 1 <= index <= count or index - 1 in parsed:
+            continue
+        try:
+            parsed[index - 1] = JobData(**fields)
+        except (ValidationError, TypeError):
+            continue
+    return parsed
+
+
+def _extract_batches(texts: Sequence[str], max_tokens: int, max_items: int,
+                     errors: dict | None) -> Iterator[tuple[int, JobData]]:
+    """Yield ``(index, JobData)`` for ``texts`` one request batch at a time, in input order."""
+    for batch in _pack_batches(texts, max_tokens, max_items):
+        parsed = {}
+        if len(batch) > 1:
+            prompt = BATCH_EXTRACTION_PROMPT.format(
+                count=len(batch),
+                job_texts="\n\n".join(
+                    f"Job Description {n}:\n{texts[i]}" for n, i in enumerate(batch, 1)
+                ),
+            )
+            try:
+                parsed = generate(prompt, json_output=True, parse=lambda text: _parse_batch(text, len(batch)))
+            except LLMQuotaError:
+                raise
+            except LLMError:
+                parsed = {}
+        for n, i in enumerate(batch):
+            job_data = parsed.get(n)
+            if job_data is None:
+                try:
+                    job_data = extract_job_description(texts[i])
+                except LLMQuotaError:
+                    raise
+                except LLMError as e:
+                    if errors is not None:
+                        errors[i] = str(e)
+                    continue
+            yield i, job_data
+
+
+def extract_job_descriptions_batch(raw_texts: Sequence[str], max_tokens: int = JOB_EXTRACTION_BATCH_TOKENS,
+                                   max_items: int = JOB_EXTRACTION_BATCH_SIZE,
+                                   errors: dict | None = None) -> list[JobData | None]:
+    """Extract many job descriptions, several per Gemini request. Returns results in input order.
+
+    Descriptions that still fail on their own are None, with the message in
+    ``errors`` under their index if given. LLMQuotaError stops the run.
+    """
+    results = [None] * len(raw_texts)
+    for i, job_data in _extract_batches(raw_texts, max_tokens, max_items, errors):
+        results[i] = job_data
+    return results
+
+
+def ingest_job_descriptions(raw_texts: Iterable[str], embed: bool = True,
+                            max_tokens: int = JOB_EXTRACTION_BATCH_TOKENS,
+                            max_items: int = JOB_EXTRACTION_BATCH_SIZE,
+                            errors: dict | None = None) -> list[int | None]:
+    """Extract and store a feed of job descriptions. Returns the job ids in input order.
+
+    Descriptions already stored (or repeated within the feed) are not sent
+    to Gemini. New ones are extracted in batches and streamed into
+    save_jobs_bulk, which commits every DB_BULK_CHUNK_SIZE jobs, with
+    summary embeddings when ``embed`` is set (no chunk embeddings; the
+    scorer then uses the summary embedding) and their new skill and tool
+    names embedded for synonym matching (skill_synonyms.embed_new_terms).
+    Descriptions that could not be extracted get None, and their message in
+    ``errors`` if given.
+
+    LLMQuotaError stops the run, but only after every description extracted
+    so far has been stored, so calling again with the same feed resumes
+    where it stopped.
+    """
+    texts = list(raw_texts)
+    ids = [None] * len(texts)
+    first = {}  # content hash -> index of the first new text with it
+    new, repeats = [], []
+    for i, text in enumerate(texts):
+        digest = db.content_hash(text)
+        if digest in first:
+            repeats.append((i, first[digest]))
+            continue
+        existing = db.find_job_by_content(text, columns=())
+        if existing is not None:
+            ids[i] = existing["id"]
+        else:
+            first[digest] = i
+            new.append(i)
+
+    batch_errors = {}
+    quota_error = None
+
+    def until_quota():
+        nonlocal quota_error
+        try:
+            for n, job_data in _extract_batches([texts[i] for i in new], max_tokens, max_items, batch_errors):
+                yield new[n], job_data.model_dump()
+        except LLMQuotaError as e:
+            # End the feed here so save_jobs_bulk commits its last partial chunk; re-raised below.
+            quota_error = e
+
+    extracted = until_quota()
+    if embed:
+        # Imported here so extraction alone never loads the embedding model.
+        from job_module.job_embedding import generate_job_embeddings
+
+        extracted, to_embed = itertools.tee(extracted)
+        embeddings = generate_job_embeddings((data, texts[i]) for i, data in to_embed)
+    else:
+        embeddings = itertools.repeat(None)
+
+    order = []
+
+    def rows():
+        for (i, data), embedding in zip(extracted, embeddings):
+            order.append(i)
+            yield texts[i], data, embedding
+
+    job_ids = db.save_jobs_bulk(rows())
+    for i, job_id in zip(order, job_ids):
+        ids[i] = job_id
+    if embed:
+        embed_new_terms()
+
+    for i, original in repeats:
+        ids[i] = ids[original]
+    if errors is not None:
+        for n, message in batch_errors.items():
+            errors[new[n]] = message
+        for i, original in repeats:
+            if original in errors:
+                errors[i] = errors[original]
+    if quota_error is not None:
+        raise quota_error
+    return ids
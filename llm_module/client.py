@@ -0,0 +1,352 @@
+import random
+import re
+import threading
+import time
+from typing import Callable, Iterator, TypeVar
+
+import google.generativeai as genai
+from google.api_core import exceptions as google_exceptions
+
+from config import (
+    GEMINI_API_KEY, GEMINI_MODEL, GEMINI_RPM, GEMINI_TPM, GEMINI_REQUEST_TIMEOUT,
+    MAX_RETRIES, RETRY_DELAY, RETRY_MAX_DELAY,
+    LLM_CACHE_ENABLED, LLM_CACHE_PATH, LLM_CACHE_TTL_SECONDS, LLM_CACHE_MAX_ENTRIES,
+)
+from llm_module.response_cache import ResponseCache
+
+T = TypeVar("T")
+
+QUOTA_MESSAGE = (
+    "Gemini API quota exceeded. Your free-tier limit has been reached. "
+    "Please wait for it to reset or enable billing at "
+    "https://ai.google.dev/gemini-api/docs/rate-limits"
+)
+
+# Rejections that will not succeed on retry (bad request, bad key, unknown model).
+_PERMANENT_ERRORS = (
+    google_exceptions.InvalidArgument,
+    google_exceptions.PermissionDenied,
+    google_exceptions.Unauthenticated,
+    google_exceptions.NotFound,
+)
+_QUOTA_ERRORS = (google_exceptions.ResourceExhausted, google_exceptions.TooManyRequests)
+_RETRY_IN = re.compile(r"retry in ([\d.]+)\s*s|retry_delay\s*{\s*seconds:\s*(\d+)", re.IGNORECASE)
+
+
+class LLMError(RuntimeError):
+    """A Gemini call failed, after retrying where retrying could help."""
+
+
+class LLMQuotaError(LLMError):
+    """Gemini kept rejecting the call for quota (HTTP 429 / ResourceExhausted)."""
+
+    def __init__(self, message: str = QUOTA_MESSAGE):
+        super().__init__(message)
+
+
+class TokenBucket:
+    """Thread-safe token bucket holding up to ``capacity`` tokens, refilled evenly over ``period`` seconds.
+
+    The level may go negative (``charge``, ``pause``), which holds back
+    later callers until the refill catches up.
+    """
+
+    def __init__(self, capacity: float, period: float = 60.0):
+        self.capacity = float(capacity)
+        self.rate = self.capacity / period
+        self._level = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        self._level = min(self.capacity, self._level + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self, amount: float = 1.0) -> float:
+        """Take ``amount`` tokens (at most the capacity), sleeping until they are available.
+
+        Returns the seconds spent waiting. Callers are served in the order
+        they reserve, so a burst is spread out instead of retried.
+        """
+        amount = min(float(amount), self.capacity)
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            self._level -= amount
+            wait = -self._level / self.rate if self._level < 0 else 0.0
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    def charge(self, amount: float) -> None:
+        """Take (or with a negative amount, return) tokens without waiting."""
+        with self._lock:
+            self._refill(time.monotonic())
+            self._level = min(self.capacity, self._level - amount)
+
+    def pause(self, seconds: float) -> None:
+        """Hold the next token back for ``seconds`` (unless it is held back longer already)."""
+        with self._lock:
+            self._refill(time.monotonic())
+            self._level = min(self._level, 1.0 - seconds * self.rate)
+
+
+_model = None
+_cache = None
+_lock = threading.Lock()
+_requests = TokenBucket(GEMINI_RPM)
+_tokens = TokenBucket(GEMINI_TPM)
+_stats = {
+    "requests": 0,
+    "failures": 0,
+    "retries": 0,
+    "quota_rejections": 0,
+    "throttled_seconds": 0.0,
+    "prompt_tokens": 0,
+    "output_tokens": 0,
+    "streams": 0,
+    "ttft_seconds": 0.0,
+}
+_stats_lock = threading.Lock()
+
+
+def _count(**deltas) -> None:
+    with _stats_lock:
+        for key, delta in deltas.items():
+            _stats[key] += delta
+
+
+def get_model() -> genai.GenerativeModel:
+    """Return the process-wide Gemini model, configuring the client on first use.
+
+    The model keeps its client (and its connections) for the life of the process.
+    """
+    global _model
+    if _model is None:
+        with _lock:
+            if _model is None:
+                genai.configure(api_key=GEMINI_API_KEY)
+                _model = genai.GenerativeModel(GEMINI_MODEL)
+    return _model
+
+
+def get_cache() -> ResponseCache | None:
+    """Return the process-wide response cache, or None when disabled."""
+    global _cache
+    if _cache is None and LLM_CACHE_ENABLED:
+        with _lock:
+            if _cache is None:
+                _cache = ResponseCache(LLM_CACHE_PATH, LLM_CACHE_TTL_SECONDS, LLM_CACHE_MAX_ENTRIES)
+    return _cache
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough Gemini token count of ``text`` (about four characters per token)."""
+    return len(text) // 4 + 1
+
+
+def _retry_after(exc: Exception) -> float | None:
+    """Seconds the server asked us to wait before retrying, if it said."""
+    for detail in getattr(exc, "details", None) or ():
+        delay = getattr(detail, "retry_delay", None)
+        if delay is not None and (delay.seconds or delay.nanos):
+            return delay.seconds + delay.nanos / 1e9
+    match = _RETRY_IN.search(str(exc))
+    if match:
+        return float(match.group(1) or match.group(2))
+    return None
+
+
+def _is_quota_error(exc: Exception) -> bool:
+    # api_core maps gRPC RESOURCE_EXHAUSTED and HTTP 429 to these types; messages are not inspected.
+    return isinstance(exc, _QUOTA_ERRORS)
+
+
+def _backoff(attempt: int) -> float:
+    """Exponential delay before retry ``attempt`` (0-based), with jitter so callers do not retry in step."""
+    return min(RETRY_MAX_DELAY, RETRY_DELAY * 2 ** attempt) * random.uniform(0.5, 1.0)
+
+
+class _BadReply(Exception):
+    """The reply was blocked, empty or rejected by ``parse``; a new sample may be fine."""
+
+
+def _record_usage(response, estimate: int) -> None:
+    usage = getattr(response, "usage_metadata", None)
+    if usage is not None:
+        _count(prompt_tokens=usage.prompt_token_count, output_tokens=usage.candidates_token_count)
+        _tokens.charge(usage.total_token_count - estimate)
+
+
+def _llm_error(message: str, context: str | None) -> LLMError:
+    return LLMError(f"{context}: {message}" if context else message)
+
+
+def _with_retries(call: Callable[[], T], max_retries: int, estimate: int, context: str | None = None) -> T:
+    """Return ``call()``, retrying failed attempts.
+
+    Each attempt waits its turn in the process-wide request and token
+    buckets. Failures are retried with jittered exponential backoff, or after
+    the server's retry-after for a 429, which holds off every caller since
+    the quota is shared. Rejections that cannot succeed on retry are raised
+    after the first attempt.
+
+    Raises LLMQuotaError when the last attempt was still rejected for quota
+    (or the server asks for a longer wait than RETRY_MAX_DELAY), and LLMError
+    for any other failure, prefixed with ``context`` and saying how many
+    attempts were made if more than one.
+    """
+    last_error = None
+    last_was_quota = False
+    for attempt in range(max_retries):
+        if attempt:
+            _count(retries=1)
+        waited = _requests.acquire() + _tokens.acquire(estimate)
+        _count(requests=1, throttled_seconds=waited)
+        try:
+            return call()
+        except _PERMANENT_ERRORS as e:
+            _count(failures=1)
+            raise _llm_error(str(e), context) from e
+        except _BadReply as e:
+            last_error = e.__cause__ or e
+            last_was_quota = False
+            if attempt < max_retries - 1:
+                time.sleep(_backoff(attempt))
+        except Exception as e:
+            last_error = e
+            last_was_quota = _is_quota_error(e)
+            if last_was_quota:
+                _count(quota_rejections=1)
+                retry_after = _retry_after(e)
+                if retry_after is not None and retry_after > RETRY_MAX_DELAY:
+                    _count(failures=1)
+                    raise LLMQuotaError() from e
+                # The next acquire (this retry's included) waits out the delay.
+                _requests.pause(retry_after + random.uniform(0, 1) if retry_after is not None else _backoff(attempt))
+            elif attempt < max_retries - 1:
+                time.sleep(_backoff(attempt))
+
+    _count(failures=1)
+    if last_was_quota:
+        raise LLMQuotaError() from last_error
+    suffix = f" (after {max_retries} attempts)" if max_retries > 1 else ""
+    raise _llm_error(f"{last_error}{suffix}", context) from last_error
+
+
+def generate(prompt: str, json_output: bool = False, parse: Callable[[str], T] | None = None,
+             max_retries: int = MAX_RETRIES, cache: bool = True, context: str | None = None) -> "T | str":
+    """Gemini's reply to ``prompt``: its text, or ``parse(text)`` when ``parse`` is given.
+
+    ``json_output`` asks for a JSON response. A reply to the same prompt and
+    settings is served from the response cache unless ``cache`` is False (for
+    calls meant to vary) or the cached text fails ``parse``.
+
+    Calls wait their turn in the process-wide request and token buckets
+    (GEMINI_RPM / GEMINI_TPM). Failed attempts, including replies ``parse``
+    rejects, are retried (see ``_with_retries`` for the policy and errors).
+    ``context`` (e.g. "Failed to parse resume") prefixes LLMError messages;
+    LLMQuotaError keeps its own message.
+    """
+    generation_config = {"response_mime_type": "application/json"} if json_output else None
+    response_cache = get_cache() if cache else None
+    if response_cache is not None:
+        key = ResponseCache.key(GEMINI_MODEL, prompt, generation_config)
+        text = response_cache.get(key)
+        if text is not None:
+            try:
+                return parse(text) if parse is not None else text
+            except Exception:
+                response_cache.discard(key)
+
+    model = get_model()
+    config = genai.GenerationConfig(**generation_config) if generation_config else None
+    estimate = estimate_tokens(prompt)
+
+    def attempt():
+        response = model.generate_content(
+            prompt, generation_config=config, request_options={"timeout": GEMINI_REQUEST_TIMEOUT},
+        )
+        _record_usage(response, estimate)
+        try:
+            text = response.text
+            return text, parse(text) if parse is not None else text
+        except Exception as e:
+            raise _BadReply() from e
+
+    text, result = _with_retries(attempt, max_retries, estimate, context)
+    if response_cache is not None:
+        response_cache.put(key, GEMINI_MODEL, text)
+    return result
+
+
+def _chunk_text(chunk) -> str:
+    """Text of one streamed chunk; empty for chunks that carry only metadata."""
+    try:
+        return chunk.text
+    except ValueError:
+        return ""
+
+
+def generate_stream(prompt: str, json_output: bool = False, max_retries: int = MAX_RETRIES,
+                    cache: bool = True, context: str | None = None) -> Iterator[str]:
+    """Gemini's reply to ``prompt`` as text chunks, yielded as they are generated.
+
+    Shares the rate limits, retry policy, response cache and ``context`` of ``generate``;
+    a cached reply is yielded as one chunk. Attempts are retried only until
+    the first chunk arrives; a failure after that raises LLMError (the
+    caller has already shown part of the reply). The time from the call to
+    the first chunk is recorded in the stats as time-to-first-token.
+    """
+    start = time.perf_counter()
+    generation_config = {"response_mime_type": "application/json"} if json_output else None
+    response_cache = get_cache() if cache else None
+    if response_cache is not None:
+        key = ResponseCache.key(GEMINI_MODEL, prompt, generation_config)
+        text = response_cache.get(key)
+        if text is not None:
+            _count(streams=1, ttft_seconds=time.perf_counter() - start)
+            yield text
+            return
+
+    model = get_model()
+    config = genai.GenerationConfig(**generation_config) if generation_config else None
+    estimate = estimate_tokens(prompt)
+
+    def first_chunk():
+        response = model.generate_content(
+            prompt, generation_config=config, stream=True, request_options={"timeout": GEMINI_REQUEST_TIMEOUT},
+        )
+        chunks = iter(response)
+        for chunk in chunks:
+            text = _chunk_text(chunk)
+            if text:
+                return response, chunks, text
+        _record_usage(response, estimate)
+        raise _BadReply() from ValueError("Gemini returned an empty response")
+
+    response, chunks, text = _with_retries(first_chunk, max_retries, estimate, context)
+    _count(streams=1, ttft_seconds=time.perf_counter() - start)
+    parts = [text]
+    yield text
+    try:
+        for chunk in chunks:
+            text = _chunk_text(chunk)
+            if text:
+                parts.append(text)
+                yield text
+    except Exception as e:
+        _count(failures=1)
+        raise _llm_error(f"Stream interrupted: {e}", context) from e
+    _record_usage(response, estimate)
+    if response_cache is not None:
+        response_cache.put(key, GEMINI_MODEL, "".join(parts))
+
+
+def get_stats() -> dict:
+    """Counters for every call made through this module since the process started."""
+    with _stats_lock:
+        stats = dict(_stats, throttled_seconds=round(_stats["throttled_seconds"], 2))
+    stats["mean_ttft_seconds"] = round(stats.pop("ttft_seconds") / stats["streams"], 3) if stats["streams"] else None
+    stats["cache"] = _cache.stats() if _cache is not None else None
+    return stats
@@ -0,0 +1,109 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+
+
+class ResponseCache:
+    """SQLite cache of LLM reply texts keyed by ``(model, sha256(prompt), generation config)``.
+
+    Entries older than ``ttl_seconds`` are never served. Once the table holds
+    more than ``max_entries``, the least recently used entries are evicted
+    (expired ones first). The model is part of the key, so switching
+    ``GEMINI_MODEL`` never returns another model's replies.
+    """
+
+    # Evict in batches rather than on every insert.
+    _EVICT_SLACK = 0.1
+
+    def __init__(self, path: str, ttl_seconds: float, max_entries: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode = WAL")
+        self._conn.execute("PRAGMA synchronous = NORMAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                model TEXT NOT NULL,
+                response TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                used_at REAL NOT NULL
+            ) WITHOUT ROWID
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_used_at ON responses (used_at)")
+        self._entries = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.evictions = 0
+
+    @staticmethod
+    def key(model: str, prompt: str, generation_config: dict | None = None) -> str:
+        config = json.dumps(generation_config or {}, sort_keys=True)
+        return hashlib.sha256(f"{model}\0{config}\0{prompt}".encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> str | None:
+        """The cached reply for ``key``, or None if absent or expired."""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute("SELECT response, created_at FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            if now - row[1] > self.ttl_seconds:
+                self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._entries -= 1
+                self.expired += 1
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE responses SET used_at = ? WHERE key = ?", (now, key))
+            self.hits += 1
+            return row[0]
+
+    def put(self, key: str, model: str, response: str) -> None:
+        now = time.time()
+        with self._lock:
+            cursor = self._conn.execute(
+                "INSERT OR IGNORE INTO responses VALUES (?, ?, ?, ?, ?)", (key, model, response, now, now),
+            )
+            if cursor.rowcount:
+                self._entries += 1
+            else:
+                self._conn.execute(
+                    "UPDATE responses SET response = ?, created_at = ?, used_at = ? WHERE key = ?",
+                    (response, now, now, key),
+                )
+            if self._entries > self.max_entries * (1 + self._EVICT_SLACK):
+                self._evict(now)
+
+    def discard(self, key: str) -> None:
+        """Drop an entry, e.g. a reply the caller could not use."""
+        with self._lock:
+            self._entries -= self._conn.execute("DELETE FROM responses WHERE key = ?", (key,)).rowcount
+
+    def _evict(self, now: float) -> None:
+        removed = self._conn.execute(
+            "DELETE FROM responses WHERE created_at < ?", (now - self.ttl_seconds,),
+        ).rowcount
+        excess = self._entries - removed - self.max_entries
+        if excess > 0:
+            removed += self._conn.execute(
+                "DELETE FROM responses WHERE key IN (SELECT key FROM responses ORDER BY used_at LIMIT ?)",
+                (excess,),
+            ).rowcount
+        self._entries -= removed
+        self.evictions += removed
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "expired": self.expired,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else None,
+            "entries": self._entries,
+        }
@@ -0,0 +1,394 @@
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from multiprocessing import shared_memory
+from typing import Callable, Iterable
+
+import numpy as np
+
+from config import SCORING_WEIGHTS, CROSS_SCORING_WORKERS, CROSS_SCORING_JOB_TILE, CROSS_SCORING_RESUME_TILE
+from database import db
+from database.normalize import EDUCATION_LEVELS
+from match_engine.scorer import (
+    _PROFILE_COLUMNS, _education_score, _experience_score, _job_terms_by_name, _row_level, _row_years, _unit_rows,
+    scorer_settings, weights_version,
+)
+from match_engine.skill_synonyms import expand_term_ids
+
+
+# Scores every selected job against every selected resume and stores the
+# results in match_results. The parent process lays the scoring inputs out
+# once in a shared memory block:
+#   - unit-normalized summary embeddings of both sides (float32),
+#   - per job, the term ids it accepts for each required skill/tool (its own
+#     id plus synonyms, see skill_synonyms) and which required term each stands for,
+#   - per resume term, the resumes that have it (an inverted index),
+#   - indices into small experience/education score tables (education levels
+#     shifted by one, so the scorer's -1 for an unknown level is row 0).
+# Worker processes attach to the block and score (job tile x resume tile)
+# tasks: one matrix product for semantics, and a bitset per resume of which
+# required terms it covers. Only the parent writes to SQLite.
+#
+# The semantic component always uses the summary embeddings, so results are
+# tagged with the "single" semantic mode weights_version and scorer_settings.
+
+_UNIT_ROWS_CHUNK = 16384
+_ALIGN = 64
+
+_worker = {}  # per worker process: the attached block, its arrays and the run settings
+
+
+# --------------- Shared arrays ---------------
+
+def _allocate(specs: dict[str, tuple[tuple, str]]) -> tuple[shared_memory.SharedMemory, dict]:
+    """One shared memory block holding an array per ``{name: (shape, dtype)}``. Returns it and its layout."""
+    layout, size = {}, 0
+    for name, (shape, dtype) in specs.items():
+        layout[name] = (size, tuple(shape), np.dtype(dtype).str)
+        size += -(-int(np.prod(shape, dtype=np.int64)) * np.dtype(dtype).itemsize // _ALIGN) * _ALIGN
+    return shared_memory.SharedMemory(create=True, size=max(size, 1)), layout
+
+
+def _views(shm: shared_memory.SharedMemory, layout: dict) -> dict[str, np.ndarray]:
+    return {
+        name: np.ndarray(shape, dtype=np.dtype(dtype), buffer=shm.buf, offset=offset)
+        for name, (offset, shape, dtype) in layout.items()
+    }
+
+
+def _attach(name: str) -> shared_memory.SharedMemory:
+    try:
+        # The parent owns the block; Python 3.13+ can skip registering it with the resource tracker.
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        return shared_memory.SharedMemory(name=name)
+
+
+# --------------- Worker ---------------
+
+def _init_worker(shm_name: str, layout: dict, settings: dict) -> None:
+    shm = _attach(shm_name)
+    _worker.update(shm=shm, arrays=_views(shm, layout), settings=settings)
+
+
+if hasattr(np, "bitwise_count"):
+    def _popcount(masks: np.ndarray) -> np.ndarray:
+        return np.bitwise_count(masks).sum(axis=1, dtype=np.int64)
+else:
+    def _popcount(masks: np.ndarray) -> np.ndarray:
+        return np.unpackbits(masks.view(np.uint8), axis=1).sum(axis=1, dtype=np.int64)
+
+
+def _hit_masks(arrays: dict, kind: str, job: int, r0: int, r1: int, words: int) -> np.ndarray:
+    """``(r1 - r0, words)`` bitsets: bit ``i`` is set when the resume covers the job's ``i``-th required term."""
+    masks = np.zeros((r1 - r0, words), dtype=np.uint64)
+    lo, hi = arrays[f"{kind}_accept_offsets"][job:job + 2]
+    offsets, postings = arrays[f"{kind}_post_offsets"], arrays[f"{kind}_postings"]
+    for term, owner in zip(arrays[f"{kind}_accept_ids"][lo:hi].tolist(),
+                           arrays[f"{kind}_accept_owners"][lo:hi].tolist()):
+        rows = postings[offsets[term]:offsets[term + 1]]
+        rows = rows[np.searchsorted(rows, r0):np.searchsorted(rows, r1)] - r0
+        masks[rows, owner >> 6] |= np.uint64(1 << (owner & 63))
+    return masks
+
+
+def _score_tile(tile: int, j0: int, j1: int, r0: int, r1: int) -> tuple[int, dict]:
+    """Score jobs ``j0:j1`` against resumes ``r0:r1`` (positions in the run's id arrays).
+
+    Returns the tile number and the pairs that may reach min_score, with
+    their unrounded total and components.
+    """
+    arrays, settings = _worker["arrays"], _worker["settings"]
+    w, min_score = settings["weights"], settings["min_score"]
+    sem = np.clip(arrays["job_unit"][j0:j1] @ arrays["resume_unit"][r0:r1].T, 0.0, 1.0)
+    exp_rows = settings["exp_table"][:, arrays["resume_years"][r0:r1]]
+    edu_rows = settings["edu_table"][:, arrays["resume_levels"][r0:r1]]
+
+    parts = []
+    for job in range(j0, j1):
+        skill_masks = _hit_masks(arrays, "skill", job, r0, r1, settings["skill_words"])
+        tool_masks = _hit_masks(arrays, "tool", job, r0, r1, settings["tool_words"])
+        skill_pct = settings["pct_table"][arrays["skill_counts"][job], _popcount(skill_masks)]
+        tools_pct = settings["pct_table"][arrays["tool_counts"][job], _popcount(tool_masks)]
+        exp = exp_rows[arrays["job_years"][job]]
+        edu = edu_rows[arrays["job_levels"][job]]
+        sem_row = sem[job - j0]
+        # Same operation order as scorer._weighted_score, so the parent rounds the identical float.
+        total = (
+            w["semantic"] * (sem_row.astype(np.float64) * 100)
+            + w["skill"] * skill_pct
+            + w["experience"] * exp
+            + w["education"] * edu
+            + w["tools"] * tools_pct
+        )
+        # Rounding can lift a total by at most 0.05; the parent applies the exact cut.
+        keep = np.flatnonzero(total >= min_score - 0.05) if min_score is not None else np.arange(r1 - r0)
+        parts.append({
+            "job": np.full(len(keep), job, dtype=np.int64), "resume": keep + r0, "sem": sem_row[keep],
+            "skill_masks": skill_masks[keep], "tool_masks": tool_masks[keep], "skill_pct": skill_pct[keep],
+            "exp": exp[keep], "edu": edu[keep], "tools_pct": tools_pct[keep], "total": total[keep],
+        })
+    return tile, {key: np.concatenate([p[key] for p in parts]) for key in parts[0]}
+
+
+# --------------- Run setup ---------------
+
+def _load_side(table: str, ids: list[int] | None, max_id: int | None) -> dict[str, list]:
+    """Ids, term ids and parsed profile of the run's jobs or resumes, in id order."""
+    columns = ("skill_ids", "tool_ids") + _PROFILE_COLUMNS
+    if ids is not None:
+        rows = db.get_jobs(ids, columns) if table == "jobs" else db.get_resumes(ids, columns)
+    else:
+        rows = db.iter_jobs_after(0, columns) if table == "jobs" else db.iter_resumes_after(0, columns)
+    side = {"ids": [], "skills": [], "tools": [], "years": [], "levels": []}
+    for row in rows:
+        if max_id is not None and row["id"] > max_id:
+            break
+        side["ids"].append(row["id"])
+        side["skills"].append(row["skill_ids"])
+        side["tools"].append(row["tool_ids"])
+        side["years"].append(_row_years(row))
+        side["levels"].append(_row_level(row))
+    return side
+
+
+def _accept_csr(term_lists: list[np.ndarray]) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Per job, every id it accepts and the index of the required term each stands for (CSR layout)."""
+    expanded = [expand_term_ids(terms) for terms in term_lists]
+    lengths = [len(ids) for ids, _ in expanded]
+    offsets = np.concatenate([[0], np.cumsum(lengths, dtype=np.int64)])
+    ids = np.concatenate([ids for ids, _ in expanded] + [np.empty(0, dtype=np.int64)])
+    owners = np.concatenate([o for _, o in expanded] + [np.empty(0, dtype=np.int64)])
+    return offsets, ids.astype(np.int32), owners.astype(np.int32)
+
+
+def _postings(term_lists: list[np.ndarray], vocab_size: int) -> tuple[np.ndarray, np.ndarray]:
+    """Inverted index: for each term id, the ascending positions of the resumes that have it."""
+    lengths = np.fromiter((len(t) for t in term_lists), dtype=np.int64, count=len(term_lists))
+    flat = np.concatenate(term_lists + [np.empty(0, dtype=np.int64)]).astype(np.int64)
+    rows = np.repeat(np.arange(len(term_lists), dtype=np.int32), lengths)
+    offsets = np.zeros(vocab_size + 1, dtype=np.int64)
+    np.cumsum(np.bincount(flat, minlength=vocab_size), out=offsets[1:])
+    return offsets, rows[np.argsort(flat, kind="stable")]
+
+
+def _fill_unit(view: np.ndarray, table: str, ids: list[int]) -> None:
+    """Write the unit-normalized stored embedding of each id into ``view``; zeros where none is stored."""
+    store = db.get_embedding_store(table)
+    matrix = store.matrix()
+    positions = store.positions(ids)
+    for start in range(0, len(ids), _UNIT_ROWS_CHUNK):
+        pos = positions[start:start + _UNIT_ROWS_CHUNK]
+        block = np.zeros((len(pos), view.shape[1]), dtype=np.float32)
+        if (pos >= 0).any():
+            block[pos >= 0] = _unit_rows(matrix[pos[pos >= 0]])
+        view[start:start + len(pos)] = block
+
+
+def _build_shared(jobs: dict, resumes: dict, weights: dict, min_score: float | None):
+    """Lay the run out in shared memory. Returns the block, its layout, worker settings and job term names."""
+    job_skills = [_job_terms_by_name(t) for t in jobs["skills"]]
+    job_tools = [_job_terms_by_name(t) for t in jobs["tools"]]
+    skill_accept = _accept_csr([ids for ids, _ in job_skills])
+    tool_accept = _accept_csr([ids for ids, _ in job_tools])
+
+    term_max = [int(a.max()) for a in (skill_accept[1], tool_accept[1]) if len(a)]
+    term_max += [int(t.max()) for t in resumes["skills"] + resumes["tools"] if len(t)]
+    vocab_size = max(term_max, default=-1) + 1
+    skill_post = _postings(resumes["skills"], vocab_size)
+    tool_post = _postings(resumes["tools"], vocab_size)
+
+    req_values, job_years = np.unique(np.asarray(jobs["years"], dtype=np.float64), return_inverse=True)
+    cand_values, resume_years = np.unique(np.asarray(resumes["years"], dtype=np.float64), return_inverse=True)
+    levels = range(-1, max(EDUCATION_LEVELS.values()) + 1)
+    skill_counts = np.array([len(ids) for ids, _ in job_skills], dtype=np.int64)
+    tool_counts = np.array([len(ids) for ids, _ in job_tools], dtype=np.int64)
+    max_terms = int(max(skill_counts.max(initial=0), tool_counts.max(initial=0)))
+    settings = {
+        "weights": dict(weights),
+        "min_score": min_score,
+        "skill_words": max(1, -(-int(skill_counts.max(initial=0)) // 64)),
+        "tool_words": max(1, -(-int(tool_counts.max(initial=0)) // 64)),
+        # Component lookup tables built with the scorer's own helpers, so rounding is identical.
+        "pct_table": np.array([[round(k / n * 100, 1) if n else 100.0 for k in range(max_terms + 1)]
+                               for n in range(max_terms + 1)]),
+        "exp_table": np.array([[_experience_score(r, c) for c in cand_values.tolist()]
+                               for r in req_values.tolist()]).reshape(len(req_values), len(cand_values)),
+        "edu_table": np.array([[_education_score(r, c) for c in levels] for r in levels]),
+    }
+
+    dims = {db.get_embedding_store(table).dim for table in ("jobs", "resumes")} - {None}
+    if len(dims) > 1:
+        raise ValueError(f"Job and resume embeddings differ in dimension: {sorted(dims)}")
+    dim = dims.pop() if dims else 1
+    arrays = {
+        "skill_accept_offsets": skill_accept[0], "skill_accept_ids": skill_accept[1],
+        "skill_accept_owners": skill_accept[2],
+        "tool_accept_offsets": tool_accept[0], "tool_accept_ids": tool_accept[1],
+        "tool_accept_owners": tool_accept[2],
+        "skill_post_offsets": skill_post[0], "skill_postings": skill_post[1],
+        "tool_post_offsets": tool_post[0], "tool_postings": tool_post[1],
+        "skill_counts": skill_counts, "tool_counts": tool_counts,
+        "job_years": job_years.astype(np.int32), "resume_years": resume_years.astype(np.int32),
+        "job_levels": np.asarray(jobs["levels"], dtype=np.int32) + 1,
+        "resume_levels": np.asarray(resumes["levels"], dtype=np.int32) + 1,
+    }
+    specs = {name: (a.shape, a.dtype) for name, a in arrays.items()}
+    specs["job_unit"] = ((len(jobs["ids"]), dim), np.float32)
+    specs["resume_unit"] = ((len(resumes["ids"]), dim), np.float32)
+    shm, layout = _allocate(specs)
+    try:
+        views = _views(shm, layout)
+        for name, a in arrays.items():
+            views[name][...] = a
+        _fill_unit(views["job_unit"], "jobs", jobs["ids"])
+        _fill_unit(views["resume_unit"], "resumes", resumes["ids"])
+        del views
+    except BaseException:
+        shm.close()
+        shm.unlink()
+        raise
+    names = [(skills, tools) for (_, skills), (_, tools) in zip(job_skills, job_tools)]
+    return shm, layout, settings, names
+
+
+def _tiles(job_count: int, resume_count: int, job_tile: int, resume_tile: int) -> list[tuple[int, int, int, int]]:
+    """``(j0, j1, r0, r1)`` per tile number."""
+    return [
+        (j0, min(j0 + job_tile, job_count), r0, min(r0 + resume_tile, resume_count))
+        for j0 in range(0, job_count, job_tile)
+        for r0 in range(0, resume_count, resume_tile)
+    ]
+
+
+# --------------- Results ---------------
+
+def _split_terms(names: list[str], mask: tuple[int, ...]) -> tuple[list[str], list[str]]:
+    matched, missing = [], []
+    for i, name in enumerate(names):
+        (matched if mask[i >> 6] >> (i & 63) & 1 else missing).append(name)
+    return matched, missing
+
+
+def _result_rows(out: dict, job_ids: list[int], resume_ids: list[int], names: list,
+                 min_score: float | None, tags: tuple[str, str]) -> list[tuple]:
+    """save_match_results_bulk tuples for a tile's pairs that reach min_score."""
+    rows = []
+    split = {}  # (job, kind, mask) -> (matched, missing); resumes of a job share few distinct masks
+    columns = [out[key].tolist() for key in
+               ("job", "resume", "sem", "skill_masks", "tool_masks", "skill_pct", "exp", "edu", "tools_pct", "total")]
+    for job, resume, sem, skill_mask, tool_mask, skill_pct, exp, edu, tools_pct, total in zip(*columns):
+        final_score = round(min(total, 100.0), 1)
+        if min_score is not None and final_score < min_score:
+            continue
+        terms = []
+        for kind, mask in ((0, tuple(skill_mask)), (1, tuple(tool_mask))):
+            key = (job, kind, mask)
+            if key not in split:
+                split[key] = _split_terms(names[job][kind], mask)
+            terms.append(split[key])
+        result_data = {
+            "matched_skills": terms[0][0],
+            "missing_skills": terms[0][1],
+            "skill_match_pct": skill_pct,
+            "experience_score": exp,
+            "education_score": edu,
+            "matched_tools": terms[1][0],
+            "missing_tools": terms[1][1],
+            "tools_match_pct": tools_pct,
+        }
+        rows.append((job_ids[job], resume_ids[resume], final_score, round(sem, 4), result_data, None, *tags))
+    return rows
+
+
+# --------------- Runs ---------------
+
+def score_all_pairs(job_ids: Iterable[int] | None = None, resume_ids: Iterable[int] | None = None,
+                    min_score: float | None = None, weights: dict | None = None,
+                    workers: int = CROSS_SCORING_WORKERS, job_tile: int = CROSS_SCORING_JOB_TILE,
+                    resume_tile: int = CROSS_SCORING_RESUME_TILE,
+                    progress: Callable[[int, int, int], None] | None = None, cancel=None) -> int:
+    """Score every job against every resume into match_results. Returns the run id.
+
+    ``job_ids`` / ``resume_ids`` default to every row stored when the run
+    starts. Only pairs scoring at least ``min_score`` are stored (all pairs
+    if None). ``progress(tiles_done, tiles_total, rows_written)`` is called
+    after each tile is committed. Setting the ``cancel`` event (anything
+    with ``is_set()``) stops the run after the tiles in flight; it, or a run
+    killed outright, can be continued with resume_scoring_run.
+    """
+    weights = weights or SCORING_WEIGHTS
+    missing = set(SCORING_WEIGHTS) - set(weights)
+    if missing:
+        raise ValueError(f"Missing weights for: {', '.join(sorted(missing))}")
+    params = {
+        "job_ids": sorted(set(job_ids)) if job_ids is not None else None,
+        "resume_ids": sorted(set(resume_ids)) if resume_ids is not None else None,
+        "max_job_id": None,
+        "max_resume_id": None,
+        "min_score": min_score,
+        "weights": dict(weights),
+        "job_tile": job_tile,
+        "resume_tile": resume_tile,
+    }
+    return _run(None, params, workers, progress, cancel)
+
+
+def resume_scoring_run(run_id: int, workers: int = CROSS_SCORING_WORKERS,
+                       progress: Callable[[int, int, int], None] | None = None, cancel=None) -> int:
+    """Continue a cancelled or interrupted run from its unfinished tiles. Returns the run id."""
+    run = db.get_scoring_run(run_id, columns=("params", "status"))
+    if run is None:
+        raise ValueError("Scoring run not found in database.")
+    if run["status"] == "completed":
+        return run_id
+    return _run(run_id, run["params"], workers, progress, cancel)
+
+
+def _run(run_id: int | None, params: dict, workers: int,
+         progress: Callable[[int, int, int], None] | None, cancel) -> int:
+    jobs = _load_side("jobs", params["job_ids"], params["max_job_id"])
+    resumes = _load_side("resumes", params["resume_ids"], params["max_resume_id"])
+    tiles = _tiles(len(jobs["ids"]), len(resumes["ids"]), params["job_tile"], params["resume_tile"])
+    if run_id is None:
+        # Later inserts stay out of the run, so a resumed run sees the same rows and tiles.
+        params["max_job_id"] = jobs["ids"][-1] if jobs["ids"] else 0
+        params["max_resume_id"] = resumes["ids"][-1] if resumes["ids"] else 0
+        run_id = db.create_scoring_run(params, len(tiles))
+    else:
+        db.set_scoring_run_status(run_id, "running")
+    finished = db.get_finished_tiles(run_id)
+    todo = iter([tile for tile in range(len(tiles)) if tile not in finished])
+    tiles_done = len(finished)
+    rows_written = db.get_scoring_run(run_id, columns=("rows_written",))["rows_written"]
+    min_score = params["min_score"]
+    tags = (weights_version(params["weights"], semantic_mode="single"), scorer_settings(semantic_mode="single"))
+
+    shm, layout, settings, names = _build_shared(jobs, resumes, params["weights"], min_score)
+    status = "interrupted"
+    try:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(shm.name, layout, settings)) as pool:
+            running, cancelled = set(), False
+            while True:
+                while not cancelled and len(running) < 2 * workers:
+                    tile = next(todo, None)
+                    if tile is None:
+                        break
+                    running.add(pool.submit(_score_tile, tile, *tiles[tile]))
+                if not running:
+                    break
+                done, running = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    tile, out = future.result()
+                    results = _result_rows(out, jobs["ids"], resumes["ids"], names, min_score, tags)
+                    db.save_scoring_tile(run_id, tile, results)
+                    tiles_done += 1
+                    rows_written += len(results)
+                    if progress is not None:
+                        progress(tiles_done, len(tiles), rows_written)
+                cancelled = cancelled or (cancel is not None and cancel.is_set())
+        status = "completed" if tiles_done == len(tiles) else "cancelled"
+    finally:
+        db.set_scoring_run_status(run_id, status)
+        shm.close()
+        shm.unlink()
+    return run_id
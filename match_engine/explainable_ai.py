@@ -1,9 +1,6 @@
-import json
-import time
+from typing import Iterator
 
-import google.generativeai as genai
-
-from config import GEMINI_API_KEY, GEMINI_MODEL, MAX_RETRIES, RETRY_DELAY
+from llm_module.client import generate, generate_stream
 
 
 EXPLANATION_PROMPT = """You are an expert career advisor. Given the following job-resume match analysis,
@@ -34,16 +31,12 @@ Be specific and actionable. Do not use markdown formatting.
 """
 
 
-def generate_explanation(match_result: dict) -> str:
-    """Use Gemini to generate a human-readable explanation of the match."""
-    genai.configure(api_key=GEMINI_API_KEY)
-    model = genai.GenerativeModel(GEMINI_MODEL)
-
+def _explanation_prompt(match_result: dict) -> str:
     rd = match_result["result_data"]
     jd = match_result.get("job_data", {})
     res = match_result.get("resume_data", {})
 
-    prompt = EXPLANATION_PROMPT.format(
+    return EXPLANATION_PROMPT.format(
         match_score=match_result["match_score"],
         semantic_similarity=match_result["semantic_similarity"],
         matched_skills=", ".join(rd.get("matched_skills", [])) or "None",
@@ -59,17 +52,18 @@ def generate_explanation(match_result: dict) -> str:
         candidate_experience=res.get("experience_years", "N/A"),
     )
 
-    for attempt in range(MAX_RETRIES):
-        try:
-            response = model.generate_content(prompt)
-            return response.text.strip()
-        except Exception as e:
-            err_str = str(e)
-            if "429" in err_str or "ResourceExhausted" in err_str:
-                return ("Unable to generate explanation: Gemini API quota exceeded. "
-                        "Your free-tier limit has been reached. Please wait for it to reset "
-                        "or enable billing at https://ai.google.dev/gemini-api/docs/rate-limits")
-            if attempt < MAX_RETRIES - 1:
-                time.sleep(RETRY_DELAY * (attempt + 1))
-            else:
-                return f"Unable to generate explanation: {e}"
+
+def generate_explanation(match_result: dict) -> str:
+    """Use Gemini to generate a human-readable explanation of the match."""
+    return generate(_explanation_prompt(match_result), context="Unable to generate explanation").strip()
+
+
+def stream_explanation(match_result: dict) -> Iterator[str]:
+    """Like generate_explanation, but yields the text in chunks as Gemini writes it."""
+    started = False
+    for chunk in generate_stream(_explanation_prompt(match_result), context="Unable to generate explanation"):
+        if not started:
+            chunk = chunk.lstrip()
+            started = bool(chunk)
+        if chunk:
+            yield chunk
@@ -0,0 +1,117 @@
+import asyncio
+from typing import Any, Callable
+
+from database import db
+from gap_module.skill_gap import analyze_skill_gap
+from interview_module.question_generator import generate_questions
+from match_engine.explainable_ai import generate_explanation
+from resume_builder.optimizer import optimize_resume
+
+
+# Everything Gemini does after a match, as one fan-out. The explanation, gap
+# analysis and interview questions depend only on the match result, so they
+# are issued together; the optimizer, which needs the gap analysis, starts
+# the moment that lands. The calls are the ordinary blocking ones run in
+# threads, so they still queue in the shared request/token buckets
+# (llm_module.client) and never exceed GEMINI_RPM / GEMINI_TPM. Wall time is
+# roughly max(explanation, questions, gap + optimizer) instead of the sum.
+#
+# Each result is saved as soon as it completes: the explanation onto the
+# match_results row, the gap analysis and optimization into their tables.
+# Interview questions are only returned; they are saved with the answers
+# once the interview is done.
+
+PipelineCallback = Callable[[str, Any], None]
+
+
+async def _step(name: str, results: dict, errors: dict, on_result: PipelineCallback | None,
+                call: Callable, *args, persist: Callable | None = None):
+    """Run ``call(*args)`` in a thread, save and report its result. Returns it, or None on failure."""
+    try:
+        value = await asyncio.to_thread(call, *args)
+        if persist is not None:
+            await asyncio.to_thread(persist, value)
+    except Exception as e:
+        errors[name] = str(e)
+        if on_result is not None:
+            on_result(name, e)
+        return None
+    results[name] = value
+    if on_result is not None:
+        on_result(name, value)
+    return value
+
+
+async def run_post_match_pipeline(match_result: dict, job_id: int, resume_id: int,
+                                  match_id: int | None = None, num_questions: int = 5,
+                                  on_result: PipelineCallback | None = None, explanation: bool = True) -> dict:
+    """Generate and save the explanation, gap analysis, optimization and questions for a match.
+
+    ``match_result`` is what calculate_match_score returns. It is saved to
+    match_results first unless ``match_id`` (or the cached result's own
+    ``match_id``) says where it already is.
+    ``on_result(name, value)`` is called on the event loop's thread as each of
+    "explanation", "gap_analysis", "optimization" and "questions" completes,
+    with the exception instead of the value if that step failed. A failed
+    step does not stop the others, and nothing is saved for it. The
+    optimizer needs the gap analysis, so if that fails the optimization is
+    skipped (not run, and not reported to ``on_result``). Pass
+    ``explanation=False`` when the caller streams the explanation itself
+    (stream_explanation) and saves it.
+
+    Returns ``{"match_id", "explanation", "gap_analysis", "optimization",
+    "questions", "errors", "skipped"}``, with dicts for the gap analysis and
+    optimization, None for failed or skipped steps, ``errors`` mapping failed
+    steps to messages and ``skipped`` mapping skipped steps to the reason.
+    """
+    job_data = match_result["job_data"]
+    resume_data = match_result["resume_data"]
+    rd = match_result["result_data"]
+    if match_id is None:
+        match_id = match_result.get("match_id")
+    if match_id is None:
+        match_id = await asyncio.to_thread(
+            db.save_match_result, job_id, resume_id, match_result["match_score"],
+            match_result["semantic_similarity"], rd, None,
+            weights_version=match_result.get("weights_version"),
+            scorer_settings=match_result.get("scorer_settings"),
+        )
+
+    results = {}
+    errors = {}
+    skipped = {}
+
+    async def gap_then_optimize():
+        gap = await _step(
+            "gap_analysis", results, errors, on_result,
+            lambda: analyze_skill_gap(job_data, resume_data, rd).model_dump(),
+            persist=lambda gap_dict: db.save_gap_analysis(match_id, gap_dict),
+        )
+        if gap is None:
+            skipped["optimization"] = "gap analysis failed"
+            return
+        await _step(
+            "optimization", results, errors, on_result,
+            lambda: optimize_resume(job_data, resume_data, gap).model_dump(),
+            persist=lambda opt_dict: db.save_resume_optimization(match_id, opt_dict),
+        )
+
+    steps = [
+        gap_then_optimize(),
+        _step(
+            "questions", results, errors, on_result, generate_questions,
+            job_data, resume_data, match_result["match_score"], rd.get("missing_skills", []), num_questions,
+        ),
+    ]
+    if explanation:
+        steps.append(_step(
+            "explanation", results, errors, on_result, generate_explanation, match_result,
+            persist=lambda text: db.update_match_explanation(match_id, text),
+        ))
+    await asyncio.gather(*steps)
+    return {
+        "match_id": match_id,
+        **{name: results.get(name) for name in ("explanation", "gap_analysis", "optimization", "questions")},
+        "errors": errors,
+        "skipped": skipped,
+    }
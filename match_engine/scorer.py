@@ -1,8 +1,51 @@
+import hashlib
+import heapq
+import json
+import threading
+from typing import Iterable
+
 import numpy as np
 from sklearn.metrics.pairwise import cosine_similarity
 
-from config import SCORING_WEIGHTS
+from config import (
+    SCORING_WEIGHTS, SEMANTIC_SIMILARITY_MODE, SCORER_BLOCK_SIZE, ANN_SHORTLIST_SIZE, ANN_NPROBE,
+    SKILL_SYNONYMS_ENABLED, SKILL_SYNONYM_THRESHOLD,
+)
 from database import db
+from database.normalize import EDUCATION_LEVELS, education_level, experience_years, parse_experience_range
+from database.quantization import cosine_scores
+from match_engine.skill_synonyms import expand_term_ids, expand_term_set
+
+
+# Bump whenever a scoring change alters any component score, so match results
+# stored under the old version stop being served from the cache.
+SCORER_VERSION = 1
+
+
+def _settings_payload(semantic_mode: str) -> dict:
+    return {
+        "scorer": SCORER_VERSION,
+        "semantic_mode": semantic_mode,
+        "synonym_threshold": SKILL_SYNONYM_THRESHOLD if SKILL_SYNONYMS_ENABLED else None,
+    }
+
+
+def _short_hash(payload: dict) -> str:
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode()).hexdigest()[:16]
+
+
+def weights_version(weights: dict | None = None, semantic_mode: str = SEMANTIC_SIMILARITY_MODE) -> str:
+    """Short id of ``weights`` (default SCORING_WEIGHTS) plus the scoring settings behind the components."""
+    return _short_hash({"weights": weights or SCORING_WEIGHTS, **_settings_payload(semantic_mode)})
+
+
+def scorer_settings(semantic_mode: str = SEMANTIC_SIMILARITY_MODE) -> str:
+    """Short id of the scoring settings alone: results with the same id have comparable components."""
+    return _short_hash(_settings_payload(semantic_mode))
+
+
+_WEIGHTS_VERSION = weights_version()
+_SCORER_SETTINGS = scorer_settings()
 
 
 def compute_semantic_similarity(job_embedding: np.ndarray, resume_embedding: np.ndarray) -> float:
@@ -14,75 +57,198 @@ def compute_semantic_similarity(job_embedding: np.ndarray, resume_embedding: np.
     return float(max(0.0, min(1.0, sim)))
 
 
+def compute_semantic_scores(job_embedding: np.ndarray, resume_matrix: np.ndarray) -> np.ndarray:
+    """Cosine similarity of one job against a float32, float16 or int8 resume matrix. Returns 0-1 per row."""
+    return np.clip(cosine_scores(job_embedding, resume_matrix), 0.0, 1.0)
+
+
+def _unit_rows(matrix: np.ndarray) -> np.ndarray:
+    matrix = np.asarray(matrix, dtype=np.float32)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix / np.where(norms > 0, norms, 1.0)
+
+
+def compute_chunked_similarity(job_chunks: np.ndarray, resume_chunks: np.ndarray) -> float:
+    """Mean-of-max similarity between two chunk-embedding matrices. Returns 0-1.
+
+    Every job chunk is matched to its best resume chunk with one matrix
+    product, and the best scores are averaged, so a requirement covered
+    anywhere in the resume counts no matter where it appears.
+    """
+    if len(job_chunks) == 0 or len(resume_chunks) == 0:
+        return 0.0
+    sims = _unit_rows(job_chunks) @ _unit_rows(resume_chunks).T
+    return float(np.clip(sims.max(axis=1).mean(), 0.0, 1.0))
+
+
+def compute_chunked_similarities(job_chunks: np.ndarray, resume_chunks: list[np.ndarray]) -> np.ndarray:
+    """``compute_chunked_similarity`` of one job against many resumes with a single matrix product."""
+    scores = np.zeros(len(resume_chunks), dtype=np.float32)
+    present = [i for i, chunks in enumerate(resume_chunks) if chunks is not None and len(chunks)]
+    if len(job_chunks) == 0 or not present:
+        return scores
+    stacked = np.concatenate([resume_chunks[i] for i in present])
+    offsets = np.cumsum([0] + [len(resume_chunks[i]) for i in present[:-1]])
+    sims = _unit_rows(job_chunks) @ _unit_rows(stacked).T
+    best = np.maximum.reduceat(sims, offsets, axis=1)
+    scores[present] = np.clip(best.mean(axis=0), 0.0, 1.0)
+    return scores
+
+
+def _normalize_terms(terms: list[str]) -> set[str]:
+    return {db.normalize_term(t) for t in terms}
+
+
 def compute_skill_match(job_skills: list[str], resume_skills: list[str]) -> dict:
     """Compare required skills against resume skills."""
-    job_set = {s.lower().strip() for s in job_skills}
-    resume_set = {s.lower().strip() for s in resume_skills}
+    job_set = _normalize_terms(job_skills)
+    resume_set = _normalize_terms(resume_skills)
     matched = sorted(job_set & resume_set)
     missing = sorted(job_set - resume_set)
     pct = (len(matched) / len(job_set) * 100) if job_set else 100.0
     return {"matched_skills": matched, "missing_skills": missing, "match_percentage": round(pct, 1)}
 
 
-def compute_experience_match(required: str, candidate: str) -> float:
-    """Heuristic experience match. Returns 0-100."""
-    def _parse_years(text: str) -> float:
-        text = text.lower().replace("+", "").replace("years", "").replace("year", "").strip()
-        if "-" in text:
-            parts = text.split("-")
-            try:
-                return (float(parts[0]) + float(parts[1])) / 2
-            except ValueError:
-                return 0.0
-        try:
-            return float(text)
-        except ValueError:
-            return 0.0
-
-    req = _parse_years(required)
-    cand = _parse_years(candidate)
+def compute_term_id_match(job_ids: np.ndarray, resume_ids: np.ndarray, kind: str) -> dict:
+    """compute_skill_match / compute_tools_match over interned term ids (``kind`` is "skills" or "tools").
+
+    A required term also counts as matched when the resume has one of its
+    near-synonyms (see skill_synonyms).
+    """
+    hits = _term_hits(np.asarray(job_ids, dtype=np.int64), [resume_ids])[0]
+    matched = job_ids[hits]
+    missing = job_ids[~hits]
+    pct = (len(matched) / len(job_ids) * 100) if len(job_ids) else 100.0
+    return {
+        f"matched_{kind}": sorted(db.get_term_names(matched)),
+        f"missing_{kind}": sorted(db.get_term_names(missing)),
+        "match_percentage": round(pct, 1),
+    }
+
+
+def parse_experience_years(text: str) -> float:
+    """Years from free text such as "3", "5+" or "3-5 years" (ranges give the midpoint). 0 if unparseable."""
+    return experience_years(*parse_experience_range(text))
+
+
+def _row_years(row) -> float:
+    """Experience figure of a job or resume row from its parsed columns."""
+    return experience_years(row["experience_years_min"], row["experience_years_max"])
+
+
+def _experience_score(req: float, cand: float) -> float:
     if req == 0:
         return 100.0
     ratio = cand / req if req > 0 else 1.0
     return round(min(ratio * 100, 100.0), 1)
 
 
-def compute_education_match(required_edu: str, candidate_edu: str) -> float:
-    """Simple education level matching. Returns 0-100."""
-    levels = {"high school": 1, "diploma": 2, "associate": 2, "bachelor": 3, "master": 4, "phd": 5, "doctorate": 5}
-    req_level = 0
-    cand_level = 0
-    req_lower = required_edu.lower()
-    cand_lower = candidate_edu.lower()
-    for keyword, level in levels.items():
-        if keyword in req_lower:
-            req_level = max(req_level, level)
-        if keyword in cand_lower:
-            cand_level = max(cand_level, level)
-    if req_level == 0:
+def compute_experience_match(required: str, candidate: str) -> float:
+    """Heuristic experience match. Returns 0-100."""
+    return _experience_score(parse_experience_years(required), parse_experience_years(candidate))
+
+
+def _row_level(row) -> int:
+    """Education level of a job or resume row, -1 if it was never parsed (NULL)."""
+    level = row["education_level"]
+    return -1 if level is None else level
+
+
+def _education_score(req_level: int, cand_level: int) -> float:
+    # An unknown level (-1) counts as no education mentioned.
+    if req_level <= 0:
         return 100.0
     if cand_level >= req_level:
         return 100.0
-    return round(cand_level / req_level * 100, 1)
+    return round(max(cand_level, 0) / req_level * 100, 1)
+
+
+def compute_education_match(required_edu: str, candidate_edu: str) -> float:
+    """Simple education level matching. Returns 0-100."""
+    return _education_score(education_level(required_edu), education_level(candidate_edu))
 
 
 def compute_tools_match(job_tools: list[str], resume_tools: list[str]) -> dict:
     """Compare required tools against resume tools."""
-    job_set = {t.lower().strip() for t in job_tools}
-    resume_set = {t.lower().strip() for t in resume_tools}
+    job_set = _normalize_terms(job_tools)
+    resume_set = _normalize_terms(resume_tools)
     matched = sorted(job_set & resume_set)
     missing = sorted(job_set - resume_set)
     pct = (len(matched) / len(job_set) * 100) if job_set else 100.0
     return {"matched_tools": matched, "missing_tools": missing, "match_percentage": round(pct, 1)}
 
 
+def _weighted_score(sem_sim, skill_pct, exp_score, edu_score, tools_pct):
+    """Weighted 0-100 score before capping. Works on floats and on NumPy arrays alike."""
+    w = SCORING_WEIGHTS
+    return (
+        w["semantic"] * (sem_sim * 100)
+        + w["skill"] * skill_pct
+        + w["experience"] * exp_score
+        + w["education"] * edu_score
+        + w["tools"] * tools_pct
+    )
+
+
+def _assemble_result(final_score: float, sem_sim: float, skill_result: dict, exp_score: float,
+                     edu_score: float, tools_result: dict, job_data: dict, resume_data: dict) -> dict:
+    result_data = {
+        "matched_skills": skill_result["matched_skills"],
+        "missing_skills": skill_result["missing_skills"],
+        "skill_match_pct": skill_result["match_percentage"],
+        "experience_score": exp_score,
+        "education_score": edu_score,
+        "matched_tools": tools_result["matched_tools"],
+        "missing_tools": tools_result["missing_tools"],
+        "tools_match_pct": tools_result["match_percentage"],
+    }
+
+    return {
+        "match_score": final_score,
+        "semantic_similarity": round(sem_sim, 4),
+        "result_data": result_data,
+        "job_data": job_data,
+        "resume_data": resume_data,
+        "weights_version": _WEIGHTS_VERSION,
+        "scorer_settings": _SCORER_SETTINGS,
+    }
+
+
+_PROFILE_COLUMNS = ("experience_years_min", "experience_years_max", "education_level")
+
+
+def _cached_match(job_id: int, resume_id: int) -> dict | None:
+    cached = db.find_match_result(
+        job_id, resume_id, _WEIGHTS_VERSION, _SCORER_SETTINGS,
+        columns=("match_score", "semantic_similarity", "result_data"),
+    )
+    if cached is None:
+        return None
+    return {
+        "match_id": cached["id"],
+        "match_score": cached["match_score"],
+        "semantic_similarity": cached["semantic_similarity"],
+        "result_data": cached["result_data"],
+        "job_data": db.get_job(job_id, columns=("structured_data",))["structured_data"],
+        "resume_data": db.get_resume(resume_id, columns=("structured_data",))["structured_data"],
+        "weights_version": _WEIGHTS_VERSION,
+        "scorer_settings": _SCORER_SETTINGS,
+    }
+
+
 def calculate_match_score(job_id: int, resume_id: int) -> dict:
     """Calculate weighted match score between a job and resume.
 
-    Returns a comprehensive result dict and stores it in the database.
+    Returns a comprehensive result dict. A result already saved for the pair
+    under the current weights_version is returned as is, with its row id as
+    ``match_id``.
     """
-    job = db.get_job(job_id)
-    resume = db.get_resume(resume_id)
+    cached = _cached_match(job_id, resume_id)
+    if cached is not None:
+        return cached
+    columns = ("structured_data", "embedding", "chunk_embeddings", "skill_ids", "tool_ids") + _PROFILE_COLUMNS
+    job = db.get_job(job_id, columns=columns)
+    resume = db.get_resume(resume_id, columns=columns)
     if not job or not resume:
         raise ValueError("Job or resume not found in database.")
 
@@ -91,61 +257,442 @@ def calculate_match_score(job_id: int, resume_id: int) -> dict:
 
     # Semantic similarity
     sem_sim = 0.0
-    if job.get("embedding") is not None and resume.get("embedding") is not None:
+    if (SEMANTIC_SIMILARITY_MODE == "chunked"
+            and job["chunk_embeddings"] is not None and resume["chunk_embeddings"] is not None):
+        sem_sim = compute_chunked_similarity(job["chunk_embeddings"], resume["chunk_embeddings"])
+    elif job.get("embedding") is not None and resume.get("embedding") is not None:
         sem_sim = compute_semantic_similarity(job["embedding"], resume["embedding"])
 
     # Skill match
-    skill_result = compute_skill_match(
-        job_data.get("skills_required", []),
-        resume_data.get("skills", []),
-    )
+    skill_result = compute_term_id_match(job["skill_ids"], resume["skill_ids"], "skills")
 
     # Experience match
-    exp_score = compute_experience_match(
-        job_data.get("experience_required", ""),
-        resume_data.get("experience_years", ""),
-    )
+    exp_score = _experience_score(_row_years(job), _row_years(resume))
 
     # Education match
-    edu_score = compute_education_match(
-        job_data.get("education_required", ""),
-        resume_data.get("education", ""),
-    )
+    edu_score = _education_score(_row_level(job), _row_level(resume))
 
     # Tools match
-    tools_result = compute_tools_match(
-        job_data.get("tools_required", []),
-        resume_data.get("tools", []),
-    )
+    tools_result = compute_term_id_match(job["tool_ids"], resume["tool_ids"], "tools")
 
     # Weighted final score
-    w = SCORING_WEIGHTS
-    final_score = (
-        w["semantic"] * (sem_sim * 100)
-        + w["skill"] * skill_result["match_percentage"]
-        + w["experience"] * exp_score
-        + w["education"] * edu_score
-        + w["tools"] * tools_result["match_percentage"]
+    final_score = _weighted_score(
+        sem_sim, skill_result["match_percentage"], exp_score, edu_score, tools_result["match_percentage"],
     )
     final_score = round(min(final_score, 100.0), 1)
 
-    result_data = {
-        "matched_skills": skill_result["matched_skills"],
-        "missing_skills": skill_result["missing_skills"],
-        "skill_match_pct": skill_result["match_percentage"],
-        "experience_score": exp_score,
-        "education_score": edu_score,
-        "matched_tools": tools_result["matched_tools"],
-        "missing_tools": tools_result["missing_tools"],
-        "tools_match_pct": tools_result["match_percentage"],
-    }
+    return _assemble_result(final_score, sem_sim, skill_result, exp_score, edu_score, tools_result,
+                            job_data, resume_data)
 
-    result = {
-        "match_score": final_score,
-        "semantic_similarity": round(sem_sim, 4),
-        "result_data": result_data,
-        "job_data": job_data,
-        "resume_data": resume_data,
-    }
 
-    return result
+def rescore_all(weights: dict | None = None) -> int:
+    """Re-weight every stored match result from its component columns. Returns the rows updated.
+
+    Pass the new weights, or update SCORING_WEIGHTS and pass nothing. Only
+    rows scored under the current scorer settings are re-weighted, each
+    semantic mode (see cross_scoring) on its own and tagged with
+    ``weights_version(weights, mode)``; rows from other settings keep their
+    version and are re-scored from scratch when next requested.
+    """
+    weights = weights or SCORING_WEIGHTS
+    missing = set(SCORING_WEIGHTS) - set(weights)
+    if missing:
+        raise ValueError(f"Missing weights for: {', '.join(sorted(missing))}")
+    return sum(
+        db.rescore_match_results(weights, weights_version(weights, mode), scorer_settings(mode))
+        for mode in ("chunked", "single")
+    )
+
+
+# --------------- Batch scoring ---------------
+
+def _job_terms_by_name(term_ids: np.ndarray) -> tuple[np.ndarray, list[str]]:
+    """A job's term ids reordered so their names are sorted, plus those names."""
+    pairs = sorted(zip(db.get_term_names(term_ids), term_ids.tolist()))
+    return np.array([i for _, i in pairs], dtype=np.int64), [name for name, _ in pairs]
+
+
+def _term_hits(job_terms: np.ndarray, resume_terms: list[np.ndarray]) -> np.ndarray:
+    """Boolean ``(n_resumes, n_job_terms)`` matrix of which required terms (or synonyms) each resume has."""
+    hits = np.zeros((len(resume_terms), len(job_terms)), dtype=bool)
+    if not len(job_terms) or not resume_terms:
+        return hits
+    # One row per distinct id the job accepts, marking every required term it satisfies.
+    expanded, owners = expand_term_ids(job_terms)
+    accepted, inverse = np.unique(expanded, return_inverse=True)
+    satisfies = np.zeros((len(accepted), len(job_terms)), dtype=bool)
+    satisfies[inverse, owners] = True
+
+    lengths = np.fromiter((len(t) for t in resume_terms), dtype=np.int64, count=len(resume_terms))
+    flat = np.concatenate(resume_terms).astype(np.int64)
+    slots = np.minimum(np.searchsorted(accepted, flat), len(accepted) - 1)
+    found = accepted[slots] == flat
+    rows = np.repeat(np.arange(len(resume_terms)), lengths)[found]
+    hit_rows, hit_cols = np.nonzero(satisfies[slots[found]])
+    hits[rows[hit_rows], hit_cols] = True
+    return hits
+
+
+def _hit_pct(job_terms: list[str], hits: np.ndarray) -> np.ndarray:
+    """Rounded match percentage of each row of a hit matrix, as compute_skill_match computes it."""
+    if not job_terms:
+        return np.full(len(hits), 100.0)
+    return np.array([round(p, 1) for p in (hits.sum(axis=1) / len(job_terms) * 100).tolist()], dtype=np.float64)
+
+
+def _hit_results(job_terms: list[str], hits: np.ndarray, pct: np.ndarray, kind: str) -> list[dict]:
+    """Per-resume match dicts (as compute_skill_match / compute_tools_match)."""
+    terms = np.array(job_terms, dtype=object)
+    return [
+        {f"matched_{kind}": terms[row].tolist(), f"missing_{kind}": terms[~row].tolist(), "match_percentage": p}
+        for row, p in zip(hits, pct.tolist())
+    ]
+
+
+def _semantic_block(job, resume_ids: list[int], resume_chunks: list | None) -> np.ndarray:
+    """Semantic similarity of one job against a block of resumes, following calculate_match_score's rules."""
+    sem = np.zeros(len(resume_ids), dtype=np.float32)
+    if job["embedding"] is not None:
+        store = db.get_embedding_store("resumes")
+        pos = store.positions(resume_ids)
+        found = pos >= 0
+        if found.any():
+            sem[found] = compute_semantic_scores(job["embedding"], store.matrix()[pos[found]])
+    if resume_chunks is not None:
+        has_chunks = np.array([c is not None for c in resume_chunks], dtype=bool)
+        if has_chunks.any():
+            chunked = compute_chunked_similarities(job["chunk_embeddings"], resume_chunks)
+            sem[has_chunks] = chunked[has_chunks]
+    return sem
+
+
+def calculate_match_scores(job_id: int, resume_ids: Iterable[int], block_size: int = SCORER_BLOCK_SIZE,
+                           min_score: float | None = None, top_k: int | None = None,
+                           stats: dict | None = None) -> dict[int, dict]:
+    """Score one job against many resumes. Returns ``{resume_id: result}``.
+
+    Each result matches ``calculate_match_score(job_id, resume_id)``. The job is
+    loaded once, and each block of resumes is scored with array operations:
+    one normalized matrix product over the memory-mapped embedding store,
+    boolean hit matrices for skills and tools, and vectorized experience,
+    education and weighting. Ids not in the database are left out.
+
+    With ``min_score`` only results scoring at least that are returned; with
+    ``top_k`` only the best ``top_k`` (ties to the lower id), best first.
+    Every resume is then scored from its profile columns and embedding-store
+    row first, and one that cannot reach the threshold or the current k-th
+    best is dropped before its JSON is decoded. When chunk similarity is in
+    use the chunks are not loaded for that first pass, so the bound there is
+    the other components plus the full semantic weight, which drops only
+    resumes those components already rule out. Repeated ids are scored once.
+    ``stats``, if given, is filled with ``pairs``, ``pruned`` (resumes never
+    decoded) and ``pruned_fraction``.
+    """
+    if top_k is not None and top_k < 1:
+        raise ValueError("top_k must be at least 1.")
+    job = db.get_job(
+        job_id, columns=("structured_data", "embedding", "chunk_embeddings", "skill_ids", "tool_ids") + _PROFILE_COLUMNS,
+    )
+    if not job:
+        raise ValueError("Job not found in database.")
+    job_data = job["structured_data"]
+    use_chunks = SEMANTIC_SIMILARITY_MODE == "chunked" and job["chunk_embeddings"] is not None
+    pruning = min_score is not None or top_k is not None
+    profile_columns = ("skill_ids", "tool_ids") + _PROFILE_COLUMNS
+    detail_columns = ("structured_data",) + (("chunk_embeddings",) if use_chunks else ())
+
+    job_skill_ids, job_skills = _job_terms_by_name(job["skill_ids"])
+    job_tool_ids, job_tools = _job_terms_by_name(job["tool_ids"])
+    req_years = _row_years(job)
+    req_level = _row_level(job)
+
+    resume_ids = list(dict.fromkeys(resume_ids))
+    results = {}
+    heap = []  # (score, -resume_id, result) of the top_k best so far; the root is the k-th best
+    pairs = pruned = 0
+    for start in range(0, len(resume_ids), block_size):
+        rows = db.get_resumes(
+            resume_ids[start:start + block_size], columns=profile_columns + (() if pruning else detail_columns),
+        )
+        ids = [row["id"] for row in rows]
+
+        skill_hits = _term_hits(job_skill_ids, [row["skill_ids"] for row in rows])
+        tool_hits = _term_hits(job_tool_ids, [row["tool_ids"] for row in rows])
+        skill_pct = _hit_pct(job_skills, skill_hits)
+        tools_pct = _hit_pct(job_tools, tool_hits)
+        cand_years = np.array([_row_years(row) for row in rows], dtype=np.float64)
+        if req_years > 0:
+            exp_raw = np.minimum(cand_years / req_years * 100, 100.0)
+            exp_scores = np.array([round(x, 1) for x in exp_raw.tolist()])
+        else:
+            exp_scores = np.full(len(rows), 100.0)
+        cand_levels = np.array([_row_level(row) for row in rows], dtype=np.int64)
+        if req_level > 0:
+            edu_raw = np.where(cand_levels >= req_level, 100.0, np.maximum(cand_levels, 0) / req_level * 100)
+            edu_scores = np.array([round(x, 1) for x in edu_raw.tolist()])
+        else:
+            edu_scores = np.full(len(rows), 100.0)
+
+        pairs += len(rows)
+        keep = np.arange(len(rows))
+        kept_ids, details = ids, rows
+        sem = None
+        if pruning:
+            if use_chunks:
+                # Chunk similarity needs the chunks, so only its 0-1 range is known:
+                # a score lies between the rest and the rest plus the semantic weight.
+                low = _weighted_score(0.0, skill_pct, exp_scores, edu_scores, tools_pct)
+                high = low + SCORING_WEIGHTS["semantic"] * 100
+            else:
+                # One product over the embedding store gives the exact score.
+                sem = _semantic_block(job, ids, None)
+                low = high = _weighted_score(sem.astype(np.float64), skill_pct, exp_scores, edu_scores, tools_pct)
+            # Rounding moves a score by at most 0.05, hence the margins.
+            floor = min_score - 0.05 if min_score is not None else -np.inf
+            if top_k is not None and len(heap) == top_k:
+                floor = max(floor, heap[0][0] - 0.05)
+            if top_k is not None and len(rows) >= top_k:
+                # top_k resumes of this block will score at least their low end.
+                floor = max(floor, np.partition(np.minimum(low, 100.0), -top_k)[-top_k] - 0.1)
+            keep = np.flatnonzero(high >= floor)
+            pruned += len(rows) - len(keep)
+            kept_ids = [ids[i] for i in keep.tolist()]
+            fetched = {row["id"]: row for row in db.get_resumes(kept_ids, columns=detail_columns)}
+            details = [fetched[resume_id] for resume_id in kept_ids]
+            if sem is not None:
+                sem = sem[keep]
+
+        if sem is None:
+            sem = _semantic_block(job, kept_ids, [row["chunk_embeddings"] for row in details] if use_chunks else None)
+        skill_results = _hit_results(job_skills, skill_hits[keep], skill_pct[keep], "skills")
+        tools_results = _hit_results(job_tools, tool_hits[keep], tools_pct[keep], "tools")
+        sem64 = sem.astype(np.float64)
+        finals = np.minimum(
+            _weighted_score(sem64, skill_pct[keep], exp_scores[keep], edu_scores[keep], tools_pct[keep]), 100.0,
+        )
+        for i, resume_id in enumerate(kept_ids):
+            final_score = round(float(finals[i]), 1)
+            if min_score is not None and final_score < min_score:
+                continue
+            if top_k is not None and len(heap) == top_k and (final_score, -resume_id) <= heap[0][:2]:
+                continue
+            result = _assemble_result(
+                final_score, float(sem64[i]), skill_results[i], float(exp_scores[keep[i]]),
+                float(edu_scores[keep[i]]), tools_results[i], job_data, details[i]["structured_data"],
+            )
+            if top_k is None:
+                results[resume_id] = result
+            elif len(heap) < top_k:
+                heapq.heappush(heap, (final_score, -resume_id, result))
+            else:
+                heapq.heapreplace(heap, (final_score, -resume_id, result))
+
+    if stats is not None:
+        stats.update(pairs=pairs, pruned=pruned, pruned_fraction=pruned / pairs if pairs else 0.0)
+    if top_k is not None:
+        return {-neg_id: result for _, neg_id, result in sorted(heap, reverse=True)}
+    return results
+
+
+# --------------- Candidate retrieval ---------------
+
+def top_candidates(job_id: int, k: int = 10, shortlist_size: int = ANN_SHORTLIST_SIZE,
+                   nprobe: int = ANN_NPROBE) -> list[tuple[int, dict]]:
+    """Best ``k`` resumes for a job as ``[(resume_id, result), ...]``, highest match first.
+
+    The resume ANN index shortlists the ``shortlist_size`` nearest resumes by
+    embedding, and only those are reranked with the full scorer. A resume
+    that would rank on skills alone but is far from the job semantically can
+    be missed; raise ``shortlist_size`` or ``nprobe`` to trade speed for recall.
+    """
+    job = db.get_job(job_id, columns=("embedding",))
+    if not job:
+        raise ValueError("Job not found in database.")
+    if job["embedding"] is None:
+        return []
+    shortlist = db.search_resumes(job["embedding"], max(k, shortlist_size), nprobe)
+    return list(calculate_match_scores(job_id, [resume_id for resume_id, _ in shortlist], top_k=k).items())
+
+
+# --------------- Job feed ---------------
+# Ranking every stored job for one resume cannot afford to decode each job's
+# JSON per request, so the feed keeps the job-side scoring inputs as flat
+# arrays: interned skill and tool ids (CSR layout), required years and
+# required education level. Jobs are insert-only, so the arrays are extended
+# with rows whose id is above the last one seen. A job whose embedding was not
+# in the store yet keeps position -1 until a refresh finds the store grown.
+
+_job_features = {}
+_job_features_lock = threading.Lock()
+
+
+class _JobFeatures:
+    def __init__(self):
+        self.vocab_size = 0
+        self.ids = np.empty(0, dtype=np.int64)
+        self.positions = np.empty(0, dtype=np.int64)
+        self.skill_offsets = np.zeros(1, dtype=np.int64)
+        self.skill_terms = np.empty(0, dtype=np.int32)
+        self.tool_offsets = np.zeros(1, dtype=np.int64)
+        self.tool_terms = np.empty(0, dtype=np.int32)
+        self.req_years = np.empty(0, dtype=np.float64)
+        self.req_levels = np.empty(0, dtype=np.int64)
+        self.store_size = 0
+
+    def refresh(self) -> None:
+        store = db.get_embedding_store("jobs")
+        store.matrix()  # picks up rows stored since the last refresh, by any process
+        if len(store) != self.store_size:
+            self.store_size = len(store)
+            missing = np.flatnonzero(self.positions < 0)
+            if len(missing):
+                self.positions[missing] = store.positions(self.ids[missing])
+        last_id = int(self.ids[-1]) if len(self.ids) else 0
+        ids, skills, tools, years, levels = [], [], [], [], []
+        for row in db.iter_jobs_after(last_id, columns=("skill_ids", "tool_ids") + _PROFILE_COLUMNS):
+            ids.append(row["id"])
+            skills.append(row["skill_ids"])
+            tools.append(row["tool_ids"])
+            years.append(_row_years(row))
+            levels.append(_row_level(row))
+        if not ids:
+            return
+        self.skill_offsets, self.skill_terms = _extend_csr(self.skill_offsets, self.skill_terms, skills)
+        self.tool_offsets, self.tool_terms = _extend_csr(self.tool_offsets, self.tool_terms, tools)
+        for terms in (self.skill_terms, self.tool_terms):
+            if len(terms):
+                self.vocab_size = max(self.vocab_size, int(terms.max()) + 1)
+        self.positions = np.concatenate([self.positions, store.positions(ids)])
+        self.req_years = np.concatenate([self.req_years, years])
+        self.req_levels = np.concatenate([self.req_levels, levels])
+        # Published last: a reader that takes len(ids) first sees every other array at least that long.
+        self.ids = np.concatenate([self.ids, ids])
+
+
+def _extend_csr(offsets: np.ndarray, terms: np.ndarray, rows: list[np.ndarray]) -> tuple[np.ndarray, np.ndarray]:
+    lengths = np.fromiter((len(r) for r in rows), dtype=np.int64, count=len(rows))
+    new_terms = np.concatenate(rows).astype(np.int32) if rows else np.empty(0, dtype=np.int32)
+    return np.concatenate([offsets, offsets[-1] + np.cumsum(lengths)]), np.concatenate([terms, new_terms])
+
+
+def _get_job_features() -> _JobFeatures:
+    with _job_features_lock:
+        features = _job_features.get(db.DB_PATH)
+        if features is None:
+            features = _job_features[db.DB_PATH] = _JobFeatures()
+        features.refresh()
+    return features
+
+
+def warm_job_features() -> None:
+    """Open the job store and build the job feature cache now, e.g. at app startup.
+
+    Otherwise the first rank_jobs_for_resume call in a process pays for it
+    (about ten times a warm call at 100k jobs).
+    """
+    _get_job_features()
+
+
+def _csr_match_pct(offsets: np.ndarray, terms: np.ndarray, member: np.ndarray, start: int, stop: int) -> np.ndarray:
+    """Unrounded match percentage of rows ``start:stop`` against a term-membership mask."""
+    lo, hi = offsets[start], offsets[stop]
+    hits = np.concatenate([[0], np.cumsum(member[terms[lo:hi]])])
+    bounds = offsets[start:stop + 1] - lo
+    counts = np.diff(bounds)
+    return np.where(counts > 0, (hits[bounds[1:]] - hits[bounds[:-1]]) / np.maximum(counts, 1) * 100, 100.0)
+
+
+def rank_jobs_for_resume(resume_id: int, k: int = 10,
+                         block_size: int = SCORER_BLOCK_SIZE) -> list[tuple[int, dict]]:
+    """Best ``k`` stored jobs for a resume as ``[(job_id, result), ...]``, highest match first.
+
+    The semantic component uses the summary embeddings, scored against the
+    memory-mapped job store. Jobs are streamed through in blocks: each block
+    gets an unrounded score from the cached job features, and only jobs
+    within rounding distance of the current k-th best are rescored exactly
+    (with the same helpers as calculate_match_score) and pushed onto a
+    bounded heap. The ranking is identical to scoring every job one by one
+    this way, and jobs without a stored embedding score 0 on semantics.
+    """
+    if k < 1:
+        raise ValueError("k must be at least 1.")
+    resume = db.get_resume(resume_id, columns=("structured_data", "embedding", "skill_ids", "tool_ids") + _PROFILE_COLUMNS)
+    if not resume:
+        raise ValueError("Resume not found in database.")
+    resume_data = resume["structured_data"]
+    cand_years = _row_years(resume)
+    cand_level = _row_level(resume)
+
+    features = _get_job_features()
+    count = len(features.ids)
+    # Synonymy is symmetric, so expanding the resume's terms once is equivalent
+    # to expanding every job's required terms.
+    resume_skills = expand_term_set(resume["skill_ids"])
+    resume_tools = expand_term_set(resume["tool_ids"])
+    skill_member = np.zeros(features.vocab_size, dtype=np.int64)
+    skill_member[resume_skills[resume_skills < features.vocab_size]] = 1
+    tool_member = np.zeros(features.vocab_size, dtype=np.int64)
+    tool_member[resume_tools[resume_tools < features.vocab_size]] = 1
+    matrix = db.get_embedding_store("jobs").matrix()
+
+    # Each component is rounded to 0.1 before weighting and the total after,
+    # so an exact score is within this of its unrounded estimate.
+    slack = 0.05 * (1 + sum(w for name, w in SCORING_WEIGHTS.items() if name != "semantic"))
+    heap = []  # (score, -job_id, result); the root is the current k-th best
+    for start in range(0, count, block_size):
+        stop = min(start + block_size, count)
+        pos = features.positions[start:stop]
+        sem = np.zeros(stop - start, dtype=np.float32)
+        # A refresh in another thread may have resolved positions past this matrix.
+        found = (pos >= 0) & (pos < len(matrix))
+        if resume["embedding"] is not None and found.any():
+            sem[found] = compute_semantic_scores(resume["embedding"], matrix[pos[found]])
+        req_years = features.req_years[start:stop]
+        req_levels = features.req_levels[start:stop]
+        exp = np.where(req_years > 0, np.minimum(cand_years / np.where(req_years > 0, req_years, 1) * 100, 100.0), 100.0)
+        edu = np.where((req_levels <= 0) | (cand_level >= req_levels), 100.0,
+                       max(cand_level, 0) / np.maximum(req_levels, 1) * 100)
+        estimate = _weighted_score(
+            sem.astype(np.float64),
+            _csr_match_pct(features.skill_offsets, features.skill_terms, skill_member, start, stop),
+            exp, edu,
+            _csr_match_pct(features.tool_offsets, features.tool_terms, tool_member, start, stop),
+        )
+        estimate = np.minimum(estimate, 100.0)
+
+        floor = heap[0][0] - slack if len(heap) == k else -np.inf
+        if len(estimate) > k:
+            floor = max(floor, np.partition(estimate, -k)[-k] - 2 * slack)
+        candidates = np.flatnonzero(estimate >= floor)
+        if not len(candidates):
+            continue
+        job_ids = features.ids[start + candidates]
+        rows = {row["id"]: row["structured_data"] for row in db.get_jobs(job_ids.tolist(), ("structured_data",))}
+        for offset, job_id in zip(candidates.tolist(), job_ids.tolist()):
+            job_data = rows[job_id]
+            sem_sim = float(sem[offset])
+            row = start + offset
+            skill_result = compute_term_id_match(
+                features.skill_terms[features.skill_offsets[row]:features.skill_offsets[row + 1]],
+                resume["skill_ids"], "skills",
+            )
+            exp_score = _experience_score(float(req_years[offset]), cand_years)
+            edu_score = _education_score(int(req_levels[offset]), cand_level)
+            tools_result = compute_term_id_match(
+                features.tool_terms[features.tool_offsets[row]:features.tool_offsets[row + 1]],
+                resume["tool_ids"], "tools",
+            )
+            final_score = _weighted_score(
+                sem_sim, skill_result["match_percentage"], exp_score, edu_score, tools_result["match_percentage"],
+            )
+            final_score = round(min(final_score, 100.0), 1)
+            if len(heap) == k and (final_score, -job_id) <= heap[0][:2]:
+                continue
+            entry = (final_score, -job_id, _assemble_result(
+                final_score, sem_sim, skill_result, exp_score, edu_score, tools_result, job_data, resume_data,
+            ))
+            if len(heap) < k:
+                heapq.heappush(heap, entry)
+            else:
+                heapq.heapreplace(heap, entry)
+    return [(-neg_id, result) for _, neg_id, result in sorted(heap, key=lambda e: (-e[0], -e[1]))]
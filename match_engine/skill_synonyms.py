@@ -0,0 +1,122 @@
+import threading
+import time
+
+import numpy as np
+
+from config import SKILL_SYNONYMS_ENABLED, SKILL_SYNONYM_THRESHOLD, SKILL_ALIASES_CHECK_SECONDS
+from database import db
+
+
+_SIMILARITY_BLOCK = 1024
+
+_aliases = {}  # DB_PATH -> (alias version, monotonic time it was checked, {term_id: alias ids})
+_lock = threading.Lock()
+
+
+def _unit(matrix: np.ndarray) -> np.ndarray:
+    matrix = np.asarray(matrix, dtype=np.float32)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix / np.where(norms > 0, norms, 1.0)
+
+
+def _alias_pairs(new_ids: np.ndarray, new_unit: np.ndarray, all_ids: np.ndarray,
+                 all_unit: np.ndarray) -> list[tuple[int, int, float]]:
+    """Pairs between ``new_ids`` and ``all_ids`` (other than a term with itself) at or above the threshold."""
+    pairs = []
+    for start in range(0, len(new_ids), _SIMILARITY_BLOCK):
+        sims = new_unit[start:start + _SIMILARITY_BLOCK] @ all_unit.T
+        rows, cols = np.nonzero(sims >= SKILL_SYNONYM_THRESHOLD)
+        for r, c in zip(rows.tolist(), cols.tolist()):
+            a, b = int(new_ids[start + r]), int(all_ids[c])
+            if a != b:
+                pairs.append((a, b, float(sims[r, c])))
+    return pairs
+
+
+def _embed_new_terms() -> int:
+    pending = db.get_unembedded_terms()
+    if not pending:
+        return 0
+    # Imported here so importing this module never loads the model.
+    from embedding_module import embedding_service
+
+    new_ids = np.array([term_id for term_id, _ in pending], dtype=np.int64)
+    embeddings = embedding_service.encode_batch([name for _, name in pending])
+    new_unit = _unit(embeddings)
+    known_ids, known = db.get_term_embeddings()
+    all_ids = np.concatenate([known_ids, new_ids])
+    all_unit = np.vstack([_unit(known), new_unit]) if len(known_ids) else new_unit
+    db.save_term_embeddings(new_ids, embeddings, _alias_pairs(new_ids, new_unit, all_ids, all_unit))
+    return len(pending)
+
+
+def embed_new_terms() -> int:
+    """Embed terms interned since the last call and resolve their alias pairs. Returns the terms embedded.
+
+    Run after ingest, where the embedding model is loaded anyway; scoring
+    never embeds, and a term only gains synonyms once this has run.
+    """
+    if not SKILL_SYNONYMS_ENABLED:
+        return 0
+    with _lock:
+        embedded = _embed_new_terms()
+        if embedded:
+            _aliases.pop(db.DB_PATH, None)
+        return embedded
+
+
+def rebuild_aliases() -> None:
+    """Re-resolve every pair of embedded terms, e.g. after lowering SKILL_SYNONYM_THRESHOLD."""
+    with _lock:
+        _embed_new_terms()
+        ids, embeddings = db.get_term_embeddings()
+        unit = _unit(embeddings)
+        db.save_term_embeddings(ids, embeddings, _alias_pairs(ids, unit, ids, unit))
+        _aliases.pop(db.DB_PATH, None)
+
+
+def get_aliases() -> dict[int, np.ndarray]:
+    """``{term_id: ids of its near-synonyms}`` among the embedded terms (see embed_new_terms).
+
+    The relation is symmetric. Terms without synonyms are absent. Changes
+    made in this process show up at once; the alias version in the database
+    is checked at most every SKILL_ALIASES_CHECK_SECONDS for changes made by
+    embed_new_terms or rebuild_aliases in other processes.
+    """
+    if not SKILL_SYNONYMS_ENABLED:
+        return {}
+    with _lock:
+        now = time.monotonic()
+        cached = _aliases.get(db.DB_PATH)
+        if cached is not None and now - cached[1] < SKILL_ALIASES_CHECK_SECONDS:
+            return cached[2]
+        version = db.get_alias_version()
+        if cached is not None and cached[0] == version:
+            _aliases[db.DB_PATH] = (version, now, cached[2])
+            return cached[2]
+        grouped = {}
+        for term_id, alias_id in db.get_skill_aliases(SKILL_SYNONYM_THRESHOLD):
+            grouped.setdefault(term_id, []).append(alias_id)
+        aliases = {term_id: np.array(sorted(ids), dtype=np.int64) for term_id, ids in grouped.items()}
+        _aliases[db.DB_PATH] = (version, now, aliases)
+        return aliases
+
+
+def expand_term_ids(term_ids: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Each term followed by its synonyms, plus the index of the term each entry stands for.
+
+    Returns ``(ids, owners)``: a resume covers ``term_ids[owners[i]]`` if it
+    has ``ids[i]``.
+    """
+    term_ids = np.asarray(term_ids, dtype=np.int64)
+    aliases = get_aliases()
+    parts = [np.concatenate([[t], aliases[t]]) if t in aliases else np.array([t]) for t in term_ids.tolist()]
+    if not parts:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+    owners = np.repeat(np.arange(len(parts)), [len(p) for p in parts])
+    return np.concatenate(parts).astype(np.int64), owners
+
+
+def expand_term_set(term_ids: np.ndarray) -> np.ndarray:
+    """Sorted ids of ``term_ids`` and all their synonyms."""
+    return np.unique(expand_term_ids(term_ids)[0])
@@ -1,11 +1,9 @@
 import json
-import time
-from typing import List
+from typing import Iterator, List
 
-import google.generativeai as genai
 from pydantic import BaseModel, Field
 
-from config import GEMINI_API_KEY, GEMINI_MODEL, MAX_RETRIES, RETRY_DELAY
+from llm_module.client import generate, generate_stream
 
 
 class OptimizedResume(BaseModel):
@@ -45,14 +43,10 @@ Focus on ATS keyword alignment while keeping the content truthful to the candida
 """
 
 
-def optimize_resume(job_data: dict, resume_data: dict, gap_data: dict) -> OptimizedResume:
-    """Use Gemini to generate resume optimization suggestions."""
-    genai.configure(api_key=GEMINI_API_KEY)
-    model = genai.GenerativeModel(GEMINI_MODEL)
-
+def _optimizer_prompt(job_data: dict, resume_data: dict, gap_data: dict) -> str:
     projects_str = json.dumps(resume_data.get("projects", []), indent=2)
 
-    prompt = OPTIMIZER_PROMPT.format(
+    return OPTIMIZER_PROMPT.format(
         job_title=job_data.get("job_title", "N/A"),
         required_skills=", ".join(job_data.get("skills_required", [])),
         required_tools=", ".join(job_data.get("tools_required", [])),
@@ -66,25 +60,23 @@ def optimize_resume(job_data: dict, resume_data: dict, gap_data: dict) -> Optimi
         skills_to_add=", ".join(gap_data.get("skills_to_add", [])) or "None",
     )
 
-    for attempt in range(MAX_RETRIES):
-        try:
-            response = model.generate_content(
-                prompt,
-                generation_config=genai.GenerationConfig(
-                    response_mime_type="application/json",
-                ),
-            )
-            data = json.loads(response.text)
-            return OptimizedResume(**data)
-        except Exception as e:
-            err_str = str(e)
-            if "429" in err_str or "ResourceExhausted" in err_str:
-                raise RuntimeError(
-                    "Gemini API quota exceeded. Your free-tier limit has been reached. "
-                    "Please wait for it to reset or enable billing at "
-                    "https://ai.google.dev/gemini-api/docs/rate-limits"
-                )
-            if attempt < MAX_RETRIES - 1:
-                time.sleep(RETRY_DELAY * (attempt + 1))
-            else:
-                raise RuntimeError(f"Failed to optimize resume after {MAX_RETRIES} attempts: {e}")
+
+def parse_optimized_resume(text: str) -> OptimizedResume:
+    return OptimizedResume(**json.loads(text))
+
+
+def optimize_resume(job_data: dict, resume_data: dict, gap_data: dict) -> OptimizedResume:
+    """Use Gemini to generate resume optimization suggestions."""
+    prompt = _optimizer_prompt(job_data, resume_data, gap_data)
+    return generate(prompt, json_output=True, parse=parse_optimized_resume, context="Failed to optimize resume")
+
+
+def stream_optimize_resume(job_data: dict, resume_data: dict, gap_data: dict) -> Iterator[str]:
+    """Like optimize_resume, but yields the JSON reply in chunks as Gemini writes it.
+
+    Parse the joined chunks with parse_optimized_resume. A reply that fails
+    to parse is not retried here; optimize_resume does that (and skips the
+    cached bad reply).
+    """
+    prompt = _optimizer_prompt(job_data, resume_data, gap_data)
+    yield from generate_stream(prompt, json_output=True, context="Failed to optimize resume")
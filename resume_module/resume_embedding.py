@@ -1,23 +1,14 @@
-import numpy as np
-from sentence_transformers import SentenceTransformer
-
-from config import EMBEDDING_MODEL
-
-_model = None
+from typing import Iterable, Iterator
 
+import numpy as np
 
-def _get_model() -> SentenceTransformer:
-    global _model
-    if _model is None:
-        _model = SentenceTransformer(EMBEDDING_MODEL)
-    return _model
+from config import EMBEDDING_BATCH_SIZE
+from embedding_module import embedding_service
+from embedding_module.chunking import embed_chunks
 
 
-def generate_resume_embedding(resume_data: dict, raw_text: str = "") -> np.ndarray:
-    """Generate a semantic embedding for a resume.
-
-    Combines structured fields with raw text for a richer representation.
-    """
+def _resume_text(resume_data: dict, raw_text: str = "") -> str:
+    """Composite text embedded for a resume: key structured fields plus the start of the raw text."""
     parts = []
     if resume_data.get("skills"):
         parts.append(" ".join(resume_data["skills"]))
@@ -30,7 +21,28 @@ def generate_resume_embedding(resume_data: dict, raw_text: str = "") -> np.ndarr
     if raw_text:
         parts.append(raw_text[:500])
 
-    text = " | ".join(parts) if parts else raw_text[:1000]
-    model = _get_model()
-    embedding = model.encode(text, convert_to_numpy=True)
-    return embedding.astype(np.float32)
+    return " | ".join(parts) if parts else raw_text[:1000]
+
+
+def generate_resume_embedding(resume_data: dict, raw_text: str = "") -> np.ndarray:
+    """Generate a semantic embedding for a resume.
+
+    Combines structured fields with raw text for a richer representation.
+    """
+    return embedding_service.encode(_resume_text(resume_data, raw_text))
+
+
+def generate_resume_embeddings(items: Iterable[tuple[dict, str]],
+                               batch_size: int = EMBEDDING_BATCH_SIZE) -> Iterator[np.ndarray]:
+    """Embed many resumes, yielding float32 vectors in input order.
+
+    ``items`` yields ``(resume_data, raw_text)`` pairs and may be a generator; the
+    text for each item is built exactly as in ``generate_resume_embedding``.
+    """
+    texts = (_resume_text(resume_data, raw_text) for resume_data, raw_text in items)
+    return embedding_service.encode_stream(texts, batch_size=batch_size)
+
+
+def generate_resume_chunk_embeddings(raw_text: str) -> np.ndarray:
+    """Embed the full resume text as section-aware chunks. Returns a float32 ``(k, dim)`` matrix."""
+    return embed_chunks(raw_text)
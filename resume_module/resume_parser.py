@@ -1,13 +1,11 @@
 import json
-import time
 from typing import List, Optional
 
 import fitz  # PyMuPDF
-import google.generativeai as genai
 from pydantic import BaseModel, Field
 
-from config import GEMINI_API_KEY, GEMINI_MODEL, MAX_RETRIES, RETRY_DELAY
 from database import db
+from llm_module.client import generate
 
 
 class ResumeData(BaseModel):
@@ -48,39 +46,20 @@ def extract_text_from_pdf(file_bytes: bytes) -> str:
 
 def parse_resume(raw_text: str) -> ResumeData:
     """Send resume text to Gemini for structured extraction."""
-    genai.configure(api_key=GEMINI_API_KEY)
-    model = genai.GenerativeModel(GEMINI_MODEL)
-
     prompt = PARSING_PROMPT.format(resume_text=raw_text)
-
-    for attempt in range(MAX_RETRIES):
-        try:
-            response = model.generate_content(
-                prompt,
-                generation_config=genai.GenerationConfig(
-                    response_mime_type="application/json",
-                ),
-            )
-            data = json.loads(response.text)
-            resume_data = ResumeData(**data)
-            return resume_data
-        except Exception as e:
-            err_str = str(e)
-            if "429" in err_str or "ResourceExhausted" in err_str:
-                raise RuntimeError(
-                    "Gemini API quota exceeded. Your free-tier limit has been reached. "
-                    "Please wait for it to reset or enable billing at "
-                    "https://ai.google.dev/gemini-api/docs/rate-limits"
-                )
-            if attempt < MAX_RETRIES - 1:
-                time.sleep(RETRY_DELAY * (attempt + 1))
-            else:
-                raise RuntimeError(f"Failed to parse resume after {MAX_RETRIES} attempts: {e}")
+    return generate(prompt, json_output=True, parse=lambda text: ResumeData(**json.loads(text)),
+                    context="Failed to parse resume")
 
 
 def process_resume(filename: str, file_bytes: bytes, embedding=None) -> tuple[int, ResumeData, str]:
-    """Extract, parse, and store a resume. Returns (resume_id, ResumeData, raw_text)."""
+    """Extract, parse, and store a resume. Returns (resume_id, ResumeData, raw_text).
+
+    A resume whose text is already stored is returned without calling Gemini.
+    """
     raw_text = extract_text_from_pdf(file_bytes)
+    existing = db.find_resume_by_content(raw_text, columns=("structured_data",))
+    if existing is not None:
+        return existing["id"], ResumeData(**existing["structured_data"]), raw_text
     resume_data = parse_resume(raw_text)
     resume_id = db.save_resume(filename, raw_text, resume_data.model_dump(), embedding)
     return resume_id, resume_data, raw_text